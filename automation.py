@@ -1,5 +1,7 @@
 from scraper import collect_multiple_league_data, save_batch_to_excel
 from google_sheet_automation import save_batch_to_google_sheets, compare_player_urls, save_players_to_google_sheets
+from checkpoint import PipelineCheckpoint
+from snapshot import save_batch_snapshot
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from typing import List, Optional, Tuple
@@ -100,18 +102,20 @@ async def send_email_with_attachment(
 
             print(f"Attached file: {filename}")
 
-        # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
+        recipients = to_emails.copy()
+        if cc_emails:
+            recipients.extend(cc_emails)
+        if bcc_emails:
+            recipients.extend(bcc_emails)
 
-            recipients = to_emails.copy()
-            if cc_emails:
-                recipients.extend(cc_emails)
-            if bcc_emails:
-                recipients.extend(bcc_emails)
+        def send():
+            with smtplib.SMTP(smtp_server, smtp_port) as server:
+                server.starttls()
+                server.login(smtp_username, smtp_password)
+                server.sendmail(from_email, recipients, msg.as_string())
 
-            server.sendmail(from_email, recipients, msg.as_string())
+        # Send email (smtplib blocks, so keep it off the event loop)
+        await asyncio.to_thread(send)
 
         print(f"Email sent successfully to {len(recipients)} recipient(s)")
         return True
@@ -130,72 +134,130 @@ async def scrape_and_email_batch_tennis_data_with_player_comparison(
     bcc_emails: Optional[List[str]] = None,
     client_email: Optional[str] = None,
     include_google_sheets: bool = True,
-    delay: float = None,
-    batches: int = None,
+    max_concurrent: int = None,
+    resume: bool = False,
 ):
-    """Enhanced function that saves all players data to Google Sheets"""
+    """
+    Enhanced function that saves all players data to Google Sheets
+
+    Scraped combinations, the assembled batch data and each finished output stage are
+    checkpointed; with resume=True a rerun for the same combinations skips everything that
+    already finished, so a failed upload or email doesn't mean a full re-scrape.
+    """
     try:
         logger.info(f"Starting batch scrape and email workflow for {len(league_pool_combinations)} combinations")
+        checkpoint = PipelineCheckpoint(league_pool_combinations, resume = resume)
 
         # Step 1: Scrape all the data for multiple combinations
-        logger.info("Step 1: Starting batch data scraping...")
-        batch_data = await collect_multiple_league_data(league_pool_combinations, delay, batches)
+        batch_data = checkpoint.load_batch_data()
+        if batch_data is not None:
+            logger.info("Step 1: Loaded batch data from checkpoint, skipping scraping")
+        else:
+            logger.info("Step 1: Starting batch data scraping...")
+            batch_data = await collect_multiple_league_data(league_pool_combinations, max_concurrent, checkpoint = checkpoint)
 
         if not batch_data or not batch_data.get('successful_combinations'):
             logger.error("No data was successfully scraped from any combination")
             return False
 
+        await checkpoint.save_batch_data(batch_data)
         logger.info("Batch data scraping completed successfully!")
 
-        # Step 2: Save players data to Google Sheets (additional players sheets)
-        players_sheet_url = None
-        if include_google_sheets:
-            if batch_data.get('players'):
-                logger.info("Step 2: Saving players data to Google Sheets...")
-                try:
-                    # Create comparison result structure with players data
-                    players_result = {
-                        'players': batch_data.get('players', [])
-                    }
-
-                    players_sheet_url = await save_players_to_google_sheets(
-                        players_result,
-                        None,
-                    )
-                    if players_sheet_url:
-                        logger.info('Google sheets for Players data created successfully')
-                    else:
-                        logger.warning("Failed to create Players Google Sheets document")
-                except Exception as gs_error:
-                    logger.warning(f"Google Sheets creation failed: {str(gs_error)}")
-
-        # Step 3: Save main batch data to Excel
-        logger.info("Step 3: Saving batch data to Excel...")
-        excel_filename = await save_batch_to_excel(batch_data)
+        async def save_players_sheet():
+            if not include_google_sheets or not batch_data.get('players'):
+                return None
 
-        if not excel_filename or not os.path.exists(excel_filename):
-            logger.error("Failed to create Excel file")
-            return False
+            if checkpoint.stage_result('players_sheet'):
+                logger.info("Step 3a: Players data already saved to Google Sheets, skipping")
+                return checkpoint.stage_result('players_sheet')
 
-        logger.info(f"Excel file created successfully: {excel_filename}")
+            logger.info("Step 3a: Saving players data to Google Sheets...")
+            try:
+                # Create comparison result structure with players data
+                players_result = {
+                    'players': batch_data.get('players', [])
+                }
+
+                players_sheet_url = await save_players_to_google_sheets(
+                    players_result,
+                    None,
+                )
+                if players_sheet_url:
+                    checkpoint.complete_stage('players_sheet', players_sheet_url)
+                    logger.info('Google sheets for Players data created successfully')
+                else:
+                    logger.warning("Failed to create Players Google Sheets document")
+                return players_sheet_url
+            except Exception as gs_error:
+                logger.warning(f"Google Sheets creation failed: {str(gs_error)}")
+                return None
 
-        # Step 4: Save main batch data to Google Sheets
-        google_sheets_url = None
-        if include_google_sheets:
-            logger.info("Step 4: Saving batch data to Google Sheets...")
+        async def save_batch_sheet():
+            if not include_google_sheets:
+                return None
+
+            if checkpoint.stage_result('batch_sheet'):
+                logger.info("Step 3c: Batch data already saved to Google Sheets, skipping")
+                return checkpoint.stage_result('batch_sheet')
+
+            logger.info("Step 3c: Saving batch data to Google Sheets...")
             try:
                 google_sheets_url = await save_batch_to_google_sheets(
                     batch_data,
                     None,
                 )
                 if google_sheets_url:
+                    checkpoint.complete_stage('batch_sheet', google_sheets_url)
                     logger.info(f"Google Sheets created successfully: {google_sheets_url}")
                 else:
                     logger.warning("Failed to create Google Sheets document")
+                return google_sheets_url
             except Exception as gs_error:
                 logger.warning(f"Google Sheets creation failed: {str(gs_error)}")
+                return None
+
+        async def save_excel():
+            excel_filename = checkpoint.stage_result('excel')
+            if excel_filename and os.path.exists(excel_filename):
+                logger.info(f"Step 3b: Reusing Excel file from checkpoint: {excel_filename}")
+                return excel_filename
+
+            logger.info("Step 3b: Saving batch data to Excel...")
+            excel_filename = await save_batch_to_excel(batch_data)
+            if excel_filename and os.path.exists(excel_filename):
+                checkpoint.complete_stage('excel', excel_filename)
+            return excel_filename
+
+        async def save_snapshot():
+            if checkpoint.stage_result('snapshot'):
+                return checkpoint.stage_result('snapshot')
+
+            logger.info("Step 3d: Saving Parquet snapshot...")
+            snapshot_path = await save_batch_snapshot(batch_data)
+            if snapshot_path:
+                checkpoint.complete_stage('snapshot', snapshot_path)
+            return snapshot_path
+
+        # Step 3: Sheets uploads run on their own executor, so they overlap with the Excel build and snapshot
+        players_sheet_url, excel_filename, google_sheets_url, _ = await asyncio.gather(
+            save_players_sheet(),
+            save_excel(),
+            save_batch_sheet(),
+            save_snapshot(),
+        )
+
+        if not excel_filename or not os.path.exists(excel_filename):
+            logger.error("Failed to create Excel file")
+            return False
+
+        logger.info(f"Excel file created successfully: {excel_filename}")
+
+        if checkpoint.stage_result('email'):
+            logger.info("Email was already sent for this run, skipping")
+            checkpoint.clear()
+            return True
 
-        # Step 5: Configure SMTP settings
+        # Step 4: Configure SMTP settings; the exports above are kept even if credentials are missing
         smtp_config = {
             'server': 'smtp.gmail.com',
             'port': 587,
@@ -208,8 +270,8 @@ async def scrape_and_email_batch_tennis_data_with_player_comparison(
             logger.error("Email credentials not found in environment variables")
             return False
 
-        # Step 6: Send email with batch data and total players stats
-        logger.info("Step 6: Sending email with batch data...")
+        # Step 5: Send email with batch data and total players stats
+        logger.info("Step 5: Sending email with batch data...")
         logger.info(f"About to send email with attachment: {excel_filename}")
         logger.info(f"File exists: {os.path.exists(excel_filename)}")
         logger.info(f"File size: {os.path.getsize(excel_filename) if os.path.exists(excel_filename) else 'N/A'} bytes")
@@ -233,6 +295,7 @@ async def scrape_and_email_batch_tennis_data_with_player_comparison(
         )
 
         if email_success:
+            checkpoint.complete_stage('email', True)
             logger.info("Batch email sent successfully!")
             logger.info(f"Report sent to: {', '.join(recipients)}")
             if cc_emails:
@@ -245,6 +308,7 @@ async def scrape_and_email_batch_tennis_data_with_player_comparison(
             logger.info(f"Successful: {len(batch_data.get('successful_combinations', []))}")
             logger.info(f"Failed: {len(batch_data.get('failed_combinations', []))}")
             logger.info(f"Total players processed: {total_players}")
+            checkpoint.clear()
         else:
             logger.error("Batch email sending failed!")
 
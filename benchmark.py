@@ -0,0 +1,286 @@
+"""
+Micro-benchmarks for the export helpers.
+
+Each benchmark keeps a copy of the original implementation, checks that the new
+helper produces exactly the same output on a synthetic season, then times both.
+The Excel benchmark instead compares the two workbook backends on time and peak memory,
+and the snapshot benchmark compares reading a night back from Parquet against the workbook.
+
+    python benchmark.py
+"""
+from tools import dataframe_to_sheet_values, expand_matches_to_7_rows, find_team_id_columns, remove_empty_rows, write_excel_workbook
+import numpy as np
+import pandas as pd
+import snapshot
+import tracemalloc
+import tempfile
+import time
+import os
+
+
+def timed(function, *args, repeat = 3, **kwargs):
+    """Best wall time over a few runs, and the result of the last one"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def make_matches_frame(rows, seed = 7):
+    """Matches-shaped frame: id columns, names with gaps, scores with NaN and zeros, a flag"""
+    rng = np.random.default_rng(seed)
+    rounds = np.arange(rows) // 7
+
+    data = {
+        'season_id': np.full(rows, 12345),
+        'pool_id': np.full(rows, 67890),
+        'Round_ID': rounds,
+        'Match_ID': np.arange(rows) + 1_000_000,
+        'Team_Home_ID_Matches': rounds * 2,
+        'Team_Away_ID_Matches': rounds * 2 + 1,
+    }
+    for side in ('Home', 'Away'):
+        for player in (1, 2):
+            names = np.array([f"Player {n}" for n in rng.integers(0, 5000, rows)], dtype = object)
+            names[rng.random(rows) < 0.1] = None
+            data[f'{side} Player {player}'] = names
+    for set_number in range(1, 6):
+        for side in ('Home', 'Away'):
+            scores = rng.integers(0, 8, rows).astype(float)
+            scores[rng.random(rows) < 0.3] = np.nan
+            data[f'Set Score {set_number} {side}'] = scores
+    data['Is_Played'] = rng.random(rows) < 0.8
+    data['Date'] = np.array([f"2025-{(r % 12) + 1:02d}-{(r % 28) + 1:02d}" for r in rounds], dtype = object)
+    data['Court'] = np.array([f"Court {r % 6}" if r % 5 else None for r in rounds], dtype = object)
+    for extra in range(8):
+        data[f'Extra {extra}'] = rng.integers(0, 3, rows)
+
+    return pd.DataFrame(data)
+
+
+def legacy_format_dataframe_for_sheets(df, zero_as_text = False):
+    """The iterrows serializer previously duplicated in google_sheet_automation.py"""
+    if df.empty:
+        return []
+
+    headers = df.columns.tolist()
+    data_rows = []
+
+    for _, row in df.iterrows():
+        row_data = []
+        for value in row:
+            if pd.isna(value):
+                row_data.append('')
+            elif zero_as_text and isinstance(value, (int, float)) and value == 0:
+                row_data.append('0')  # Ensure 0 is stored as plain text
+            else:
+                row_data.append(str(value))
+        data_rows.append(row_data)
+
+    return [headers] + data_rows
+
+
+def benchmark_sheet_serializer(sizes = (10_000, 100_000)):
+    print('dataframe_to_sheet_values vs iterrows serializer')
+    for rows in sizes:
+        df = make_matches_frame(rows)
+        for zero_as_text in (False, True):
+            legacy_time, legacy = timed(legacy_format_dataframe_for_sheets, df, zero_as_text, repeat = 1)
+            new_time, new = timed(dataframe_to_sheet_values, df, zero_as_text)
+            assert new == legacy, f"serializer output differs at {rows} rows (zero_as_text={zero_as_text})"
+            print(f"  {rows:>7} rows x {df.shape[1]} cols, zero_as_text={zero_as_text!s:<5}: "
+                  f"iterrows {legacy_time:7.3f}s  vectorized {new_time:7.3f}s  ({legacy_time / new_time:5.1f}x)")
+
+
+def legacy_expand_matches_to_7_rows(matches_df):
+    """The per-round loop previously nested in save_batch_to_excel and save_batch_to_google_sheets"""
+    if matches_df.empty or 'Round_ID' not in matches_df.columns:
+        return matches_df
+
+    team_home_col, team_away_col = find_team_id_columns(matches_df)
+    expanded_rows = []
+
+    for round_id in matches_df['Round_ID'].unique():
+        round_matches = matches_df[matches_df['Round_ID'] == round_id]
+        current_count = len(round_matches)
+        template_row = round_matches.iloc[0].copy()
+
+        consistent_values = {
+            'season_id': template_row.get('season_id', ''),
+            'pool_id': template_row.get('pool_id', ''),
+            'Round_ID': round_id,
+        }
+        if team_home_col:
+            consistent_values[team_home_col] = template_row.get(team_home_col, '')
+        if team_away_col:
+            consistent_values[team_away_col] = template_row.get(team_away_col, '')
+
+        for i, (_, row) in enumerate(round_matches.iterrows()):
+            if i >= 7:
+                break
+            updated_row = row.copy()
+            for key, value in consistent_values.items():
+                if key in updated_row.index:
+                    updated_row[key] = value
+            expanded_rows.append(updated_row)
+
+        for _ in range(7 - current_count):
+            new_row = template_row.copy()
+            for key, value in consistent_values.items():
+                if key in new_row.index:
+                    new_row[key] = value
+            preserve_columns = list(consistent_values.keys())
+            for col in new_row.index:
+                if col not in preserve_columns:
+                    new_row[col] = ''
+            expanded_rows.append(new_row)
+
+    return pd.DataFrame(expanded_rows).reset_index(drop = True)
+
+
+def make_season_matches(rounds, seed = 11):
+    """Matches as scraped: most rounds short of 7 rows, some complete, a few over, ids drifting within a round"""
+    rng = np.random.default_rng(seed)
+    counts = rng.choice([1, 3, 5, 7, 7, 9], size = rounds)
+    frame = make_matches_frame(int(counts.sum()), seed = seed)
+    frame['Round_ID'] = np.repeat(np.arange(rounds) * 10 + 3, counts)
+    frame['Team_Home_ID_Matches'] = np.where(rng.random(len(frame)) < 0.1, '', frame['Round_ID'] * 2).astype(object)
+    # Interleave rounds so first-appearance order differs from sorted order
+    return frame.sample(frac = 1, random_state = seed).sort_values('Round_ID', key = lambda s: s % 7, kind = 'stable').reset_index(drop = True)
+
+
+def benchmark_expand_matches(round_counts = (500, 5_000)):
+    print('expand_matches_to_7_rows: groupby vs per-round loop')
+    for rounds in round_counts:
+        df = make_season_matches(rounds)
+        legacy_time, legacy = timed(legacy_expand_matches_to_7_rows, df, repeat = 1)
+        new_time, new = timed(expand_matches_to_7_rows, df)
+        # Same frame as the loop built: values, dtypes and index
+        pd.testing.assert_frame_equal(new, legacy, obj = f"expanded matches at {rounds} rounds")
+        print(f"  {rounds:>6} rounds ({len(df)} rows -> {len(new)}): "
+              f"loop {legacy_time:7.3f}s  groupby {new_time:7.3f}s  ({legacy_time / new_time:5.1f}x)")
+
+
+def legacy_remove_empty_rows(df):
+    """The iterrows filter previously nested in both exports (remove_empty_rows / remove_empty_duplicate_rows)"""
+    if df.empty:
+        return df
+
+    team_home_col, team_away_col = find_team_id_columns(df)
+    basic_identifier_columns = ['season_id', 'pool_id', 'Round_ID']
+    if team_home_col:
+        basic_identifier_columns.append(team_home_col)
+    if team_away_col:
+        basic_identifier_columns.append(team_away_col)
+    meaningful_data_columns = [col for col in df.columns if col not in basic_identifier_columns]
+
+    rows_to_keep = []
+    for idx, row in df.iterrows():
+        for col in meaningful_data_columns:
+            value = row[col]
+            if pd.notna(value) and str(value).strip() != '':
+                rows_to_keep.append(idx)
+                break
+
+    return df.loc[rows_to_keep].copy().reset_index(drop = True)
+
+
+def make_padded_matches(rounds, seed = 13):
+    """Season matches after a previous expansion: real rows plus blank and whitespace-only placeholders"""
+    expanded = expand_matches_to_7_rows(make_season_matches(rounds, seed = seed))
+    rng = np.random.default_rng(seed)
+    placeholders = expanded['Match_ID'].eq('')
+    # Some placeholders carry whitespace or None instead of '', and some real rows keep a single value
+    whitespace = placeholders & (rng.random(len(expanded)) < 0.2)
+    expanded.loc[whitespace, 'Court'] = '  '
+    expanded.loc[placeholders & (rng.random(len(expanded)) < 0.2), 'Date'] = None
+    sparse = ~placeholders & (rng.random(len(expanded)) < 0.1)
+    keep_columns = [col for col in expanded.columns if col not in ('season_id', 'pool_id', 'Round_ID', 'Team_Home_ID_Matches', 'Team_Away_ID_Matches', 'Date')]
+    expanded.loc[sparse, keep_columns] = np.nan
+    return expanded
+
+
+def benchmark_remove_empty_rows(round_counts = (500, 5_000)):
+    print('remove_empty_rows: column masks vs iterrows')
+    for rounds in round_counts:
+        df = make_padded_matches(rounds)
+        legacy_time, legacy = timed(legacy_remove_empty_rows, df, repeat = 1)
+        new_time, new = timed(remove_empty_rows, df)
+        assert new.equals(legacy), f"filtered rows differ at {rounds} rounds"
+        print(f"  {rounds:>6} rounds ({len(df)} rows -> {len(new)} kept): "
+              f"iterrows {legacy_time:7.3f}s  masks {new_time:7.3f}s  ({legacy_time / new_time:5.1f}x)")
+
+
+def measure_write(backend, path, sheets, trace_memory = False):
+    """Wall time, or peak traced Python memory, for one workbook write"""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    write_excel_workbook(path, sheets, backend = backend)
+    elapsed = time.perf_counter() - start
+    if not trace_memory:
+        return elapsed
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark_excel_backends(sizes = (10_000, 100_000), memory_sizes = (5_000, 20_000)):
+    print('write_excel_workbook: xlsxwriter (constant memory) vs openpyxl')
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            df = make_matches_frame(rows)
+            sheets = {'Matches': df, 'Standings': df.head(200)}
+            elapsed = {}
+            for backend in ('openpyxl', 'xlsxwriter'):
+                path = os.path.join(directory, f'{backend}_{rows}.xlsx')
+                elapsed[backend] = measure_write(backend, path, sheets)
+                check = pd.read_excel(path, sheet_name = 'Matches')
+                assert len(check) == rows and list(check.columns) == list(df.columns), f"{backend} workbook is incomplete"
+            print(f"  {rows:>7} rows: openpyxl {elapsed['openpyxl']:6.2f}s  xlsxwriter {elapsed['xlsxwriter']:6.2f}s  "
+                  f"({elapsed['openpyxl'] / elapsed['xlsxwriter']:4.1f}x)")
+
+        # tracemalloc slows writes down a lot, so peak memory is measured on smaller workbooks
+        for rows in memory_sizes:
+            sheets = {'Matches': make_matches_frame(rows)}
+            peaks = {
+                backend: measure_write(backend, os.path.join(directory, f'{backend}_mem_{rows}.xlsx'), sheets, trace_memory = True)
+                for backend in ('openpyxl', 'xlsxwriter')
+            }
+            print(f"  {rows:>7} rows peak memory: openpyxl {peaks['openpyxl'] / 2**20:7.1f} MiB  "
+                  f"xlsxwriter {peaks['xlsxwriter'] / 2**20:7.1f} MiB")
+
+
+def benchmark_snapshot_read(rows = 20_000):
+    print('Reading a night back: Parquet snapshot vs Excel workbook')
+    if snapshot.pa is None:
+        print('  pyarrow is not installed, skipping')
+        return
+
+    df = make_matches_frame(rows)
+    df['season_id'] = df['Round_ID'] % 20
+    with tempfile.TemporaryDirectory() as directory:
+        excel_path = os.path.join(directory, 'batch.xlsx')
+        write_excel_workbook(excel_path, {'Matches': df})
+        snapshot.write_batch_snapshot({'matches': df.to_dict('records')}, directory)
+
+        excel_time, from_excel = timed(pd.read_excel, excel_path, sheet_name = 'Matches', repeat = 1)
+        parquet_time, from_parquet = timed(pd.read_parquet, os.path.join(directory, 'matches'))
+        assert len(from_parquet) == len(from_excel) == rows, "snapshot row count differs from the workbook"
+        assert set(df.columns) <= set(from_parquet.columns), "snapshot is missing columns"
+
+        parquet_bytes = sum(os.path.getsize(os.path.join(folder, name))
+                            for folder, _, names in os.walk(os.path.join(directory, 'matches')) for name in names)
+        print(f"  {rows:>7} rows: read xlsx {excel_time:6.2f}s  parquet {parquet_time:6.3f}s  ({excel_time / parquet_time:5.1f}x), "
+              f"size xlsx {os.path.getsize(excel_path) / 2**20:5.1f} MiB  parquet {parquet_bytes / 2**20:5.1f} MiB")
+
+
+if __name__ == '__main__':
+    benchmark_sheet_serializer()
+    benchmark_expand_matches()
+    benchmark_remove_empty_rows()
+    benchmark_excel_backends()
+    benchmark_snapshot_read()
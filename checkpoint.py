@@ -0,0 +1,100 @@
+from tools import CACHE_DIR
+from logger import setup_logger
+import hashlib
+import asyncio
+import shutil
+import gzip
+import json
+import os
+
+
+logger = asyncio.run(setup_logger('checkpoint'))
+
+
+CHECKPOINT_DIR = os.getenv('CHECKPOINT_DIR', os.path.join(CACHE_DIR, 'checkpoints'))
+
+
+def run_key(league_pool_combinations):
+    """Checkpoints belong to one set of league/pool combinations, whatever order they were loaded in"""
+    combinations = sorted(f"{season_id}:{pool_id}" for season_id, pool_id in league_pool_combinations)
+    return hashlib.sha1('\n'.join(combinations).encode('utf-8')).hexdigest()[:16]
+
+
+def write_json_gz(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+    temporary_path = f"{path}.tmp"
+    with gzip.open(temporary_path, 'wt', encoding = 'utf-8', compresslevel = 6) as file:
+        json.dump(data, file, separators = (',', ':'), default = str)
+    os.replace(temporary_path, path)
+
+
+def read_json_gz(path):
+    try:
+        with gzip.open(path, 'rt', encoding = 'utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+class PipelineCheckpoint:
+    """
+    On-disk checkpoints for one nightly run, as gzipped JSON under CHECKPOINT_DIR/<run key>/:
+    one file per scraped league/pool combination, the assembled batch_data, and the result of
+    every finished output stage (Excel file, Sheets URLs, email).
+
+    A fresh run starts from an empty directory; with resume=True earlier checkpoints are reused,
+    so only unfinished combinations and stages run again. The directory is removed once the
+    whole pipeline has succeeded.
+    """
+
+    def __init__(self, league_pool_combinations, resume = False, directory = CHECKPOINT_DIR):
+        self.resume = resume
+        self.path = os.path.join(directory, run_key(league_pool_combinations))
+        if not resume:
+            shutil.rmtree(self.path, ignore_errors = True)
+        self.stages = (read_json_gz(self.stage_file) or {}) if resume else {}
+        if resume:
+            logger.info(f"Resuming from {self.path}: {len(self.completed_combinations())} combinations and "
+                        f"stages {sorted(self.stages) or 'none'} already done")
+
+    @property
+    def stage_file(self):
+        return os.path.join(self.path, 'stages.json.gz')
+
+    def combination_file(self, season_id, pool_id):
+        return os.path.join(self.path, 'combinations', f"{season_id}_{pool_id}.json.gz")
+
+    def completed_combinations(self):
+        directory = os.path.join(self.path, 'combinations')
+        return os.listdir(directory) if os.path.isdir(directory) else []
+
+    def load_combination(self, season_id, pool_id):
+        if not self.resume:
+            return None
+        return read_json_gz(self.combination_file(season_id, pool_id))
+
+    async def save_combination(self, season_id, pool_id, scraped_data):
+        await asyncio.to_thread(write_json_gz, self.combination_file(season_id, pool_id), scraped_data)
+
+    def load_batch_data(self):
+        if not self.resume:
+            return None
+        return read_json_gz(os.path.join(self.path, 'batch_data.json.gz'))
+
+    async def save_batch_data(self, batch_data):
+        await asyncio.to_thread(write_json_gz, os.path.join(self.path, 'batch_data.json.gz'), batch_data)
+
+    def stage_result(self, name):
+        """Result recorded for a finished stage, or None if it still has to run"""
+        return self.stages.get(name)
+
+    def complete_stage(self, name, result):
+        self.stages[name] = result
+        write_json_gz(self.stage_file, self.stages)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors = True)
+        logger.info(f"Pipeline finished, removed checkpoints in {self.path}")
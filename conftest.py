@@ -0,0 +1 @@
+# Lets pytest import the flat top-level modules (tools, benchmark, ...) from tests/
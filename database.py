@@ -0,0 +1,187 @@
+from tools import CACHE_DIR
+from logger import setup_logger
+from datetime import datetime
+import sqlite3
+import asyncio
+import json
+import time
+import os
+
+
+logger = asyncio.run(setup_logger('database'))
+
+
+DATABASE_ENABLED = os.getenv('DATABASE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+DATABASE_PATH = os.getenv('DATABASE_PATH', os.path.join(CACHE_DIR, 'rankedin.sqlite3'))
+DATABASE_BATCH_SIZE = 1000
+
+
+# Table -> indexed columns (column -> record key), primary key and secondary indexes.
+# The full scraped record is kept as JSON in `data`, so new fields need no migration.
+ENTITY_TABLES = {
+    'standings': {
+        'columns': {'season_id': 'season_id', 'pool_id': 'pool_id', 'participant_id': 'Participant ID', 'team_id': 'team_id_standing'},
+        'primary_key': ('season_id', 'pool_id', 'participant_id'),
+        'indexes': [('team_id',)],
+    },
+    'rounds': {
+        'columns': {'match_id': 'Match ID', 'season_id': 'season_id', 'pool_id': 'pool_id',
+                    'team_id_home': 'Team_ID_Home', 'team_id_away': 'Team_ID_Away'},
+        'primary_key': ('match_id',),
+        'indexes': [('season_id', 'pool_id'), ('team_id_home',), ('team_id_away',)],
+    },
+    'matches': {
+        'columns': {'round_id': 'Round_ID', 'row_index': None, 'season_id': 'season_id', 'pool_id': 'pool_id',
+                    'team_id_home': 'Team_Home_ID_Matches', 'team_id_away': 'Team_Away_ID_Matches'},
+        'primary_key': ('round_id', 'row_index'),
+        'indexes': [('season_id', 'pool_id'), ('team_id_home',), ('team_id_away',)],
+    },
+    'players': {
+        'columns': {'player_id': 'Player ID', 'team_id': 'Team_ID_Players', 'season_id': 'season_id', 'pool_id': 'pool_id',
+                    'organisation_id': 'Team Organisation Id'},
+        'primary_key': ('player_id', 'team_id'),
+        'indexes': [('season_id', 'pool_id'), ('team_id',), ('organisation_id',)],
+    },
+    'rankings': {
+        'columns': {'player_id': 'Player ID', 'ranking_position': 'Ranking Position', 'ranking_timestamp': 'Ranking Timestamp',
+                    'ranking_name': 'Ranking Name'},
+        'primary_key': ('player_id',),
+        'indexes': [('ranking_name',)],
+    },
+    'organisations': {
+        'columns': {'organisation_id': 'Organisation_Id', 'team_id': 'team_id_organisation', 'season_id': 'season_id', 'pool_id': 'pool_id'},
+        'primary_key': ('organisation_id', 'team_id'),
+        'indexes': [('season_id', 'pool_id'), ('team_id',)],
+    },
+}
+
+# batch_data key -> table; rankings are split out of the player records
+BATCH_ENTITIES = {
+    'standings': 'standings',
+    'rounds': 'rounds',
+    'matches': 'matches',
+    'players': 'players',
+    'organizations': 'organisations',
+}
+
+
+def key_value(value):
+    """Ids arrive as int or str depending on the source, so key and index columns are stored as text"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+class ScrapeStore:
+    """
+    Local SQLite copy of everything scraped, one table per entity.
+
+    Each table has its natural primary key plus indexes on season_id/pool_id and the team ids,
+    and upserts replace a row's data in place, so repeated runs keep one current row per entity.
+    """
+
+    def __init__(self, path = DATABASE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        for table, spec in ENTITY_TABLES.items():
+            columns = ', '.join(f"{column} TEXT NOT NULL" for column in spec['columns'])
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {columns},
+                    data TEXT NOT NULL,
+                    run_date TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY ({', '.join(spec['primary_key'])})
+                )
+            """)
+            for index_columns in spec['indexes']:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(index_columns)} ON {table} ({', '.join(index_columns)})"
+                )
+        self.connection.commit()
+
+    def rows(self, table, records, run_date, now):
+        """Row values per record; records with a blank primary key column are skipped with a warning"""
+        spec = ENTITY_TABLES[table]
+        key_positions = [position for position, column in enumerate(spec['columns']) if column in spec['primary_key']]
+        round_rows = {}
+        skipped = 0
+        for record in records:
+            values = []
+            for column, record_key in spec['columns'].items():
+                if column == 'row_index':
+                    # Position of the match within its team match, as returned by get_matches
+                    round_id = key_value(record.get('Round_ID'))
+                    round_rows[round_id] = round_rows.get(round_id, -1) + 1
+                    values.append(str(round_rows[round_id]))
+                else:
+                    values.append(key_value(record.get(record_key)))
+
+            # Blank keys would all collide on one row, each upsert silently replacing the last
+            if any(values[position] == '' for position in key_positions):
+                skipped += 1
+                continue
+
+            values += [json.dumps(record, default=str, ensure_ascii=False), run_date, now]
+            yield values
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} {table} records without {' / '.join(spec['primary_key'])}")
+
+    def upsert(self, table, records, run_date = None):
+        """Insert or update records in batches inside one transaction; returns the number of rows written"""
+        spec = ENTITY_TABLES[table]
+        columns = list(spec['columns']) + ['data', 'run_date', 'updated_at']
+        updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column not in spec['primary_key'])
+        statement = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({', '.join(spec['primary_key'])}) DO UPDATE SET {updates}"
+        )
+
+        run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+        rows = list(self.rows(table, records, run_date, time.time()))
+        with self.connection:
+            for start in range(0, len(rows), DATABASE_BATCH_SIZE):
+                self.connection.executemany(statement, rows[start:start + DATABASE_BATCH_SIZE])
+        return len(rows)
+
+    def upsert_batch(self, batch_data, run_date = None):
+        """Store every entity of a collect_multiple_league_data result; returns rows written per table"""
+        counts = {}
+        for batch_key, table in BATCH_ENTITIES.items():
+            counts[table] = self.upsert(table, batch_data.get(batch_key, []), run_date)
+
+        # Only players whose ranking lookup returned something replace a stored ranking
+        ranked_players = [player for player in batch_data.get('players', []) if player.get('Ranking Position') not in (None, '')]
+        counts['rankings'] = self.upsert('rankings', ranked_players, run_date)
+        return counts
+
+    def query(self, sql, params = ()):
+        return self.connection.execute(sql, params).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+def store_batch_data(batch_data, path = DATABASE_PATH):
+    """Upsert a run's batch data into the local store; failures are logged, never raised"""
+    started = time.perf_counter()
+    try:
+        store = ScrapeStore(path)
+        try:
+            counts = store.upsert_batch(batch_data)
+        finally:
+            store.close()
+    except Exception as e:
+        # The store is an optional cache; a bad path, disk error or unexpected row must not fail the run
+        logger.error(f"Could not update local store {path}: {str(e)}")
+        return None
+
+    summary = ', '.join(f"{count} {table}" for table, count in counts.items())
+    logger.info(f"Upserted {summary} into {path} in {time.perf_counter() - started:.2f}s")
+    return counts
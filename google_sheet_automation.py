@@ -1,6 +1,7 @@
 from google.oauth2.service_account import Credentials
-from scraper import division_name_call
+from concurrent.futures import ThreadPoolExecutor
 from logger import setup_logger
+from tools import TokenBucket, CACHE_DIR, dataframe_to_sheet_values, degraded_endpoint_summary_rows, expand_matches_to_7_rows, remove_empty_rows
 from dotenv import load_dotenv
 from zoneinfo import ZoneInfo
 from datetime import datetime
@@ -8,8 +9,11 @@ import gspread.exceptions
 from typing import Dict
 import pandas as pd
 import traceback
+import functools
 import asyncio
 import gspread
+import random
+import json
 import os
 
 
@@ -22,6 +26,211 @@ WRITE_SPREADSHEET_ID = os.getenv('WRITE_SPREADSHEET_ID')
 PLAYER_SPREADSHEET_ID = os.getenv('PLAYER_SPREADSHEET_ID')
 ADDITIONAL_PLAYER_SPREADSHEET_ID = os.getenv('ADDITIONAL_PLAYER_SPREADSHEET_ID')
 
+SHEETS_SCOPE = [
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive',
+]
+
+# gspread is synchronous, so every call runs on this bounded executor instead of the event loop
+SHEETS_MAX_WORKERS = int(os.getenv('SHEETS_MAX_WORKERS', 4))
+SHEETS_REQUESTS_PER_MINUTE = int(os.getenv('SHEETS_REQUESTS_PER_MINUTE', 60))
+SHEETS_MAX_RETRIES = 5
+RETRYABLE_SHEETS_STATUS = {429, 500, 502, 503, 504}
+
+sheets_executor = ThreadPoolExecutor(max_workers=SHEETS_MAX_WORKERS, thread_name_prefix='sheets')
+sheets_rate_limiter = TokenBucket(SHEETS_REQUESTS_PER_MINUTE / 60, max(1, SHEETS_REQUESTS_PER_MINUTE // 6))
+_sheets_client = None
+
+
+async def run_sheets_call(function, *args, **kwargs):
+    """
+    Run a blocking gspread call on the Sheets executor without freezing the event loop.
+    Calls are paced to stay within the per-minute Sheets quota, and quota (429) or transient
+    server errors are retried with exponential backoff.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(SHEETS_MAX_RETRIES):
+        await sheets_rate_limiter.acquire()
+        try:
+            return await loop.run_in_executor(sheets_executor, functools.partial(function, *args, **kwargs))
+        except gspread.exceptions.APIError as e:
+            status = getattr(e, 'code', None)
+            if status not in RETRYABLE_SHEETS_STATUS or attempt == SHEETS_MAX_RETRIES - 1:
+                raise
+            delay = min(2 ** (attempt + 1), 60) + random.uniform(0, 1)
+            logger.warning(f"Sheets API returned {status} for {getattr(function, '__name__', function)}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def get_sheets_client():
+    """Authorized gspread client shared by every Sheets call in the run"""
+    global _sheets_client
+    if _sheets_client is None:
+        creds = Credentials.from_service_account_file('credentials.json', scopes=SHEETS_SCOPE)
+        _sheets_client = await run_sheets_call(gspread.authorize, creds)
+    return _sheets_client
+
+
+HEADER_FORMAT = {
+    'textFormat': {'bold': True},
+    'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
+}
+
+
+def quote_sheet_title(title):
+    """A1-notation sheet reference, quoted so titles with spaces or symbols are safe"""
+    return "'" + title.replace("'", "''") + "'"
+
+
+def column_pixel_widths(data, min_width=60, max_width=400):
+    """Estimate column widths from the values so tabs can be sized without an autoResize round-trip"""
+    widths = []
+    for column in zip(*data):
+        longest = max(len(str(value)) for value in column)
+        widths.append(min(max(longest * 7 + 16, min_width), max_width))
+    return widths
+
+
+class SheetBatchWriter:
+    """
+    Collects every tab of one spreadsheet and commits them together: one metadata read,
+    one spreadsheets.batchUpdate for creating, clearing, freezing and formatting tabs,
+    and one values.batchUpdate carrying all the cell values.
+    """
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.title = None
+        self.tabs = {}
+
+    def set_title(self, title):
+        self.title = title
+
+    def add_sheet(self, title, data, header_format=HEADER_FORMAT, body_format=None,
+                  resize_columns=False, min_rows=100, min_cols=20):
+        """Queue a tab; header_format=None writes the values without header styling or frozen row"""
+        if not data:
+            return
+        self.tabs[title] = {
+            'data': data,
+            'header_format': header_format,
+            'body_format': body_format,
+            'resize_columns': resize_columns,
+            'min_rows': min_rows,
+            'min_cols': min_cols,
+        }
+
+    @staticmethod
+    def format_request(grid_range, cell_format):
+        return {
+            'repeatCell': {
+                'range': grid_range,
+                'cell': {'userEnteredFormat': cell_format},
+                'fields': 'userEnteredFormat(' + ','.join(cell_format.keys()) + ')'
+            }
+        }
+
+    async def commit(self, delete_empty_default=True):
+        metadata = await run_sheets_call(self.spreadsheet.fetch_sheet_metadata)
+        existing = {sheet['properties']['title']: sheet['properties'] for sheet in metadata.get('sheets', [])}
+        next_sheet_id = max((properties['sheetId'] for properties in existing.values()), default=0) + 1
+
+        requests = []
+        value_ranges = []
+
+        if self.title:
+            requests.append({'updateSpreadsheetProperties': {'properties': {'title': self.title}, 'fields': 'title'}})
+
+        for title, tab in self.tabs.items():
+            data = tab['data']
+            row_count = len(data)
+            col_count = max(len(row) for row in data)
+            properties = existing.get(title)
+
+            if properties is None:
+                sheet_id = next_sheet_id
+                next_sheet_id += 1
+                requests.append({
+                    'addSheet': {
+                        'properties': {
+                            'sheetId': sheet_id,
+                            'title': title,
+                            'gridProperties': {
+                                'rowCount': max(row_count, tab['min_rows']),
+                                'columnCount': max(col_count, tab['min_cols'])
+                            }
+                        }
+                    }
+                })
+            else:
+                sheet_id = properties['sheetId']
+                grid = properties.get('gridProperties', {})
+                requests.append({
+                    'updateSheetProperties': {
+                        'properties': {
+                            'sheetId': sheet_id,
+                            'gridProperties': {
+                                'rowCount': max(row_count, grid.get('rowCount', 0)),
+                                'columnCount': max(col_count, grid.get('columnCount', 0))
+                            }
+                        },
+                        'fields': 'gridProperties.rowCount,gridProperties.columnCount'
+                    }
+                })
+                # Clear old values only, like worksheet.clear()
+                requests.append({'updateCells': {'range': {'sheetId': sheet_id}, 'fields': 'userEnteredValue'}})
+
+            if tab['header_format']:
+                requests.append({
+                    'updateSheetProperties': {
+                        'properties': {'sheetId': sheet_id, 'gridProperties': {'frozenRowCount': 1}},
+                        'fields': 'gridProperties.frozenRowCount'
+                    }
+                })
+                requests.append(self.format_request(
+                    {'sheetId': sheet_id, 'startRowIndex': 0, 'endRowIndex': 1, 'startColumnIndex': 0, 'endColumnIndex': col_count},
+                    tab['header_format']
+                ))
+
+            if tab['body_format'] and row_count > 1:
+                requests.append(self.format_request(
+                    {'sheetId': sheet_id, 'startRowIndex': 1, 'endRowIndex': row_count, 'startColumnIndex': 0, 'endColumnIndex': col_count},
+                    tab['body_format']
+                ))
+
+            if tab['resize_columns']:
+                for index, width in enumerate(column_pixel_widths(data)):
+                    requests.append({
+                        'updateDimensionProperties': {
+                            'range': {'sheetId': sheet_id, 'dimension': 'COLUMNS', 'startIndex': index, 'endIndex': index + 1},
+                            'properties': {'pixelSize': width},
+                            'fields': 'pixelSize'
+                        }
+                    })
+
+            value_ranges.append({'range': f"{quote_sheet_title(title)}!A1", 'values': data})
+
+        # Drop the default Sheet1 once real tabs exist, unless someone has put data in it
+        default_sheet = existing.get('Sheet1')
+        if delete_empty_default and default_sheet and self.tabs and 'Sheet1' not in self.tabs:
+            sheet_values = await run_sheets_call(self.spreadsheet.values_get, quote_sheet_title('Sheet1'))
+            values = sheet_values.get('values', [])
+            if not values or (len(values) == 1 and not any(values[0])):
+                requests.append({'deleteSheet': {'sheetId': default_sheet['sheetId']}})
+                logger.info("Deleted empty default Sheet1")
+            else:
+                logger.info("Preserved Sheet1 as it contains data")
+
+        if requests:
+            await run_sheets_call(self.spreadsheet.batch_update, {'requests': requests})
+        if value_ranges:
+            await run_sheets_call(
+                self.spreadsheet.values_batch_update,
+                {'valueInputOption': 'RAW', 'data': value_ranges}
+            )
+
+        logger.info(f"Committed {len(value_ranges)} tabs with {len(requests)} structure/format requests in one batch")
+
 
 '''async def load_players_stats_csv():
     try:
@@ -46,6 +255,143 @@ ADDITIONAL_PLAYER_SPREADSHEET_ID = os.getenv('ADDITIONAL_PLAYER_SPREADSHEET_ID')
         logger.info(f"Error loading configuration from Google Sheets: {str(e)}")'''
 
 
+# Last matrix written to the Matches tab (hourly or nightly), so the next hourly run only sends cells that changed
+HOURLY_SHEET_SNAPSHOT = os.getenv('HOURLY_SHEET_SNAPSHOT', os.path.join(CACHE_DIR, 'hourly_matches_sheet.json'))
+HOURLY_SNAPSHOT_MAX_AGE_HOURS = float(os.getenv('HOURLY_SNAPSHOT_MAX_AGE_HOURS', 24))
+
+
+def changed_blocks(previous, current, clear_rows=0, clear_cols=0):
+    """
+    Rectangles (first_row, first_col, values) covering every cell of `current` that differs from
+    `previous`, 0-based. Cells inside clear_rows x clear_cols that `current` no longer covers are
+    blanked. Each row contributes its first..last changed column, and consecutive rows with the
+    same span are merged into one block.
+    """
+    def cell(rows, r, c):
+        if r < len(rows) and c < len(rows[r]):
+            return rows[r][c]
+        return ''
+
+    height = max(len(current), clear_rows)
+    width = max(max((len(row) for row in current), default=0), clear_cols)
+
+    spans = []
+    for r in range(height):
+        changed = [c for c in range(width) if cell(current, r, c) != cell(previous, r, c)]
+        if not changed:
+            continue
+        first, last = changed[0], changed[-1]
+        if spans and spans[-1][1] == r - 1 and spans[-1][2:] == [first, last]:
+            spans[-1][1] = r
+        else:
+            spans.append([r, r, first, last])
+
+    return [
+        (first_row, first_col, [[cell(current, r, c) for c in range(first_col, last_col + 1)] for r in range(first_row, last_row + 1)])
+        for first_row, last_row, first_col, last_col in spans
+    ]
+
+
+def load_sheet_snapshot(path, spreadsheet_id, sheet_id):
+    """Values last written to the tab, or None if missing, for another tab, or too old to trust"""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            snapshot = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if snapshot.get('spreadsheet_id') != spreadsheet_id or snapshot.get('sheet_id') != sheet_id:
+        return None
+    age = datetime.now() - datetime.fromisoformat(snapshot['saved_at'])
+    if age.total_seconds() > HOURLY_SNAPSHOT_MAX_AGE_HOURS * 3600:
+        return None
+    return snapshot['values']
+
+
+def discard_sheet_snapshot(path):
+    """Forget the last written matrix, e.g. after another writer has replaced the tab"""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def save_sheet_snapshot(path, spreadsheet_id, sheet_id, values):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump({'spreadsheet_id': spreadsheet_id, 'sheet_id': sheet_id,
+                   'saved_at': datetime.now().isoformat(), 'values': values}, file)
+    os.replace(temporary_path, path)
+
+
+async def write_sheet_diff(spreadsheet, worksheet, data, snapshot_path, header_width=None):
+    """
+    Write `data` to the top-left of `worksheet`, sending only the cells that differ from the
+    previous run in one values.batchUpdate.
+
+    The previous state comes from the local snapshot, trusted only while the sheet's header row
+    still matches it (the nightly export rewrites the tab without the Last updated stamp); without
+    a usable one the tab is read once and only the area `data` covers is compared, so manual rows
+    or columns beyond it are kept. When the header shows the tab was rewritten by the nightly
+    export, everything on it is replaced.
+    Header styling and the frozen row are applied when the header changes. Returns the number
+    of cells written.
+    """
+    previous = load_sheet_snapshot(snapshot_path, spreadsheet.id, worksheet.id)
+    header_width = header_width or len(data[0])
+    rewritten = False
+    if previous is not None:
+        sheet_header = await run_sheets_call(worksheet.row_values, 1)
+        if sheet_header != (previous[0] if previous else []):
+            logger.info(f"Header row of {worksheet.title} no longer matches {snapshot_path}, ignoring the snapshot")
+            previous = None
+            rewritten = True
+    if previous is None:
+        previous = await run_sheets_call(worksheet.get_values)
+        clear_rows = clear_cols = 0
+        if rewritten:
+            # Rows beyond `data` came from the other writer, not from manual edits
+            clear_rows = len(previous)
+            clear_cols = max((len(row) for row in previous), default=0)
+        header_changed = True
+        logger.info(f"No usable snapshot for {worksheet.title}, diffing against the {len(previous)} rows on the sheet")
+    else:
+        clear_rows = len(previous)
+        clear_cols = max((len(row) for row in previous), default=0)
+        header_changed = previous[:1] == [] or previous[0][:header_width] != data[0][:header_width]
+
+    blocks = changed_blocks(previous, data, clear_rows, clear_cols)
+
+    needed_rows = max(len(data), clear_rows)
+    needed_cols = max(max(len(row) for row in data), clear_cols)
+    if needed_rows > worksheet.row_count or needed_cols > worksheet.col_count:
+        await run_sheets_call(worksheet.resize, rows=max(needed_rows, worksheet.row_count), cols=max(needed_cols, worksheet.col_count))
+
+    # Drop the snapshot first so a failed write makes the next run re-read the sheet
+    discard_sheet_snapshot(snapshot_path)
+
+    title = quote_sheet_title(worksheet.title)
+    value_ranges = []
+    cells = 0
+    for first_row, first_col, values in blocks:
+        start = gspread.utils.rowcol_to_a1(first_row + 1, first_col + 1)
+        end = gspread.utils.rowcol_to_a1(first_row + len(values), first_col + len(values[0]))
+        value_ranges.append({'range': f"{title}!{start}:{end}", 'values': values})
+        cells += len(values) * len(values[0])
+
+    if value_ranges:
+        await run_sheets_call(spreadsheet.values_batch_update, {'valueInputOption': 'RAW', 'data': value_ranges})
+
+    if header_changed:
+        header_range = f"A1:{gspread.utils.rowcol_to_a1(1, header_width)}"
+        await run_sheets_call(worksheet.format, header_range, HEADER_FORMAT)
+        await run_sheets_call(worksheet.freeze, rows=1)
+
+    save_sheet_snapshot(snapshot_path, spreadsheet.id, worksheet.id, data)
+    logger.info(f"Diff write to {worksheet.title}: {cells} cells in {len(value_ranges)} ranges "
+                f"({sum(len(row) for row in data)} cells in the table)")
+    return cells
+
+
 async def compare_player_urls(scraped_players_data, reference_urls):
     try:
         scraped_urls = []
@@ -94,89 +440,30 @@ async def compare_player_urls(scraped_players_data, reference_urls):
 
 async def save_players_to_google_sheets(players_result: Dict, client_email: str = None):
     try:
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive',
-        ]
-
-        creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
-        client = gspread.authorize(creds)
+        client = await get_sheets_client()
 
         # Open existing spreadsheet
-        spreadsheet = client.open_by_key(ADDITIONAL_PLAYER_SPREADSHEET_ID)
+        spreadsheet = await run_sheets_call(client.open_by_key, ADDITIONAL_PLAYER_SPREADSHEET_ID)
 
         timestamp = datetime.now(ZoneInfo("Europe/Copenhagen")).strftime("%Y-%m-%d_%H:%M:%S")
         spreadsheet_name = f"Latest_Players_Stats_{timestamp}"
-        spreadsheet.update_title(spreadsheet_name)
+        writer = SheetBatchWriter(spreadsheet)
+        writer.set_title(spreadsheet_name)
 
-        def format_dataframe_for_sheets(df):
-            if df.empty:
-                return []
-
-            headers = df.columns.tolist()
-            data_rows = []
-
-            for _, row in df.iterrows():
-                row_data = []
-                for value in row:
-                    if pd.isna(value):
-                        row_data.append('')
-                    elif isinstance(value, (int, float)) and value == 0:
-                        row_data.append('0')  # Ensure 0 is stored as plain text
-                    else:
-                        row_data.append(str(value))
-                data_rows.append(row_data)
-
-            return [headers] + data_rows
-
-        def column_number_to_letter(col_num):
-            """Convert column number to Excel-style column letters (1=A, 26=Z, 27=AA, etc.)"""
-            result = ""
-            while col_num > 0:
-                col_num -= 1  # Make it 0-indexed
-                result = chr(65 + (col_num % 26)) + result
-                col_num //= 26
-            return result
-
-        def format_worksheet(worksheet, data):
-            """Format worksheet with headers, freeze, and auto-adjust columns and rows"""
-            if not data:
-                return
-
-            # Clear and update data
-            worksheet.clear()
-            worksheet.update('A1', data, value_input_option='RAW')  # Use RAW to prevent formatting
-
-            # Format headers (gray background and bold) but avoid underlining
-            header_range = f'A1:{column_number_to_letter(len(data[0]))}1'
-            worksheet.format(header_range, {
+        # Players tabs keep RAW values, a plain body and columns sized to their content
+        sheet_style = {
+            'header_format': {
                 'textFormat': {'bold': True, 'underline': False},  # Explicitly disable underline
                 'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-            })
-
-            # Clear any formatting from data rows to remove underlining
-            if len(data) > 1:
-                data_range = f'A2:{column_number_to_letter(len(data[0]))}{len(data)}'
-                worksheet.format(data_range, {
-                    'textFormat': {'underline': False, 'bold': False},  # Clear formatting
-                    'backgroundColor': {'red': 1.0, 'green': 1.0, 'blue': 1.0}  # White background
-                })
-
-            # Freeze header row
-            worksheet.freeze(rows=1)
-
-            # Auto-resize columns
-            worksheet.columns_auto_resize(0, len(data[0]) - 1)
-
-            # Auto-resize rows (adjust height based on content)
-            worksheet.rows_auto_resize(0, len(data) - 1)
-
-        def create_or_get_worksheet(spreadsheet, sheet_name):
-            """Create a new worksheet or get existing one"""
-            try:
-                return spreadsheet.worksheet(sheet_name)
-            except gspread.WorksheetNotFound:
-                return spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=26)
+            },
+            'body_format': {
+                'textFormat': {'underline': False, 'bold': False},  # Clear formatting
+                'backgroundColor': {'red': 1.0, 'green': 1.0, 'blue': 1.0}  # White background
+            },
+            'resize_columns': True,
+            'min_rows': 1000,
+            'min_cols': 26,
+        }
 
         # Store team_league data for later use
         team_league_df = None
@@ -239,10 +526,8 @@ async def save_players_to_google_sheets(players_result: Dict, client_email: str
                     team_league_df['number_team_ids'] = 0
                     team_league_df['team_ids'] = ''
 
-                team_league_sheet = create_or_get_worksheet(spreadsheet, 'team_league')
-                team_league_data = format_dataframe_for_sheets(team_league_df)
-                format_worksheet(team_league_sheet, team_league_data)
-                await asyncio.sleep(1)
+                team_league_data = dataframe_to_sheet_values(team_league_df, zero_as_text=True)
+                writer.add_sheet('team_league', team_league_data, **sheet_style)
                 logger.info(f"Team League sheet created with columns: {list(team_league_df.columns)}")
 
             # 3rd sheet: ranking_name (only players with ranking name values)
@@ -294,36 +579,28 @@ async def save_players_to_google_sheets(players_result: Dict, client_email: str
                         ranking_df = pd.DataFrame(ranking_df_data)
                         ranking_df = ranking_df.drop_duplicates(subset=['rankedIn_id'])
 
-                        ranking_sheet = create_or_get_worksheet(spreadsheet, 'ranking_position_men_db')
-                        ranking_data = format_dataframe_for_sheets(ranking_df)
-                        format_worksheet(ranking_sheet, ranking_data)
-                        await asyncio.sleep(1)
+                        ranking_data = dataframe_to_sheet_values(ranking_df, zero_as_text=True)
+                        writer.add_sheet('ranking_position_men_db', ranking_data, **sheet_style)
 
                         ranking_count = len(ranking_df)
                         logger.info(f"Ranking sheet created with {ranking_count} players")
                     else:
                         ranking_count = 0
                         # Create empty sheet
-                        ranking_sheet = create_or_get_worksheet(spreadsheet, 'ranking_position_men_db')
-                        ranking_sheet.clear()
-                        ranking_sheet.update('A1', [['No ranking columns found']], value_input_option='RAW')
+                        writer.add_sheet('ranking_position_men_db', [['No ranking columns found']], header_format=None, min_rows=1000, min_cols=26)
                 else:
                     ranking_count = 0
                     # Create empty sheet
-                    ranking_sheet = create_or_get_worksheet(spreadsheet, 'ranking_position_men_db')
-                    ranking_sheet.clear()
-                    ranking_sheet.update('A1', [['No players with ranking data found']], value_input_option='RAW')
+                    writer.add_sheet('ranking_position_men_db', [['No players with ranking data found']], header_format=None, min_rows=1000, min_cols=26)
             else:
                 ranking_count = 0
                 # Create empty sheet
-                ranking_sheet = create_or_get_worksheet(spreadsheet, 'ranking_position_men_db')
-                ranking_sheet.clear()
-                ranking_sheet.update('A1', [['No ranking columns available']], value_input_option='RAW')
+                writer.add_sheet('ranking_position_men_db', [['No ranking columns available']], header_format=None, min_rows=1000, min_cols=26)
 
             # Final check: Create/update players_table sheet with team_ids and number_team_ids
             try:
-                players_table_sheet = spreadsheet.worksheet('players_table')
-                players_table_data = players_table_sheet.get_all_records()
+                players_table_sheet = await run_sheets_call(spreadsheet.worksheet, 'players_table')
+                players_table_data = await run_sheets_call(players_table_sheet.get_all_records)
 
                 if players_table_data:
                     # Convert to DataFrame
@@ -382,9 +659,8 @@ async def save_players_to_google_sheets(players_result: Dict, client_email: str
                             logger.info(f"Removed {original_count - deduplicated_count} duplicate records from players_table")
 
                         # Update the players_table sheet with the modified data
-                        players_table_data_formatted = format_dataframe_for_sheets(players_table_df)
-                        format_worksheet(players_table_sheet, players_table_data_formatted)
-                        await asyncio.sleep(1)
+                        players_table_data_formatted = dataframe_to_sheet_values(players_table_df, zero_as_text=True)
+                        writer.add_sheet('players_table', players_table_data_formatted, **sheet_style)
 
                         logger.info(f"Updated players_table sheet with team_ids and number_team_ids columns")
                         logger.info(f"Players table now has {len(players_table_df)} rows and columns: {list(players_table_df.columns)}")
@@ -401,10 +677,14 @@ async def save_players_to_google_sheets(players_result: Dict, client_email: str
             except Exception as e:
                 logger.error(f"Error processing players_table sheet: {str(e)}")
 
+        # Commit every tab in one formatting batch and one values batch
+        await writer.commit(delete_empty_default=False)
+
         # Share spreadsheet if email provided
         if client_email:
             try:
-                spreadsheet.share(
+                await run_sheets_call(
+                    spreadsheet.share,
                     client_email,
                     perm_type="user",
                     role="writer",
@@ -434,26 +714,20 @@ async def load_config_from_sheets():
     """
     try:
         # Set up Google Sheets connection
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive',
-        ]
-
-        creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
-        client = gspread.authorize(creds)
+        client = await get_sheets_client()
 
         # Open the configuration spreadsheet
-        spreadsheet = client.open_by_key(WRITE_SPREADSHEET_ID)
+        spreadsheet = await run_sheets_call(client.open_by_key, WRITE_SPREADSHEET_ID)
 
         # Assuming your config data is in a sheet named 'Config' or 'Sheet1'
         # Adjust the sheet name based on your actual setup
         try:
-            worksheet = spreadsheet.worksheet('Rounds')  # Try 'Config' first
+            worksheet = await run_sheets_call(spreadsheet.worksheet, 'Rounds')  # Try 'Config' first
         except gspread.exceptions.WorksheetNotFound:
-            worksheet = spreadsheet.worksheet('Sheet1')  # Fallback to 'Sheet1'
+            worksheet = await run_sheets_call(spreadsheet.worksheet, 'Sheet1')  # Fallback to 'Sheet1'
 
         # Get all data from the sheet
-        data = worksheet.get_all_records()
+        data = await run_sheets_call(worksheet.get_all_records)
 
         if not data:
             raise ValueError("No data found in configuration sheet")
@@ -473,7 +747,10 @@ async def load_config_from_sheets():
         config_data = {
             'Team_ID_Home': safe_to_list(df.get('Team_ID_Home', df.get('Home_Team_ID', []))),
             'Team_ID_Away': safe_to_list(df.get('Team_ID_Away', df.get('Away_Team_ID', []))),
-            'Match ID': safe_to_list(df.get('Match ID', df.get('Match ID', [])))
+            'Match ID': safe_to_list(df.get('Match ID', df.get('Match ID', []))),
+            # Round date/time per row, used by the hourly job to find matches near their start time
+            'Date': safe_to_list(df.get('Date', [])),
+            'Time': safe_to_list(df.get('Time', []))
         }
 
         logger.info(f"Loaded config data: {len(config_data['Team_ID_Home'])} home teams, "
@@ -489,19 +766,13 @@ async def load_config_from_sheets():
 
 async def load_league_pool_combinations_from_google_sheets(start_index=None, end_index=None):
     try:
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive'
-        ]
-
-        creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
-        client = gspread.authorize(creds)
+        client = await get_sheets_client()
 
         # Open by spreadsheet ID
-        spreadsheet = client.open_by_key(LOAD_SPREADSHEET_ID)
-        worksheet = spreadsheet.worksheet('team_league_id&pool_id')
+        spreadsheet = await run_sheets_call(client.open_by_key, LOAD_SPREADSHEET_ID)
+        worksheet = await run_sheets_call(spreadsheet.worksheet, 'team_league_id&pool_id')
 
-        values = worksheet.get('A:B')
+        values = await run_sheets_call(worksheet.get, 'A:B')
 
         data_rows = values[1:] if len(values) > 0 and isinstance(values[0], list) else values
         df = pd.DataFrame(data_rows, columns=['col1', 'col2'])
@@ -550,295 +821,17 @@ async def load_league_pool_combinations_from_google_sheets(start_index=None, end
 
 async def save_batch_to_google_sheets(batch_data: Dict, client_email: str = None):
     try:
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive',
-        ]
-
-        creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
-        client = gspread.authorize(creds)
+        client = await get_sheets_client()
 
         # Open existing spreadsheet
-        spreadsheet = client.open_by_key(WRITE_SPREADSHEET_ID)
+        spreadsheet = await run_sheets_call(client.open_by_key, WRITE_SPREADSHEET_ID)
 
         team_id = batch_data.get("standings")[0].get("season_id") if batch_data.get("standings") else "Unknown"
-        division_name = await division_name_call(team_id) if team_id != "Unknown" else "Unknown_Division"
+        division_name = batch_data.get('division_names', {}).get(str(team_id)) or "Unknown_Division"
         timestamp = datetime.now(ZoneInfo("Europe/Copenhagen")).strftime("%Y-%m-%d_%H:%M:%S")
         spreadsheet_name = f"{division_name}_{timestamp}"
-        spreadsheet.update_title(spreadsheet_name)
-
-        def format_dataframe_for_sheets(df):
-            if df.empty:
-                return []
-
-            headers = df.columns.tolist()
-            data_rows = []
-
-            for _, row in df.iterrows():
-                row_data = []
-                for value in row:
-                    if pd.isna(value):
-                        row_data.append('')
-                    else:
-                        row_data.append(str(value))
-                data_rows.append(row_data)
-
-            return [headers] + data_rows
-
-        def expand_matches_to_7_rows(matches_df):
-            """
-            Ensure each Round_ID has exactly 7 rows total.
-            For each Round_ID, ALL 7 rows will have the same Team_Home_ID_Matches and Team_Away_ID_Matches values.
-            If a Round_ID has fewer than 7 rows, add empty rows to reach exactly 7.
-            If a Round_ID has more than 7 rows, keep only the first 7 rows.
-            """
-            if matches_df.empty:
-                return matches_df
-
-            if 'Round_ID' not in matches_df.columns:
-                logger.warning("Round_ID column not found, returning original DataFrame")
-                return matches_df
-
-            logger.info("Starting round processing to exactly 7 rows per Round_ID with consistent Team IDs")
-            logger.info(f"Available columns: {matches_df.columns.tolist()}")
-
-            # Find the correct column names for Team IDs (handle different naming variations)
-            team_home_col = None
-            team_away_col = None
-
-            possible_home_names = ['Team_Home_ID_Matches', 'Team_ID_Home_Matches', 'Team_Home_ID', 'Home_Team_ID']
-            possible_away_names = ['Team_Away_ID_Matches', 'Team_ID_Away_Matches', 'Team_Away_ID', 'Away_Team_ID']
-
-            for col in matches_df.columns:
-                if col in possible_home_names:
-                    team_home_col = col
-                if col in possible_away_names:
-                    team_away_col = col
-
-            logger.info(f"Found Team Home column: {team_home_col}")
-            logger.info(f"Found Team Away column: {team_away_col}")
-
-            # Group by Round_ID to identify unique rounds
-            round_counts = matches_df['Round_ID'].value_counts()
-            logger.info(f"Found {len(round_counts)} unique Round_IDs")
-
-            expanded_rows = []
-            rounds_expanded = 0
-            rounds_trimmed = 0
-            rows_added = 0
-            rows_removed = 0
-
-            for round_id in matches_df['Round_ID'].unique():
-                round_matches = matches_df[matches_df['Round_ID'] == round_id]
-                current_count = len(round_matches)
-
-                # Get the template row (first row) to extract consistent values
-                template_row = round_matches.iloc[0].copy()
-
-                # Extract the consistent values that should be the same for all rows in this Round_ID
-                consistent_values = {
-                    'season_id': template_row.get('season_id', ''),
-                    'pool_id': template_row.get('pool_id', ''),
-                    'Round_ID': round_id,
-                }
-
-                # Add team ID values if columns exist
-                if team_home_col:
-                    consistent_values[team_home_col] = template_row.get(team_home_col, '')
-                if team_away_col:
-                    consistent_values[team_away_col] = template_row.get(team_away_col, '')
-
-                logger.debug(f"Round_ID {round_id}: Consistent values = {consistent_values}")
-
-                if current_count < 7:
-                    # First, add existing rows but ensure they have consistent Team IDs
-                    for _, row in round_matches.iterrows():
-                        updated_row = row.copy()
-                        # Ensure consistent values for all rows in this Round_ID
-                        for key, value in consistent_values.items():
-                            if key in updated_row.index:
-                                updated_row[key] = value
-                        expanded_rows.append(updated_row)
-
-                    # Add empty rows to reach exactly 7 total
-                    rows_to_add = 7 - current_count
-                    for i in range(rows_to_add):
-                        new_row = template_row.copy()
-
-                        # Set consistent values first
-                        for key, value in consistent_values.items():
-                            if key in new_row.index:
-                                new_row[key] = value
-
-                        # Clear all other columns except the consistent ones
-                        preserve_columns = list(consistent_values.keys())
-                        for col in new_row.index:
-                            if col not in preserve_columns:
-                                new_row[col] = ''
-
-                        expanded_rows.append(new_row)
-
-                    rounds_expanded += 1
-                    rows_added += rows_to_add
-                    logger.debug(f"Round_ID {round_id}: Had {current_count} rows, added {rows_to_add} empty rows to reach 7 total")
-
-                elif current_count == 7:
-                    # Perfect - add all 7 rows but ensure consistent Team IDs
-                    for _, row in round_matches.iterrows():
-                        updated_row = row.copy()
-                        # Ensure consistent values for all rows in this Round_ID
-                        for key, value in consistent_values.items():
-                            if key in updated_row.index:
-                                updated_row[key] = value
-                        expanded_rows.append(updated_row)
-                    logger.debug(f"Round_ID {round_id}: Already has exactly 7 rows")
-
-                else:
-                    # More than 7 rows - keep only the first 7 but ensure consistent Team IDs
-                    for i, (_, row) in enumerate(round_matches.iterrows()):
-                        if i < 7:
-                            updated_row = row.copy()
-                            # Ensure consistent values for all rows in this Round_ID
-                            for key, value in consistent_values.items():
-                                if key in updated_row.index:
-                                    updated_row[key] = value
-                            expanded_rows.append(updated_row)
-                        else:
-                            break
-
-                    rounds_trimmed += 1
-                    rows_removed += (current_count - 7)
-                    logger.debug(f"Round_ID {round_id}: Had {current_count} rows, trimmed to 7 rows (removed {current_count - 7} rows)")
-
-            logger.info(f"Processed {len(round_counts)} rounds: expanded {rounds_expanded} rounds (added {rows_added} rows), trimmed {rounds_trimmed} rounds (removed {rows_removed} rows)")
-
-            if expanded_rows:
-                expanded_df = pd.DataFrame(expanded_rows)
-
-                # Final verification - log a sample of the results
-                if not expanded_df.empty:
-                    sample_round = expanded_df['Round_ID'].iloc[0]
-                    sample_data = expanded_df[expanded_df['Round_ID'] == sample_round]
-                    logger.info(f"Sample verification for Round_ID {sample_round}:")
-                    for col in [team_home_col, team_away_col]:
-                        if col and col in sample_data.columns:
-                            unique_values = sample_data[col].unique()
-                            logger.info(f"  {col}: {unique_values} (should have only 1 unique value)")
-
-                return expanded_df.reset_index(drop=True)
-            else:
-                return matches_df
-
-        def remove_empty_rows(df):
-            """
-            Remove empty/placeholder rows that were created during expansion.
-            Removes rows that only have basic identifier columns filled but no actual match data.
-            Only preserves rows that have meaningful match/player data beyond the basic identifiers.
-            """
-            if df.empty:
-                return df
-
-            initial_count = len(df)
-            logger.info(f"Starting empty row removal with {initial_count} rows")
-
-            # Find the correct column names for Team IDs (handle different naming variations)
-            team_home_col = None
-            team_away_col = None
-
-            possible_home_names = ['Team_Home_ID_Matches', 'Team_ID_Home_Matches', 'Team_Home_ID', 'Home_Team_ID']
-            possible_away_names = ['Team_Away_ID_Matches', 'Team_ID_Away_Matches', 'Team_Away_ID', 'Away_Team_ID']
-
-            for col in df.columns:
-                if col in possible_home_names:
-                    team_home_col = col
-                if col in possible_away_names:
-                    team_away_col = col
-
-            # Define basic identifier columns that don't count as "meaningful data"
-            basic_identifier_columns = ['season_id', 'pool_id', 'Round_ID']
-            if team_home_col:
-                basic_identifier_columns.append(team_home_col)
-            if team_away_col:
-                basic_identifier_columns.append(team_away_col)
-
-            # Define data columns that indicate this is a real match row with actual data
-            meaningful_data_columns = []
-            for col in df.columns:
-                if col not in basic_identifier_columns:
-                    meaningful_data_columns.append(col)
-
-            logger.info(f"Basic identifier columns: {basic_identifier_columns}")
-            logger.info(f"Meaningful data columns to check: {len(meaningful_data_columns)} columns")
-
-            # Identify rows to keep: only rows that have meaningful data beyond basic identifiers
-            rows_to_keep = []
-            empty_rows_removed = 0
-
-            for idx, row in df.iterrows():
-                # Check if this row has any meaningful data beyond basic identifiers
-                has_meaningful_data = False
-
-                # Check meaningful data columns for actual content
-                for col in meaningful_data_columns:
-                    value = row[col]
-                    if pd.notna(value) and str(value).strip() != '':
-                        has_meaningful_data = True
-                        break
-
-                if has_meaningful_data:
-                    rows_to_keep.append(idx)
-                else:
-                    empty_rows_removed += 1
-                    logger.debug(f"Removing row with only basic identifiers - Round_ID: {row.get('Round_ID', 'Unknown')}")
-
-            # Keep only rows with meaningful data beyond basic identifiers
-            df_cleaned = df.loc[rows_to_keep].copy()
-
-            final_count = len(df_cleaned)
-            logger.info(f"Removed {empty_rows_removed} rows with only basic identifiers, {final_count} rows remaining")
-
-            return df_cleaned.reset_index(drop=True)
-
-        def format_worksheet_preserve_manual(worksheet, data):
-            """
-            Only updates the automated data section, preserves manual additions
-            """
-            if not data:
-                return
-
-            def column_number_to_letter(col_num):
-                """Convert column number to Excel-style column letters (1=A, 26=Z, 27=AA, etc.)"""
-                result = ""
-                while col_num > 0:
-                    col_num -= 1  # Make it 0-indexed
-                    result = chr(65 + (col_num % 26)) + result
-                    col_num //= 26
-                return result
-
-            # Clear existing data and update with new data
-            worksheet.clear()
-            if data:
-                worksheet.update('A1', data)
-
-            # Format headers
-            header_range = f'A1:{column_number_to_letter(len(data[0]))}1'
-            worksheet.format(header_range, {
-                'textFormat': {'bold': True},
-                'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-            })
-            worksheet.freeze(rows=1)
-
-        def get_or_create_sheet(title, rows=100, cols=20):
-            try:
-                return spreadsheet.worksheet(title)
-            except gspread.exceptions.WorksheetNotFound:
-                return spreadsheet.add_worksheet(title=title, rows=rows, cols=cols)
-
-        # Get list of sheets that should NOT be deleted (manual sheets)
-        AUTOMATED_SHEETS = ['Standings', 'Rounds', 'Matches', 'Organizations', 'Executive Summary', 'Sheet1']
-
-        # Keep track of sheets we've created/updated
-        sheets_created = []
+        writer = SheetBatchWriter(spreadsheet)
+        writer.set_title(spreadsheet_name)
 
         # Save Standings
         if batch_data.get('standings'):
@@ -850,11 +843,8 @@ async def save_batch_to_google_sheets(batch_data: Dict, client_email: str = None
                 cols = ['season_id', 'pool_id'] + cols
                 standings_df = standings_df[cols]
 
-            standings_sheet = get_or_create_sheet('Standings')
-            sheets_created.append('Standings')
-            standings_data = format_dataframe_for_sheets(standings_df)
-            format_worksheet_preserve_manual(standings_sheet, standings_data)
-            await asyncio.sleep(1)
+            standings_data = dataframe_to_sheet_values(standings_df)
+            writer.add_sheet('Standings', standings_data)
 
         # Save Rounds
         if batch_data.get('rounds'):
@@ -866,11 +856,8 @@ async def save_batch_to_google_sheets(batch_data: Dict, client_email: str = None
                 cols = ['season_id', 'pool_id'] + cols
                 rounds_df = rounds_df[cols]
 
-            rounds_sheet = get_or_create_sheet('Rounds')
-            sheets_created.append('Rounds')
-            rounds_data = format_dataframe_for_sheets(rounds_df)
-            format_worksheet_preserve_manual(rounds_sheet, rounds_data)
-            await asyncio.sleep(1)
+            rounds_data = dataframe_to_sheet_values(rounds_df)
+            writer.add_sheet('Rounds', rounds_data)
 
         # Save Matches - WITH EXPANSION TO 7 ROWS
         if batch_data.get('matches'):
@@ -897,11 +884,8 @@ async def save_batch_to_google_sheets(batch_data: Dict, client_email: str = None
                 if matches_df[col].isna().all() or (matches_df[col] == '').all():
                     matches_df = matches_df.drop(columns=[col])
 
-            matches_sheet = get_or_create_sheet('Matches')
-            sheets_created.append('Matches')
-            matches_data = format_dataframe_for_sheets(matches_df)
-            format_worksheet_preserve_manual(matches_sheet, matches_data)
-            await asyncio.sleep(1)
+            matches_data = dataframe_to_sheet_values(matches_df)
+            writer.add_sheet('Matches', matches_data)
 
         # Save Organizations
         if batch_data.get('organizations'):
@@ -913,11 +897,8 @@ async def save_batch_to_google_sheets(batch_data: Dict, client_email: str = None
                 cols = ['season_id', 'pool_id'] + cols
                 organizations_df = organizations_df[cols]
 
-            orgs_sheet = get_or_create_sheet('Organizations')
-            sheets_created.append('Organizations')
-            orgs_data = format_dataframe_for_sheets(organizations_df)
-            format_worksheet_preserve_manual(orgs_sheet, orgs_data)
-            await asyncio.sleep(1)
+            orgs_data = dataframe_to_sheet_values(organizations_df)
+            writer.add_sheet('Organizations', orgs_data)
 
         # Executive Summary
         summary_data = [
@@ -933,28 +914,26 @@ async def save_batch_to_google_sheets(batch_data: Dict, client_email: str = None
             ['Total Final Organizations Records', str(len(batch_data.get('organizations', [])))],
             ['Report Generated', datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
         ]
+        summary_data += [[metric, str(value)] for metric, value in degraded_endpoint_summary_rows(batch_data)]
+
+        writer.add_sheet('Executive Summary', summary_data)
 
-        summary_sheet = get_or_create_sheet('Executive Summary')
-        sheets_created.append('Executive Summary')
-        format_worksheet_preserve_manual(summary_sheet, summary_data)
-        await asyncio.sleep(1)
+        # All tabs go out in one formatting batch and one values batch; Sheet1 is dropped if empty
+        await writer.commit()
 
-        # Delete Sheet1 only if we have created other sheets AND it's empty/default
-        if sheets_created:
+        # Matches was just replaced in the nightly layout; record it so the next hourly diff starts from it
+        if 'Matches' in writer.tabs:
             try:
-                default_sheet = spreadsheet.worksheet("Sheet1")
-                sheet_data = default_sheet.get_all_values()
-                if not sheet_data or (len(sheet_data) == 1 and not any(sheet_data[0])):
-                    spreadsheet.del_worksheet(default_sheet)
-                    logger.info("Deleted empty default Sheet1")
-                else:
-                    logger.info("Preserved Sheet1 as it contains data")
-            except gspread.exceptions.WorksheetNotFound:
-                pass
+                matches_sheet = await run_sheets_call(spreadsheet.worksheet, 'Matches')
+                save_sheet_snapshot(HOURLY_SHEET_SNAPSHOT, spreadsheet.id, matches_sheet.id, writer.tabs['Matches']['data'])
+            except Exception as e:
+                logger.info(f"Could not record the Matches snapshot, the hourly job will re-read the tab: {str(e)}")
+                discard_sheet_snapshot(HOURLY_SHEET_SNAPSHOT)
 
         if client_email:
             try:
-                spreadsheet.share(
+                await run_sheets_call(
+                    spreadsheet.share,
                     client_email,
                     perm_type="user",
                     role="writer",
@@ -974,74 +953,9 @@ async def save_batch_to_google_sheets(batch_data: Dict, client_email: str = None
 
 async def save_hourly_matches_only_to_google_sheets(matches_data: list, client_email: str = None):
     try:
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive',
-        ]
+        client = await get_sheets_client()
 
-        creds = Credentials.from_service_account_file('credentials.json', scopes = scope)
-        client = gspread.authorize(creds)
-
-        spreadsheet = client.open_by_key(WRITE_SPREADSHEET_ID)
-
-        def format_dataframe_for_sheets(df):
-            if df.empty:
-                return []
-
-            headers = df.columns.tolist()
-            data_rows = []
-
-            for _, row in df.iterrows():
-                row_data = []
-                for value in row:
-                    if pd.isna(value):
-                        row_data.append('')
-                    else:
-                        row_data.append(str(value))
-                data_rows.append(row_data)
-            return [headers] + data_rows
-
-        def column_number_to_letter(col_num):
-            result = ""
-            while col_num > 0:
-                col_num = 1
-                result = chr(65 + (col_num % 26)) + result
-                col_num //= 26
-            return result
-
-        def update_matches_sheet_only(worksheet, data):
-            if not data:
-                return
-
-            # Get existing data to check for manual additions
-            try:
-                existing_data = worksheet.get_all_values()
-                existing_rows = len(existing_data) if existing_data else 0
-                new_data_rows = len(data)
-
-                # Clear only the area where new data will be written
-                if existing_rows > 0:
-                    end_col = column_number_to_letter(len(data[0]) if data and data[0] else 'A')
-                    clear_range = f'A1:{end_col}{new_data_rows}'
-                    worksheet.batch_clear([clear_range])
-
-                # Write new data
-                worksheet.update('A1', data)
-
-                # If there were manual rows beyond the new data, they remain untouched
-                logger.info(f"Preserved {max(0, existing_rows - new_data_rows)} manual rows in Matches sheet")
-            except Exception as e:
-                logger.info(f"Could not preserve manual data in Matches sheet: {str(e)}")
-                worksheet.clear()
-                worksheet.update('A1', data)
-
-            # Format headers
-            header_range = f"A1:{column_number_to_letter(len(data[0]))}1"
-            worksheet.format(header_range, {
-                'textFormat': {'bold': True},
-                'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-            })
-            worksheet.freeze(rows = 1)
+        spreadsheet = await run_sheets_call(client.open_by_key, WRITE_SPREADSHEET_ID)
 
         if matches_data:
             matches_df = pd.DataFrame(matches_data)
@@ -1061,20 +975,19 @@ async def save_hourly_matches_only_to_google_sheets(matches_data: list, client_e
 
             # Get or create Matches sheet
             try:
-                matches_sheet = spreadsheet.worksheet('Matches')
+                matches_sheet = await run_sheets_call(spreadsheet.worksheet, 'Matches')
             except gspread.exceptions.WorksheetNotFound:
-                matches_sheet = spreadsheet.add_worksheet(title = 'Matches', rows = 1000, cols = 30)
+                matches_sheet = await run_sheets_call(spreadsheet.add_worksheet, title = 'Matches', rows = 1000, cols = 30)
 
-            # Format and update the sheet
-            matches_data_formatted = format_dataframe_for_sheets(matches_df)
-            update_matches_sheet_only(matches_sheet, matches_data_formatted)
+            matches_data_formatted = dataframe_to_sheet_values(matches_df)
+            header_width = len(matches_data_formatted[0])
 
-            # Add timestamp to indicate last update
-            try:
-                timestamp = datetime.now(ZoneInfo('Europe/Copenhagen')).strftime('%Y-%m-%d %H:%M:%S')
-                matches_sheet.update('AA1', f'Lat updated: {timestamp}')
-            except Exception as e:
-                logger.info(f"Could not addd timestamp: {str(e)}")
+            # The last-updated stamp sits one blank column right of the header, so it never lands on a data column
+            timestamp = datetime.now(ZoneInfo('Europe/Copenhagen')).strftime('%Y-%m-%d %H:%M:%S')
+            matches_data_formatted[0] = matches_data_formatted[0] + ['', f'Last updated: {timestamp}']
+
+            # Only cells that changed since the previous run are sent
+            await write_sheet_diff(spreadsheet, matches_sheet, matches_data_formatted, HOURLY_SHEET_SNAPSHOT, header_width=header_width)
 
             logger.info(f"Successfully updated Matcehs sheet with {len(matches_data)} records at {timestamp}")
 
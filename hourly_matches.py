@@ -1,12 +1,17 @@
 from google_sheet_automation import load_config_from_sheets, save_hourly_matches_only_to_google_sheets
 from scraper import get_matches
-from tools import random_interval
+from tools import close_client_pool, close_response_cache, get_adaptive_limiter, CACHE_DIR
 from scraper import get_matches
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import zip_longest
 from zoneinfo import ZoneInfo
 import pandas as pd
+import hashlib
 import asyncio
 import logging
+import json
+import os
+import re
 
 
 logging.basicConfig(
@@ -16,7 +21,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def collect_matches_data_only(team_id_home, team_id_away, match_ids, batch_size, batch_delay):
+async def collect_matches_data_only(team_id_home, team_id_away, match_ids, batch_size):
     
     logger.info("Starting hourly matches data collection with batched processing...")
 
@@ -24,7 +29,7 @@ async def collect_matches_data_only(team_id_home, team_id_away, match_ids, batch
     team_match_tuples = list(zip(team_id_home, team_id_away, match_ids))
     total_matches = len(team_match_tuples)
     
-    logger.info(f"Processing {total_matches} matches in batches of {batch_size} with {batch_delay}s delay between batches")
+    logger.info(f"Processing {total_matches} matches in batches of {batch_size}")
 
     all_matches = []
     successful_batches = 0
@@ -71,11 +76,6 @@ async def collect_matches_data_only(team_id_home, team_id_away, match_ids, batch
             logger.error(f"Critical error in batch {batch_num}: {e}")
             failed_requests += len(batch_tasks)
 
-        # Add delay between batches (except for the last batch)
-        if i + batch_size < total_matches:
-            logger.info(f"Waiting {int(batch_delay)}s before next batch...")
-            await asyncio.sleep(batch_delay)
-
     # Log final statistics
     success_rate = (successful_batches / ((total_matches + batch_size - 1) // batch_size)) * 100 if total_matches > 0 else 0
     logger.info(f"Hourly matches data collection completed!")
@@ -86,6 +86,198 @@ async def collect_matches_data_only(team_id_home, team_id_away, match_ids, batch
     return all_matches
     
 
+# Incremental mode only re-fetches matches that can still change; 'full' re-fetches every Match ID
+HOURLY_MODE = os.getenv('HOURLY_MODE', 'incremental')
+HOURLY_STATE_FILE = os.getenv('HOURLY_STATE_FILE', os.path.join(CACHE_DIR, 'hourly_matches_state.json'))
+HOURLY_WINDOW_BEFORE_HOURS = float(os.getenv('HOURLY_WINDOW_BEFORE_HOURS', 12))
+HOURLY_WINDOW_AFTER_HOURS = float(os.getenv('HOURLY_WINDOW_AFTER_HOURS', 6))
+HOURLY_OUTSIDE_WINDOW_REFRESH_HOURS = float(os.getenv('HOURLY_OUTSIDE_WINDOW_REFRESH_HOURS', 24))
+# Finished matches keep being re-fetched this long after they first look finished, to pick up corrections
+HOURLY_FINISHED_RECHECK_HOURS = float(os.getenv('HOURLY_FINISHED_RECHECK_HOURS', 24))
+HOURLY_TIMEZONE = ZoneInfo('Europe/Copenhagen')
+
+
+def parse_round_datetime(date_value, time_value):
+    """Round date plus optional HH:MM start time from the Rounds sheet, or None if the date is unusable"""
+    date = pd.to_datetime(date_value, errors = 'coerce')
+    if pd.isna(date):
+        return None
+
+    moment = date.to_pydatetime()
+    start = re.match(r'\s*(\d{1,2})[:.](\d{2})', str(time_value or ''))
+    if start and moment.hour == 0 and moment.minute == 0:
+        moment = moment.replace(hour = int(start.group(1)) % 24, minute = int(start.group(2)))
+
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo = HOURLY_TIMEZONE)
+    return moment.astimezone(HOURLY_TIMEZONE)
+
+
+def round_times_by_match(config_data):
+    """Match ID -> scheduled round datetime, keyed the same way as the hourly state file"""
+    round_times = {}
+    for match_id, date_value, time_value in zip_longest(config_data.get('Match ID', []), config_data.get('Date', []), config_data.get('Time', [])):
+        try:
+            key = str(int(float(str(match_id).strip())))
+        except (ValueError, TypeError):
+            continue
+        round_times[key] = parse_round_datetime(date_value, time_value)
+    return round_times
+
+
+def match_is_finished(records):
+    """
+    A team match is finished once every individual match in it has a decided match-level result
+    (the sets won in MatchResult.Score), not just a first set with a winner
+    """
+    def decided(record):
+        first = str(record.get('First Participant Score', '')).strip()
+        second = str(record.get('Second Participant Score', '')).strip()
+        return first != '' and second != '' and first != second
+
+    return bool(records) and not is_placeholder(records) and all(decided(record) for record in records)
+
+
+def is_placeholder(records):
+    """get_matches returns a single row without a date or players when there is nothing (or an error)"""
+    return len(records) == 1 and not records[0].get('Date') and not records[0].get('home_player_1_name')
+
+
+def payload_hash(records):
+    return hashlib.sha1(json.dumps(records, sort_keys = True, default = str).encode('utf-8')).hexdigest()
+
+
+class HourlyMatchState:
+    """
+    Local record of every team match seen by the hourly job: completion status, payload hash,
+    the last rows returned by get_matches and when they were fetched.
+
+    Finished matches are served from here instead of the API, so the Matches sheet is still
+    written in full while only live fixtures are re-fetched.
+    """
+
+    def __init__(self, path = HOURLY_STATE_FILE):
+        self.path = path
+        self.matches = {}
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding = 'utf-8') as file:
+                self.matches = json.load(file).get('matches', {})
+        except FileNotFoundError:
+            self.matches = {}
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable hourly state file {self.path}: {e}")
+            self.matches = {}
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok = True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding = 'utf-8') as file:
+            json.dump({'matches': self.matches}, file, default = str)
+        os.replace(temporary_path, self.path)
+
+    def plan(self, team_match_tuples, round_times, now):
+        """
+        Split the configured matches into the ones to fetch now (in-window first, closest to now
+        first) and the ones whose stored rows are reused. Matches with no usable round date count
+        as in-window. Finished matches are still re-fetched while inside the window and for
+        HOURLY_FINISHED_RECHECK_HOURS after they first counted as finished.
+        """
+        window_start = now - timedelta(hours = HOURLY_WINDOW_BEFORE_HOURS)
+        window_end = now + timedelta(hours = HOURLY_WINDOW_AFTER_HOURS)
+        stale_before = now - timedelta(hours = HOURLY_OUTSIDE_WINDOW_REFRESH_HOURS)
+        recheck_before = now - timedelta(hours = HOURLY_FINISHED_RECHECK_HOURS)
+
+        in_window, outside_window = [], []
+        counts = {'finished': 0, 'in_window': 0, 'recheck': 0, 'stale': 0, 'reused': 0}
+
+        for team_match in dict.fromkeys(team_match_tuples):
+            key = str(team_match[2])
+            entry = self.matches.get(key)
+            round_time = round_times.get(key)
+            if round_time is None or window_start <= round_time <= window_end:
+                distance = abs((round_time - now).total_seconds()) if round_time else 0
+                in_window.append((distance, team_match))
+                counts['in_window'] += 1
+            elif entry and entry.get('finished'):
+                finished_at = entry.get('finished_at') or entry['checked_at']
+                if datetime.fromisoformat(finished_at) >= recheck_before:
+                    outside_window.append(team_match)
+                    counts['recheck'] += 1
+                else:
+                    counts['finished'] += 1
+            elif entry is None or datetime.fromisoformat(entry['checked_at']) < stale_before:
+                outside_window.append(team_match)
+                counts['stale'] += 1
+            else:
+                counts['reused'] += 1
+
+        in_window.sort(key = lambda item: item[0])
+        logger.info(f"Incremental refresh: {counts['in_window']} matches in the window, {counts['recheck']} recently finished re-checked, "
+                    f"{counts['stale']} outside the window due a refresh, "
+                    f"{counts['finished']} finished and {counts['reused']} recently checked served from {self.path}")
+        return [team_match for _, team_match in in_window] + outside_window
+
+    def update(self, match_id, records, now):
+        """Store freshly fetched rows; returns True if the payload changed since the last fetch"""
+        key = str(match_id)
+        previous = self.matches.get(key)
+
+        # Don't replace real rows with the empty placeholder get_matches returns on errors
+        if previous and is_placeholder(records) and not is_placeholder(previous['records']):
+            logger.warning(f"Keeping stored rows for match {key}: fetch returned no match data")
+            return False
+
+        digest = payload_hash(records)
+        finished = match_is_finished(records)
+        # Keep the time a match first counted as finished so the re-check period doesn't restart
+        finished_at = None
+        if finished:
+            finished_at = previous.get('finished_at') if previous and previous.get('finished') else None
+            finished_at = finished_at or now.isoformat()
+
+        self.matches[key] = {
+            'finished': finished,
+            'finished_at': finished_at,
+            'hash': digest,
+            'records': records,
+            'checked_at': now.isoformat(),
+        }
+        return previous is None or previous.get('hash') != digest
+
+    def records(self, match_id):
+        entry = self.matches.get(str(match_id))
+        return entry['records'] if entry else []
+
+
+async def collect_matches_incrementally(team_id_home, team_id_away, match_ids, round_times, batch_size):
+    """
+    Fetch only matches that can still change (those near their round time first) and fill in the rest from
+    the local state, returning rows for every configured match in configuration order.
+    """
+    state = HourlyMatchState().load()
+    now = datetime.now(HOURLY_TIMEZONE)
+    team_match_tuples = list(zip(team_id_home, team_id_away, match_ids))
+
+    to_fetch = state.plan(team_match_tuples, round_times, now)
+    fetched = {}
+    if to_fetch:
+        home_ids, away_ids, fetch_ids = (list(column) for column in zip(*to_fetch))
+        for record in await collect_matches_data_only(home_ids, away_ids, fetch_ids, batch_size):
+            fetched.setdefault(str(record.get('Round_ID')), []).append(record)
+
+    changed = sum(state.update(match_id, records, now) for match_id, records in fetched.items())
+    state.save()
+    logger.info(f"Fetched {len(to_fetch)} of {len(set(team_match_tuples))} matches, {changed} with new or changed results")
+
+    all_matches = []
+    for _, _, match_id in team_match_tuples:
+        all_matches.extend(state.records(match_id))
+    return all_matches
+
+
 async def main():
     try:
         start_time = datetime.now(ZoneInfo('Europe/Copenhagen'))
@@ -135,8 +327,11 @@ async def main():
 
         # Collect only matches data
         batches = 5
-        random_delay = await random_interval(3)
-        matches_data = await collect_matches_data_only(team_id_home, team_id_away, match_ids,  batches, random_delay)
+        if HOURLY_MODE == 'full':
+            matches_data = await collect_matches_data_only(team_id_home, team_id_away, match_ids, batches)
+        else:
+            round_times = round_times_by_match(config_data)
+            matches_data = await collect_matches_incrementally(team_id_home, team_id_away, match_ids, round_times, batches)
 
         if not matches_data:
             logger.warning("No matches data collected")
@@ -160,6 +355,10 @@ async def main():
 
     except Exception as e:
         logger.error(f"Error in hourly matches update: {str(e)}")
+    finally:
+        (await get_adaptive_limiter()).log_stats()
+        await close_client_pool()
+        await close_response_cache()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 from google_sheet_automation import load_league_pool_combinations_from_google_sheets
 from automation import scrape_and_email_batch_tennis_data_with_player_comparison
+from tools import close_client_pool, close_response_cache
 from logger import setup_logger
 from dotenv import load_dotenv
+import argparse
 import asyncio
 import time
 import os
@@ -14,7 +16,7 @@ load_dotenv()
 CLIENT_EMAIL = os.getenv('CLIENT_EMAIL')
 
 
-async def main():
+async def main(resume = False):
     league_pool_combinations = await load_league_pool_combinations_from_google_sheets()
 
     recipients = [
@@ -24,16 +26,19 @@ async def main():
     cc_recipients = []
     bcc_recipients = []
 
-    success = await scrape_and_email_batch_tennis_data_with_player_comparison(
-        league_pool_combinations = league_pool_combinations,
-        recipients = recipients,
-        cc_emails = cc_recipients if cc_recipients else None,
-        bcc_emails = bcc_recipients if bcc_recipients else None,
-        client_email = CLIENT_EMAIL,
-        delay = 5,
-        batches = 5
-
-    )
+    try:
+        success = await scrape_and_email_batch_tennis_data_with_player_comparison(
+            league_pool_combinations = league_pool_combinations,
+            recipients = recipients,
+            cc_emails = cc_recipients if cc_recipients else None,
+            bcc_emails = bcc_recipients if bcc_recipients else None,
+            client_email = CLIENT_EMAIL,
+            max_concurrent = 5,
+            resume = resume,
+        )
+    finally:
+        await close_client_pool()
+        await close_response_cache()
 
     if success:
         logger.info("Complete workflow finished successfully!")
@@ -43,9 +48,14 @@ async def main():
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Scrape RankedIn leagues and email the batch report')
+    parser.add_argument('--resume', action = 'store_true',
+                        help = 'reuse checkpoints from the last failed run: skip scraped combinations and finished output stages')
+    args = parser.parse_args()
+
     start_time = time.time()
     try:
-        results = asyncio.run(main())
+        results = asyncio.run(main(resume = args.resume))
         logger.info(results)
         end_time = time.time()
         execution_time = round(end_time - start_time, 2)
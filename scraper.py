@@ -1,15 +1,60 @@
-from tools import make_requests, random_useragent, random_interval, convert_unix_timestamp
+from tools import make_requests, random_interval, register_request_profile, request_headers, REQUEST_PROFILES, convert_unix_timestamp, RunMemo, RetryPolicy, RetryableError, StructuralError, RetryDeferred, CircuitOpenError, get_circuit_breaker, reset_circuit_breakers, degraded_endpoints, degraded_endpoint_summary_rows, get_adaptive_limiter, expand_matches_to_7_rows, remove_empty_rows, write_excel_workbook
+from database import DATABASE_ENABLED, store_batch_data
 from logger import setup_logger
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from typing import Dict
 import pandas as pd
 import asyncio
+import time
 
 
 logger = asyncio.run(setup_logger('scraper'))
 
 
+# Run-wide memos of ranking and organisation lookups; the same player often plays for several
+# teams and pools, and many teams share a club
+ranking_memo = RunMemo('Player ranking')
+organisation_memo = RunMemo('Organisation')
+division_memo = RunMemo('Division metadata')
+players_retry = RetryPolicy('Team players')
+
+
+# Base headers per rankedin endpoint family, shared by every call
+API_HEADERS = {
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://rankedin.com/',
+    'Origin': 'https://rankedin.com',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-site',
+    'Connection': 'keep-alive',
+}
+
+register_request_profile('api', 'api.rankedin.com', API_HEADERS)
+register_request_profile('api_matches', 'api.rankedin.com', {**API_HEADERS, 'Accept-Language': 'en'})
+register_request_profile('api_search_landing', 'api.rankedin.com', {
+    **API_HEADERS,
+    'Accept': 'application/json',
+    'Referer': 'https://google.com',
+})
+register_request_profile('api_team_homepage', 'api.rankedin.com', {
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://rankedin.com/en/team/homepage/1764246',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin',
+    'Connection': 'keep-alive',
+})
+register_request_profile('web_team_homepage', 'rankedin.com', REQUEST_PROFILES['api_team_homepage'][1])
+register_request_profile('web', 'rankedin.com', {
+    **REQUEST_PROFILES['api_team_homepage'][1],
+    'Referer': 'https://rankedin.com/',
+})
+
+
 async def load_league_pool_combinations_from_excel(filename: str = 'team_pool_ids.xlsx'):
     """Load league-pool combinations from Excel file"""
     try:
@@ -22,46 +67,38 @@ async def load_league_pool_combinations_from_excel(filename: str = 'team_pool_id
         return []
 
 
-async def division_name_call(league_id):
-    headers = {
-    'User-Agent': await random_useragent(),
-    'Accept': 'application/json',
-    'Accept-Language': 'en-US,en;q=0.5',
-    'Referer': 'https://google.com',
-    'Origin': 'https://rankedin.com',
-    'Sec-Fetch-Dest': 'empty',
-    'Sec-Fetch-Mode': 'cors',
-    'Sec-Fetch-Site': 'same-site',
-    'Connection': 'keep-alive',
-    'Cookie': '__stripe_mid=6d617d98-f9ca-4fb0-b4f7-dfc799d68f5a760a87; ARRAffinity=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; ARRAffinitySameSite=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; __stripe_sid=82403c06-b751-47d8-8033-b26d3ee054a914a0bf',
-    }
+async def get_division_metadata(league_id):
+    headers = await request_headers('api_search_landing')
     api_url = f"https://api.rankedin.com/v1/metadata/GetFeatureMetadataAsync?feature=Teamleague&id={league_id}&rankedinId={league_id}&language=en"
     response = await make_requests(api_url, headers = headers)
 
-    division_name = response.json()['featureTitle']
-    return division_name
+    if response is None:
+        logger.warning(f"No division metadata received for league {league_id}")
+        return None
+
+    try:
+        return response.data['featureTitle']
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Unexpected division metadata for league {league_id}: {str(e)}")
+        return None
+
+
+async def division_name_call(league_id):
+    """
+    Division name for a team league, or None if it could not be fetched.
+    Fetched once per run; the metadata response is also kept between runs by the on-disk HTTP cache.
+    """
+    return await division_memo.get(str(league_id), lambda: get_division_metadata(league_id), cache_if=bool)
 
 
 """async def get_players_url_image(rankedin_id):
-    headers = {
-    'User-Agent': await random_useragent(),
-    'Accept': 'application/json, text/plain, */*',
-    'Accept-Language': 'en-US,en;q=0.5',
-    # 'Accept-Encoding': 'gzip, deflate, br, zstd',
-    'Referer': 'https://rankedin.com/',
-    'Origin': 'https://rankedin.com',
-    'Sec-Fetch-Dest': 'empty',
-    'Sec-Fetch-Mode': 'cors',
-    'Sec-Fetch-Site': 'same-site',
-    'Connection': 'keep-alive',
-    'Cookie': '__stripe_mid=d46b5b70-2201-4083-a2b9-cab70e0b697564e55a; ARRAffinity=4334255d9508d90d91675813fd4970201a6736e602b033e6fc00b5a23410f015; ARRAffinitySameSite=4334255d9508d90d91675813fd4970201a6736e602b033e6fc00b5a23410f015; __stripe_sid=21857c77-dc76-473b-8e42-691fba8f012cac3dff',
-    }
+    headers = await request_headers('api')
 
     api_url = f"https://api.rankedin.com/v1/metadata/GetFeatureMetadataAsync?feature=PlayerProfile&id=0&rankedinId={rankedin_id}&language=en"
 
     try:
         response = await make_requests(api_url, headers = headers)
-        raw_datas = response.json()
+        raw_datas = response.data
         image_url = raw_datas['featureImage']
         return image_url
     except Exception as e:
@@ -71,18 +108,7 @@ async def division_name_call(league_id):
 
 
 async def get_ranking_position_of_players(player_id):
-    headers = {
-        'User-Agent': await random_useragent(),
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://rankedin.com/',
-        'Origin': 'https://rankedin.com',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-site',
-        'Connection': 'keep-alive',
-        'Cookie': '__stripe_mid=16e922e5-5bf8-4bc4-bfdc-b3ed123707485e1815; ARRAffinity=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; ARRAffinitySameSite=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; __stripe_sid=16ce339f-872c-4086-9faa-30e6ed00222635a810',
-    }
+    headers = await request_headers('api')
 
     api_url = f"https://api.rankedin.com/v1/player/GetHistoricDataAsync?id={player_id}"
     target_ranking_name = "Dansk Padel Forbunds rangliste (Men-Main/MD)"
@@ -95,11 +121,8 @@ async def get_ranking_position_of_players(player_id):
             logger.warning(f"No response received for player {player_id}")
             return None, None, None
 
-        try:
-            ranking_position = response.json()
-        except Exception as json_error:
-            logger.warning(f"Failed to parse JSON for player {player_id}: {json_error}")
-            return None, None, None
+        # make_requests already decoded and validated the JSON body
+        ranking_position = response.data
 
         # Validate the ranking_position structure
         if ranking_position is None:
@@ -187,26 +210,41 @@ async def get_ranking_position_of_players(player_id):
         return None, None, None
 
 
+async def get_memoized_ranking_position(player_id):
+    """
+    Ranking lookup shared by every team in the run; concurrent lookups for one player make a single request.
+    Failed lookups (all None) are not remembered, so a later call can still fill the player in.
+    """
+    return await ranking_memo.get(
+        player_id,
+        lambda: get_ranking_position_of_players(player_id),
+        cache_if=lambda result: any(value is not None for value in result),
+    )
+
+
+async def get_memoized_organisation(team_id, org_id):
+    """
+    Organisation record for team_id, fetched once per organisation for the whole run and
+    fanned back out with this team's id in team_id_organisation
+    """
+    records = await organisation_memo.get(
+        str(org_id),
+        lambda: get_organisation_id(str(team_id), str(org_id)),
+        cache_if=bool,
+    )
+    return [{**record, 'team_id_organisation': str(team_id)} for record in records]
+
+
 async def get_players(season_id):
     """
     Enhanced get_players function that includes player image URLs
     """
-    headers = {
-        'User-Agent': await random_useragent(),
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://rankedin.com/en/team/homepage/1764246',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-origin',
-        'Connection': 'keep-alive',
-        'Cookie': 'ai_user=DFzEjMtcUnEUDoZhTMKlbQ^|2025-08-11T18:49:59.686Z; __stripe_mid=6d617d98-f9ca-4fb0-b4f7-dfc799d68f5a760a87; modal-ads={%22_playerId%22:null%2C%22_ads%22:[{%22_id%22:9%2C%22_lastAdDate%22:%220001-01-01%22}%2C{%22_id%22:10%2C%22_lastAdDate%22:%220001-01-01%22}%2C{%22_id%22:4%2C%22_lastAdDate%22:%222025-08-11%22}]}; ARRAffinity=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; ARRAffinitySameSite=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; language=en',
-    }
+    headers = await request_headers('web_team_homepage')
     url = f"https://rankedin.com/team/tlhomepage/{season_id}"
 
     try:
         response = await make_requests(url, headers=headers)
-        raw_datas = response.json()
+        raw_datas = response.data
         team_club_id = raw_datas['Team']['HomeClub']['Id']
         players_lists = raw_datas['Team']['Players']
         players_listings_dicts = []
@@ -225,7 +263,7 @@ async def get_players(season_id):
             logger.info(f"Collecting data for {len(player_ids)} players in season {season_id}...")
 
             # Create tasks for ranking positions
-            ranking_tasks = [get_ranking_position_of_players(player_id) for player_id in player_ids]
+            ranking_tasks = [get_memoized_ranking_position(player_id) for player_id in player_ids]
 
             # Run both sets of tasks concurrently
             logger.info("Fetching ranking positions and player images concurrently...")
@@ -289,23 +327,12 @@ async def get_players(season_id):
 
 
 async def get_matches(team_home_id, team_away_id, match_id):
-    headers = {
-    'User-Agent': await random_useragent(),
-    'Accept': 'application/json, text/plain, */*',
-    'Accept-Language': 'en',
-    'Referer': 'https://rankedin.com/',
-    'Origin': 'https://rankedin.com',
-    'Sec-Fetch-Dest': 'empty',
-    'Sec-Fetch-Mode': 'cors',
-    'Sec-Fetch-Site': 'same-site',
-    'Connection': 'keep-alive',
-    'Cookie': '__stripe_mid=6d617d98-f9ca-4fb0-b4f7-dfc799d68f5a760a87; ARRAffinity=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; ARRAffinitySameSite=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; __stripe_sid=aa3ba6e2-a1c9-455b-a683-db4f8de43628cd5ad6',
-    }
+    headers = await request_headers('api_matches')
     api_url = f"https://api.rankedin.com/v1/teamleague/GetTeamLeagueTeamsMatchesAsync?teamMatchId={str(match_id)}&language=en"
 
     try:
         response = await make_requests(api_url, headers=headers)
-        raw_datas = response.json()[0]['Matches']['Matches']
+        raw_datas = response.data[0]['Matches']['Matches']
         matches_listings_dicts = []
 
         for idx in range(len(raw_datas)):
@@ -509,23 +536,12 @@ async def get_matches(team_home_id, team_away_id, match_id):
 
 
 async def get_organisation_id(season_id, org_id, max_admins=None, max_logos=None):
-    headers = {
-    'User-Agent': await random_useragent(),
-    'Accept': 'application/json, text/plain, */*',
-    'Accept-Language': 'en-US,en;q=0.5',
-    'Referer': 'https://rankedin.com/',
-    'Origin': 'https://rankedin.com',
-    'Sec-Fetch-Dest': 'empty',
-    'Sec-Fetch-Mode': 'cors',
-    'Sec-Fetch-Site': 'same-site',
-    'Connection': 'keep-alive',
-    'Cookie': '__stripe_mid=6d617d98-f9ca-4fb0-b4f7-dfc799d68f5a760a87; ARRAffinity=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; ARRAffinitySameSite=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; __stripe_sid=aa3ba6e2-a1c9-455b-a683-db4f8de43628cd5ad6',
-    }
+    headers = await request_headers('api')
     api_url = f"https://api.rankedin.com/v1/organization/GetOrganizationInfoAsync/?organisationId={str(org_id)}&language=en"
 
     try:
         response = await make_requests(api_url, headers = headers)
-        raw_datas = response.json()
+        raw_datas = response.data
 
         contact_infos = raw_datas['contact']
         try:
@@ -628,18 +644,7 @@ async def get_standings_rounds_data(league_id, pool_id):
     """
     Get only standings and rounds data - no players/matches/organizations
     """
-    headers = {
-    'User-Agent': await random_useragent(),
-    'Accept': 'application/json',
-    'Accept-Language': 'en-US,en;q=0.5',
-    'Referer': 'https://google.com',
-    'Origin': 'https://rankedin.com',
-    'Sec-Fetch-Dest': 'empty',
-    'Sec-Fetch-Mode': 'cors',
-    'Sec-Fetch-Site': 'same-site',
-    'Connection': 'keep-alive',
-    'Cookie': '__stripe_mid=6d617d98-f9ca-4fb0-b4f7-dfc799d68f5a760a87; ARRAffinity=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; ARRAffinitySameSite=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; __stripe_sid=82403c06-b751-47d8-8033-b26d3ee054a914a0bf',
-    }
+    headers = await request_headers('api_search_landing')
 
     division_name = await division_name_call(league_id)
     logger.info(f"Collecting division name {division_name} | Pool id {pool_id}. Please wait")
@@ -657,7 +662,7 @@ async def get_standings_rounds_data(league_id, pool_id):
 
         logger.info(f"Collecting Standings data.")
         standings_listing_dicts = []
-        standing_tables = response.json()['Standings']['ScoresViewModels']
+        standing_tables = response.data['Standings']['ScoresViewModels']
 
         for jdx in range(len(standing_tables)):
             standing_results = standing_tables[jdx]
@@ -685,7 +690,7 @@ async def get_standings_rounds_data(league_id, pool_id):
             standings_listing_dicts.append(standing_datas)
 
         logger.info(f"Collecting Round matches data")
-        round_matches_tables = response.json()['MatchesSectionModel']['Rounds']
+        round_matches_tables = response.data['MatchesSectionModel']['Rounds']
 
         for idx in range(len(round_matches_tables)):
             target_datas = round_matches_tables[idx]
@@ -737,16 +742,7 @@ async def get_player_image_url(rankedin_id):
     """
     Get player image URL using RankedInId
     """
-    headers = {
-        'User-Agent': await random_useragent(),
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://rankedin.com/',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-origin',
-        'Connection': 'keep-alive',
-    }
+    headers = await request_headers('web')
 
     # Construct player profile URL using RankedInId
     url = f"https://rankedin.com/api/player/{rankedin_id}/profile"
@@ -754,7 +750,7 @@ async def get_player_image_url(rankedin_id):
     try:
         response = await make_requests(url, headers=headers)
         if response.status_code == 200:
-            player_data = response.json()
+            player_data = response.data
             # Extract image URL from player data
             image_url = player_data.get('ProfileImageUrl', '')
             if image_url and not image_url.startswith('http'):
@@ -769,385 +765,321 @@ async def get_player_image_url(rankedin_id):
         return ""
 
 
-async def get_players(team_id, max_concurrent_rankings=10, delay_between_batches=5, max_retries=15):
-    random_delay = await random_interval(20)
+async def get_team_homepage(team_id):
     """
-    Get players data with limited concurrency for ranking position requests
+    Fetch and validate a team homepage payload.
 
-    Args:
-        team_id: The team ID to get players for
-        max_concurrent_rankings: Max concurrent ranking requests (default: 10)
-        delay_between_batches: Delay between ranking batches in seconds (default: 5)
-        max_retries: Maximum number of retries for the entire function (default: 15)
+    Raises RetryableError when there is nothing (yet) to validate and StructuralError when the
+    payload is malformed, so the caller's RetryPolicy only retries what can get better.
     """
+    headers = await request_headers('api_team_homepage')
+    url = f"https://api.rankedin.com/v1/TeamLeague/GetTeamLeagueTeamHomepageAsync?teamId={team_id}&language=en"
 
-    for attempt in range(max_retries):
-        try:
-            headers = {
-                f'User-Agent': await random_useragent(),
-                'Accept': 'application/json, text/plain, */*',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Referer': 'https://rankedin.com/en/team/homepage/1764246',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-origin',
-                'Connection': 'keep-alive',
-                'Cookie': 'ai_user=DFzEjMtcUnEUDoZhTMKlbQ^|2025-08-11T18:49:59.686Z; __stripe_mid=6d617d98-f9ca-4fb0-b4f7-dfc799d68f5a760a87; modal-ads={%22_playerId%22:null%2C%22_ads%22:[{%22_id%22:9%2C%22_lastAdDate%22:%220001-01-01%22}%2C{%22_id%22:10%2C%22_lastAdDate%22:%220001-01-01%22}%2C{%22_id%22:4%2C%22_lastAdDate%22:%222025-08-11%22}]}; ARRAffinity=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; ARRAffinitySameSite=bc076499a11c91231753e64e9765ff1ed1ccf1250ac8779f29466c4ddab3cf22; language=en',
-            }
-            url = f"https://api.rankedin.com/v1/TeamLeague/GetTeamLeagueTeamHomepageAsync?teamId={team_id}&language=en"
+    # Whole-item retries are handled by players_retry, so keep the per-request attempts short
+    response = await make_requests(url, headers=headers, attempts=2)
 
-            response = await make_requests(url, headers=headers)
+    if response is None:
+        breaker = get_circuit_breaker(url)
+        if breaker.state != 'closed':
+            raise CircuitOpenError(f"circuit {breaker.family} is open")
+        raise RetryableError("No response received from make_requests")
 
-            # Check if make_requests failed completely
-            if response is None:
-                logger.warning(f"Attempt {attempt + 1}: Failed to get response for team {team_id}")
-                raise Exception("No response received from make_requests")
+    # make_requests already decoded and validated the JSON body
+    raw_datas = response.data
+    if not raw_datas:
+        raise RetryableError("Empty response data")
 
-            # Parse JSON with error handling
-            try:
-                raw_datas = response.json()
-            except Exception as json_error:
-                logger.warning(f"Attempt {attempt + 1}: Failed to parse JSON for team {team_id}: {json_error}")
-                raise Exception(f"JSON parsing failed: {json_error}")
-
-            # Validate response structure
-            if not raw_datas:
-                logger.warning(f"Attempt {attempt + 1}: Empty response for team {team_id}")
-                raise Exception("Empty response data")
-
-            if not isinstance(raw_datas, dict):
-                logger.warning(f"Attempt {attempt + 1}: Response is not a dictionary for team {team_id}")
-                raise Exception("Response data is not a dictionary")
-
-            # Check if 'Team' key exists and is not None
-            if 'Team' not in raw_datas:
-                logger.warning(f"Attempt {attempt + 1}: Missing 'Team' key for team {team_id}")
-                raise Exception("Invalid response structure: missing 'Team' key")
-
-            if raw_datas['Team'] is None:
-                logger.warning(f"Attempt {attempt + 1}: 'Team' key is None for team {team_id}")
-                raise Exception("Invalid response structure: 'Team' key is None")
-
-            team_data = raw_datas['Team']
-
-            # Validate Team structure
-            if not isinstance(team_data, dict):
-                logger.warning(f"Attempt {attempt + 1}: Team data is not a dictionary for team {team_id}")
-                raise Exception("Team data is not a dictionary")
-
-            # Check Players key
-            if 'Players' not in team_data:
-                logger.warning(f"Attempt {attempt + 1}: Missing 'Players' key in Team for team {team_id}")
-                raise Exception("Invalid response structure: missing 'Players' key in Team")
-
-            if team_data['Players'] is None:
-                logger.warning(f"Attempt {attempt + 1}: 'Players' key is None in Team for team {team_id}")
-                raise Exception("Invalid response structure: 'Players' key in Team is None")
-
-            # Check HomeClub key
-            if 'HomeClub' not in team_data:
-                logger.warning(f"Attempt {attempt + 1}: Missing 'HomeClub' key in Team for team {team_id}")
-                raise Exception("Invalid response structure: missing 'HomeClub' key in Team")
-
-            if team_data['HomeClub'] is None:
-                logger.warning(f"Attempt {attempt + 1}: 'HomeClub' key is None in Team for team {team_id}")
-                raise Exception("Invalid response structure: 'HomeClub' key in Team is None")
-
-            # Validate HomeClub structure
-            home_club = team_data['HomeClub']
-            if not isinstance(home_club, dict):
-                logger.warning(f"Attempt {attempt + 1}: HomeClub data is not a dictionary for team {team_id}")
-                raise Exception("HomeClub data is not a dictionary")
-
-            if 'Id' not in home_club:
-                logger.warning(f"Attempt {attempt + 1}: Missing 'Id' key in HomeClub for team {team_id}")
-                raise Exception("Invalid response structure: missing 'Id' key in HomeClub")
-
-            # If we reach here, the response structure is valid
-            team_club_id = home_club['Id']
-            players_lists = team_data['Players']
-
-            # Validate players list
-            if not isinstance(players_lists, list):
-                logger.warning(f"Attempt {attempt + 1}: Players data is not a list for team {team_id}")
-                raise Exception("Players data is not a list")
-
-            players_listings_dicts = []
-            random_delay = await random_interval(delay_between_batches)
-
-            # Extract player IDs for ranking position lookup - include all valid IDs
-            player_ids = []
-            for idx, player_data in enumerate(players_lists):
-                if isinstance(player_data, dict) and 'Id' in player_data and player_data['Id'] is not None:
-                    player_ids.append(player_data['Id'])
-                else:
-                    logger.warning(f"Player at index {idx} has invalid/missing ID for team {team_id} - will skip ranking lookup for this player")
-
-            # Get ranking positions with limited concurrency
-            ranking_map = {}
-            timestamp_map = {}
-            ranking_name_map = {}
-
-            if player_ids:
-                logger.info(f"Collecting ranking positions for {len(player_ids)} players in team {team_id} with max {max_concurrent_rankings} concurrent...")
-
-                # Process ranking requests in batches
-                for i in range(0, len(player_ids), max_concurrent_rankings):
-                    batch_ids = player_ids[i:i + max_concurrent_rankings]
-                    logger.info(f"Processing ranking batch {i//max_concurrent_rankings + 1} with {len(batch_ids)} players...")
-
-                    # Create tasks for this batch
-                    ranking_tasks = [get_ranking_position_of_players(player_id) for player_id in batch_ids]
-                    ranking_results = await asyncio.gather(*ranking_tasks, return_exceptions=True)
-
-                    # Process results for this batch
-                    for j, result in enumerate(ranking_results):
-                        player_id = batch_ids[j]
-                        if isinstance(result, Exception):
-                            logger.error(f"Error getting ranking for player {player_id}: {result}")
-                            ranking_map[player_id] = ""
-                            timestamp_map[player_id] = ""
-                            ranking_name_map[player_id] = ""
-                        else:
-                            # Unpack the tuple returned from get_ranking_position_of_players
-                            standing, timestamp, ranking_name = result
-                            ranking_map[player_id] = standing if standing is not None else ""
-                            timestamp_map[player_id] = timestamp if timestamp is not None else ""
-                            ranking_name_map[player_id] = ranking_name if ranking_name is not None else ""
-
-                    # Add delay between batches (except for last batch)
-                    if i + max_concurrent_rankings < len(player_ids):
-                        await asyncio.sleep(random_delay)
-                        logger.info(f"Ranking batch complete, waiting {int(random_delay)}s before next batch...")
-
-            # Build player data with ranking positions, timestamps, and ranking names
-            for idx in range(len(players_lists)):
-                try:
-                    player_datas = players_lists[idx]
-
-                    # Validate player data structure - but don't skip, just use defaults
-                    if not isinstance(player_datas, dict):
-                        logger.warning(f"Player data at index {idx} is not a dictionary for team {team_id} - using empty data")
-                        player_datas = {}
-
-                    # Get player ID - this is essential, if missing we'll generate a placeholder
-                    player_id = player_datas.get('Id')
-                    if player_id is None:
-                        player_id = f"unknown_player_{team_id}_{idx}"
-                        logger.warning(f"Player ID missing for team {team_id}, player index {idx} - using placeholder: {player_id}")
-
-                    # Handle HomeClub data - don't skip if invalid, just use empty values
-                    player_home_club = player_datas.get('HomeClub')
-                    home_club_id = ''
-                    home_club_name = ''
-                    home_club_country = ''
-                    home_club_city = ''
-                    home_club_url = ''
-
-                    if isinstance(player_home_club, dict):
-                        home_club_id = player_home_club.get('Id', '')
-                        home_club_name = player_home_club.get('Name', '')
-                        home_club_country = player_home_club.get('CountryShort', '')
-                        home_club_city = player_home_club.get('City', '')
-                        home_club_url = f"https://rankedin.com{player_home_club.get('Url', '')}" if player_home_club.get('Url') else ''
-                    else:
-                        if player_home_club is not None:
-                            logger.warning(f"Player HomeClub data is not a dictionary for team {team_id}, player {player_id} - using empty values")
-
-                    datas = {
-                        'Team_ID_Players': team_id,
-                        'Pool ID': raw_datas.get('PoolId', ''),
-                        'Team League ID': raw_datas.get('TeamLeagueId', ''),
-                        'Team League Name': raw_datas.get('TeamLeagueName', ''),
-                        'State Message': raw_datas.get('StateMessage', ''),
-                        'Player ID': player_id,
-                        'Ranking Position': ranking_map.get(player_id, ""),
-                        'Ranking Timestamp': timestamp_map.get(player_id, ""),
-                        'Ranking Name': ranking_name_map.get(player_id, ""),
-                        'RankedInId': player_datas.get('RankedinId', ''),
-                        'Name': player_datas.get('FirstName', ''),
-                        'Player Order': player_datas.get('PlayerOrder', ''),
-                        'Player Rating': player_datas.get('RatingBegin', ''),
-                        'Team Participant Type': player_datas.get('TeamParticipantType', ''),
-                        'Has License': player_datas.get('HasLicense', ''),
-                        'Player URL': f"https://rankedin.com{player_datas.get('PlayerUrl', '')}" if player_datas.get('PlayerUrl') else '',
-                        'Team Organisation Id': team_club_id,
-                        'Players Home Club Id': home_club_id,
-                        'Home Club Name': home_club_name,
-                        'Home Club Country': home_club_country,
-                        'Home Club City': home_club_city,
-                        'Home Club URL': home_club_url,
-                        'Ranking API URL': f"https://api.rankedin.com/v1/player/GetHistoricDataAsync?id={player_id}",
-                    }
-
-                    players_listings_dicts.append(datas)
-
-                except Exception as player_error:
-                    logger.error(f"Error processing player at index {idx} for team {team_id}: {player_error}")
-                    # Even if there's an error, try to create a minimal player record
-                    try:
-                        fallback_player_id = f"error_player_{team_id}_{idx}"
-                        fallback_data = {
-                            'Team_ID_Players': team_id,
-                            'Pool ID': raw_datas.get('PoolId', ''),
-                            'Team League ID': raw_datas.get('TeamLeagueId', ''),
-                            'Team League Name': raw_datas.get('TeamLeagueName', ''),
-                            'State Message': raw_datas.get('StateMessage', ''),
-                            'Player ID': fallback_player_id,
-                            'Ranking Position': '',
-                            'Ranking Timestamp': '',
-                            'Ranking Name': '',
-                            'RankedInId': '',
-                            'Name': f'Error Player {idx}',
-                            'Player Order': '',
-                            'Player Rating': '',
-                            'Team Participant Type': '',
-                            'Has License': '',
-                            'Player URL': '',
-                            'Team Organisation Id': team_club_id,
-                            'Players Home Club Id': '',
-                            'Home Club Name': '',
-                            'Home Club Country': '',
-                            'Home Club City': '',
-                            'Home Club URL': '',
-                            'Ranking API URL': f"https://api.rankedin.com/v1/player/GetHistoricDataAsync?id={fallback_player_id}",
-                        }
-                        players_listings_dicts.append(fallback_data)
-                        logger.info(f"Added fallback record for player at index {idx} in team {team_id}")
-                    except Exception as fallback_error:
-                        logger.error(f"Failed to create fallback record for player at index {idx} in team {team_id}: {fallback_error}")
-
-            logger.info(f"Successfully collected {len(players_listings_dicts)} players for team {team_id}")
-            df = pd.DataFrame( data = players_listings_dicts)
-            df.to_excel('players.xlsx', index = False)
-            return players_listings_dicts
+    if not isinstance(raw_datas, dict):
+        raise StructuralError("Response data is not a dictionary")
 
-        except Exception as e:
-            logger.warning(f"Attempt {attempt + 1} failed for team {team_id}: {str(e)}")
+    # Check if 'Team' key exists and is not None
+    if raw_datas.get('Team') is None:
+        raise StructuralError("Invalid response structure: missing or empty 'Team' key")
 
-            # If this is not the last attempt, wait and retry
-            if attempt < max_retries - 1:
-                retry_delay = 15  # You might want to implement exponential backoff here
-                logger.info(f"Retrying team {team_id} in {retry_delay:.1f} seconds... (attempt {attempt + 2}/{max_retries})")
-                await asyncio.sleep(retry_delay)
-            else:
-                logger.error(f"All {max_retries} attempts failed for team {team_id}. Final error: {str(e)}")
+    team_data = raw_datas['Team']
+    if not isinstance(team_data, dict):
+        raise StructuralError("Team data is not a dictionary")
 
-    # If all retries failed
-    return []
+    for key in ('Players', 'HomeClub'):
+        if team_data.get(key) is None:
+            raise StructuralError(f"Invalid response structure: missing or empty '{key}' key in Team")
 
+    if not isinstance(team_data['HomeClub'], dict):
+        raise StructuralError("HomeClub data is not a dictionary")
 
-async def collect_data_concurrently(season_id_home, season_id_away, match_ids, max_concurrent=10, delay_between_batches=5):
-    """
-    Collect players, matches, and organizations data with limited concurrency
+    if 'Id' not in team_data['HomeClub']:
+        raise StructuralError("Invalid response structure: missing 'Id' key in HomeClub")
 
-    Args:
-        max_concurrent: Maximum number of concurrent tasks (default: 3)
-        delay_between_batches: Delay in seconds between batches (default: 2)
+    if not isinstance(team_data['Players'], list):
+        raise StructuralError("Players data is not a list")
+
+    return raw_datas
+
+
+async def build_team_players(team_id, raw_datas, max_concurrent_rankings=10):
     """
-    logger.info("Starting concurrent data collection with limited concurrency...")
+    Build the player records for a validated team homepage, with ranking positions
+    looked up under limited concurrency
+    """
+    team_data = raw_datas['Team']
+    team_club_id = team_data['HomeClub']['Id']
+    players_lists = team_data['Players']
 
-    # Combine home and away team IDs for unique team collection
-    all_season_ids = season_id_home + season_id_away
-    unique_season_ids = list(set(all_season_ids))
-    random_delay = await random_interval(delay_between_batches)
+    players_listings_dicts = []
 
-    # Create team-match tuples with home/away distinction for matches
-    team_match_tuples = list(zip(season_id_home, season_id_away, match_ids))
+    # Extract player IDs for ranking position lookup - include all valid IDs
+    player_ids = []
+    for idx, player_data in enumerate(players_lists):
+        if isinstance(player_data, dict) and 'Id' in player_data and player_data['Id'] is not None:
+            player_ids.append(player_data['Id'])
+        else:
+            logger.warning(f"Player at index {idx} has invalid/missing ID for team {team_id} - will skip ranking lookup for this player")
 
-    # OPTION 1: Collect players data with limited concurrency
-    logger.info(f"Collecting players data for {len(unique_season_ids)} teams with max {max_concurrent} concurrent...")
-    all_players = []
-    org_season_pairs = []
+    # Get ranking positions with limited concurrency
+    ranking_map = {}
+    timestamp_map = {}
+    ranking_name_map = {}
 
-    # Process players in batches
-    for i in range(0, len(unique_season_ids), max_concurrent):
-        batch = unique_season_ids[i:i + max_concurrent]
-        players_tasks = [get_players(str(season_id)) for season_id in batch]
-        players_results = await asyncio.gather(*players_tasks, return_exceptions=True)
+    if player_ids:
+        logger.info(f"Collecting ranking positions for {len(player_ids)} players in team {team_id} with max {max_concurrent_rankings} concurrent...")
 
-        # Process results for this batch
-        for j, result in enumerate(players_results):
-            if isinstance(result, Exception):
-                logger.error(f"Error in players task {i+j}: {result}")
-                continue
+        # Process ranking requests in batches
+        for i in range(0, len(player_ids), max_concurrent_rankings):
+            batch_ids = player_ids[i:i + max_concurrent_rankings]
+            logger.info(f"Processing ranking batch {i//max_concurrent_rankings + 1} with {len(batch_ids)} players...")
 
-            if result:
-                all_players.extend(result)
-                season_id = batch[j]
-                for player in result:
-                    org_id = player.get('Team Organisation Id')
-                    if org_id:
-                        org_season_pairs.append((season_id, org_id))
+            # Create tasks for this batch
+            ranking_tasks = [get_memoized_ranking_position(player_id) for player_id in batch_ids]
+            ranking_results = await asyncio.gather(*ranking_tasks, return_exceptions=True)
 
-        # Add delay between batches (except for last batch)
-        if i + max_concurrent < len(unique_season_ids):
-            await asyncio.sleep(random_delay)
-            logger.info(f"Processed players batch {i//max_concurrent + 1}, waiting {int(random_delay)}s...")
+            # Process results for this batch
+            for j, result in enumerate(ranking_results):
+                player_id = batch_ids[j]
+                if isinstance(result, Exception):
+                    logger.error(f"Error getting ranking for player {player_id}: {result}")
+                    ranking_map[player_id] = ""
+                    timestamp_map[player_id] = ""
+                    ranking_name_map[player_id] = ""
+                else:
+                    # Unpack the tuple returned from get_ranking_position_of_players
+                    standing, timestamp, ranking_name = result
+                    ranking_map[player_id] = standing if standing is not None else ""
+                    timestamp_map[player_id] = timestamp if timestamp is not None else ""
+                    ranking_name_map[player_id] = ranking_name if ranking_name is not None else ""
 
-    # OPTION 2: Collect matches data with limited concurrency
-    logger.info(f"Collecting matches data for {len(team_match_tuples)} matches with max {max_concurrent} concurrent...")
-    all_matches = []
+    # Build player data with ranking positions, timestamps, and ranking names
+    for idx in range(len(players_lists)):
+        try:
+            player_datas = players_lists[idx]
 
-    for i in range(0, len(team_match_tuples), max_concurrent):
-        batch = team_match_tuples[i:i + max_concurrent]
-        matches_tasks = [get_matches(str(home_id), str(away_id), str(match_id))
-                        for home_id, away_id, match_id in batch]
-        matches_results = await asyncio.gather(*matches_tasks, return_exceptions=True)
+            # Validate player data structure - but don't skip, just use defaults
+            if not isinstance(player_datas, dict):
+                logger.warning(f"Player data at index {idx} is not a dictionary for team {team_id} - using empty data")
+                player_datas = {}
+
+            # Get player ID - this is essential, if missing we'll generate a placeholder
+            player_id = player_datas.get('Id')
+            if player_id is None:
+                player_id = f"unknown_player_{team_id}_{idx}"
+                logger.warning(f"Player ID missing for team {team_id}, player index {idx} - using placeholder: {player_id}")
+
+            # Handle HomeClub data - don't skip if invalid, just use empty values
+            player_home_club = player_datas.get('HomeClub')
+            home_club_id = ''
+            home_club_name = ''
+            home_club_country = ''
+            home_club_city = ''
+            home_club_url = ''
+
+            if isinstance(player_home_club, dict):
+                home_club_id = player_home_club.get('Id', '')
+                home_club_name = player_home_club.get('Name', '')
+                home_club_country = player_home_club.get('CountryShort', '')
+                home_club_city = player_home_club.get('City', '')
+                home_club_url = f"https://rankedin.com{player_home_club.get('Url', '')}" if player_home_club.get('Url') else ''
+            else:
+                if player_home_club is not None:
+                    logger.warning(f"Player HomeClub data is not a dictionary for team {team_id}, player {player_id} - using empty values")
 
-        # Process results for this batch
-        for j, result in enumerate(matches_results):
-            if isinstance(result, Exception):
-                logger.error(f"Error in matches task {i+j}: {result}")
-                continue
+            datas = {
+                'Team_ID_Players': team_id,
+                'Pool ID': raw_datas.get('PoolId', ''),
+                'Team League ID': raw_datas.get('TeamLeagueId', ''),
+                'Team League Name': raw_datas.get('TeamLeagueName', ''),
+                'State Message': raw_datas.get('StateMessage', ''),
+                'Player ID': player_id,
+                'Ranking Position': ranking_map.get(player_id, ""),
+                'Ranking Timestamp': timestamp_map.get(player_id, ""),
+                'Ranking Name': ranking_name_map.get(player_id, ""),
+                'RankedInId': player_datas.get('RankedinId', ''),
+                'Name': player_datas.get('FirstName', ''),
+                'Player Order': player_datas.get('PlayerOrder', ''),
+                'Player Rating': player_datas.get('RatingBegin', ''),
+                'Team Participant Type': player_datas.get('TeamParticipantType', ''),
+                'Has License': player_datas.get('HasLicense', ''),
+                'Player URL': f"https://rankedin.com{player_datas.get('PlayerUrl', '')}" if player_datas.get('PlayerUrl') else '',
+                'Team Organisation Id': team_club_id,
+                'Players Home Club Id': home_club_id,
+                'Home Club Name': home_club_name,
+                'Home Club Country': home_club_country,
+                'Home Club City': home_club_city,
+                'Home Club URL': home_club_url,
+                'Ranking API URL': f"https://api.rankedin.com/v1/player/GetHistoricDataAsync?id={player_id}",
+            }
 
-            if result:
-                all_matches.extend(result)
+            players_listings_dicts.append(datas)
 
-        # Add delay between batches
-        if i + max_concurrent < len(team_match_tuples):
-            await asyncio.sleep(random_delay)
-            logger.info(f"Processed matches batch {i//max_concurrent + 1}, waiting {int(random_delay)}s...")
+        except Exception as player_error:
+            logger.error(f"Error processing player at index {idx} for team {team_id}: {player_error}")
+            # Even if there's an error, try to create a minimal player record
+            try:
+                fallback_player_id = f"error_player_{team_id}_{idx}"
+                fallback_data = {
+                    'Team_ID_Players': team_id,
+                    'Pool ID': raw_datas.get('PoolId', ''),
+                    'Team League ID': raw_datas.get('TeamLeagueId', ''),
+                    'Team League Name': raw_datas.get('TeamLeagueName', ''),
+                    'State Message': raw_datas.get('StateMessage', ''),
+                    'Player ID': fallback_player_id,
+                    'Ranking Position': '',
+                    'Ranking Timestamp': '',
+                    'Ranking Name': '',
+                    'RankedInId': '',
+                    'Name': f'Error Player {idx}',
+                    'Player Order': '',
+                    'Player Rating': '',
+                    'Team Participant Type': '',
+                    'Has License': '',
+                    'Player URL': '',
+                    'Team Organisation Id': team_club_id,
+                    'Players Home Club Id': '',
+                    'Home Club Name': '',
+                    'Home Club Country': '',
+                    'Home Club City': '',
+                    'Home Club URL': '',
+                    'Ranking API URL': f"https://api.rankedin.com/v1/player/GetHistoricDataAsync?id={fallback_player_id}",
+                }
+                players_listings_dicts.append(fallback_data)
+                logger.info(f"Added fallback record for player at index {idx} in team {team_id}")
+            except Exception as fallback_error:
+                logger.error(f"Failed to create fallback record for player at index {idx} in team {team_id}: {fallback_error}")
 
-    # OPTION 3: Collect organizations data with limited concurrency
-    logger.info(f"Collecting organizations data for {len(org_season_pairs)} combinations with max {max_concurrent} concurrent...")
-    all_organizations = []
+    logger.info(f"Successfully collected {len(players_listings_dicts)} players for team {team_id}")
+    return players_listings_dicts
 
-    for i in range(0, len(org_season_pairs), max_concurrent):
-        batch = org_season_pairs[i:i + max_concurrent]
-        org_tasks = [get_organisation_id(str(season_id), str(org_id)) for season_id, org_id in batch]
-        org_results = await asyncio.gather(*org_tasks, return_exceptions=True)
 
-        # Process results for this batch
-        for j, result in enumerate(org_results):
-            if isinstance(result, Exception):
-                logger.error(f"Error in organization task {i+j}: {result}")
-                continue
+async def get_players(team_id, max_concurrent_rankings=10, on_recovered=None):
+    """
+    Get players data with limited concurrency for ranking position requests
 
-            if result:
-                all_organizations.extend(result)
+    The homepage request is retried under players_retry: capped exponential backoff with jitter,
+    a per-team deadline and a run-wide retry budget. Structural errors are not retried. Teams that
+    still fail are deferred to the end-of-run pass, and their players are handed to on_recovered
+    if that pass succeeds.
 
-        # Add delay between batches
-        if i + max_concurrent < len(org_season_pairs):
-            await asyncio.sleep(random_delay)
-            logger.info(f"Processed organizations batch {i//max_concurrent + 1}, waiting {int(random_delay)}s...")
+    Args:
+        team_id: The team ID to get players for
+        max_concurrent_rankings: Max concurrent ranking requests (default: 10)
+        on_recovered: Async callback receiving the players list if a deferred retry succeeds
+    """
+    async def recover(raw_datas):
+        players = await build_team_players(team_id, raw_datas, max_concurrent_rankings)
+        if on_recovered is not None:
+            await on_recovered(players)
 
-    # Drop duplicates from organization data
-    if all_organizations:
-        logger.info(f"Removing duplicates from {len(all_organizations)} organization records...")
-        seen_combinations = set()
-        deduplicated_orgs = []
+    try:
+        raw_datas = await players_retry.call(f"team {team_id}", lambda: get_team_homepage(team_id), on_recovered=recover)
+    except StructuralError as e:
+        logger.error(f"Skipping team {team_id}: {str(e)}")
+        return []
+    except RetryDeferred:
+        logger.warning(f"Team {team_id} deferred to the end-of-run retry pass")
+        return []
 
-        for org in all_organizations:
-            key = (org.get('team_id_organisation'), org.get('Organisation_Id'))
-            if key not in seen_combinations:
-                seen_combinations.add(key)
-                deduplicated_orgs.append(org)
+    return await build_team_players(team_id, raw_datas, max_concurrent_rankings)
 
-        logger.info(f"Kept {len(deduplicated_orgs)} unique organization records after deduplication")
-        all_organizations = deduplicated_orgs
 
-    logger.info("Concurrent data collection completed!")
+async def collect_data_concurrently(season_id_home, season_id_away, match_ids, max_concurrent=10):
+    """
+    Collect players, matches, and organizations data as one streaming pipeline.
+
+    Players and matches fetches start together and share a budget of `max_concurrent`
+    in-flight tasks. Each team's organisation lookup is queued as soon as that team's players
+    response reveals its club, so a pool takes roughly as long as its longest chain instead
+    of the sum of three phases. Organisations go through the run-wide organisation memo, so
+    each club is fetched once no matter how many teams share it. Request pacing is handled
+    by the per-host rate limiter in make_requests.
+
+    Args:
+        max_concurrent: Maximum number of concurrent tasks (default: 10)
+    """
+    logger.info("Starting pipelined data collection with limited concurrency...")
+
+    # Unique team IDs in first-seen order, and home/away/match tuples for the matches
+    unique_season_ids = list(dict.fromkeys(season_id_home + season_id_away))
+    team_match_tuples = list(zip(season_id_home, season_id_away, match_ids))
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+    organisation_tasks = [[] for _ in unique_season_ids]
+    all_players = []
+    all_organizations = []
+
+    async def limited(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    async def recover_team(season_id, players):
+        # Deferred teams come back after the main pass, so their records are appended to this pool's lists
+        all_players.extend(players)
+        org_ids = dict.fromkeys(player.get('Team Organisation Id') for player in players)
+        for org_id in org_ids:
+            if org_id:
+                all_organizations.extend(await get_memoized_organisation(season_id, org_id))
+
+    async def collect_team(index, season_id):
+        players = await limited(get_players(str(season_id), on_recovered=lambda players: recover_team(season_id, players)))
+
+        # Queue the organisation lookup for this team straight away, once per distinct club
+        org_ids = dict.fromkeys(player.get('Team Organisation Id') for player in players)
+        for org_id in org_ids:
+            if org_id:
+                organisation_tasks[index].append(
+                    asyncio.ensure_future(limited(get_memoized_organisation(season_id, org_id)))
+                )
+        return players
+
+    logger.info(f"Collecting players data for {len(unique_season_ids)} teams and matches data for "
+                f"{len(team_match_tuples)} matches with max {max_concurrent} concurrent...")
+
+    # Players go first in the semaphore queue since their chain (players -> organisation) is the longest
+    players_tasks = [asyncio.ensure_future(collect_team(index, season_id)) for index, season_id in enumerate(unique_season_ids)]
+    matches_tasks = [asyncio.ensure_future(limited(get_matches(str(home_id), str(away_id), str(match_id))))
+                     for home_id, away_id, match_id in team_match_tuples]
+
+    players_results = await asyncio.gather(*players_tasks, return_exceptions=True)
+    matches_results = await asyncio.gather(*matches_tasks, return_exceptions=True)
+
+    for i, result in enumerate(players_results):
+        if isinstance(result, Exception):
+            logger.error(f"Error in players task {i}: {result}")
+            continue
+        all_players.extend(result)
+
+    all_matches = []
+    for i, result in enumerate(matches_results):
+        if isinstance(result, Exception):
+            logger.error(f"Error in matches task {i}: {result}")
+            continue
+        all_matches.extend(result)
+
+    for tasks in organisation_tasks:
+        for i, result in enumerate(await asyncio.gather(*tasks, return_exceptions=True)):
+            if isinstance(result, Exception):
+                logger.error(f"Error in organization task {i}: {result}")
+                continue
+            all_organizations.extend(result)
+
+    logger.info(f"Concurrent data collection completed! {len(all_organizations)} team organisation records")
 
     return {
         'players': all_players,
@@ -1251,7 +1183,7 @@ async def collect_data_concurrently(season_id_home, season_id_away, match_ids, m
 '''
 
 
-async def collect_all_league_data(league_id, pool_id, max_concurrent = 10, delay_between_batches = 5):
+async def collect_all_league_data(league_id, pool_id, max_concurrent = 10):
     """
     Master function to collect all data for a league/pool combination with concurrent execution
     """
@@ -1267,7 +1199,6 @@ async def collect_all_league_data(league_id, pool_id, max_concurrent = 10, delay
         main_data['Season_ID_Away'],
         main_data['round_ids'],
         max_concurrent = max_concurrent,
-        delay_between_batches = delay_between_batches
     )
 
     # Combine all data
@@ -1285,93 +1216,164 @@ async def collect_all_league_data(league_id, pool_id, max_concurrent = 10, delay
     return complete_data
 
 
-async def collect_multiple_league_data(team_pool_combinations, delay, batches):
+async def collect_multiple_league_data(team_pool_combinations, max_concurrent = 5, checkpoint = None):
     """
-    Collect all data and separate players data for individual processing
+    Collect all data and separate players data for individual processing.
+
+    Combinations are pulled from a shared queue by `max_concurrent` workers, so a new
+    league/pool starts as soon as any slot frees up instead of waiting for the slowest
+    member of a batch. Results are merged in the original combination order.
+
+    With a PipelineCheckpoint, every scraped combination is written to disk as soon as it
+    finishes, and combinations already checkpointed by an earlier run (resume mode) are loaded
+    instead of scraped.
     """
-    # Split combinations into batches of 5
-    batches = [team_pool_combinations[i:i + batches] for i in range(0, len(team_pool_combinations), batches)]
+    max_concurrent = max(1, min(max_concurrent or 5, len(team_pool_combinations) or 1))
+
+    queue = asyncio.Queue()
+    for index, (season_id, pool_id) in enumerate(team_pool_combinations):
+        queue.put_nowait((index, season_id, pool_id))
+
+    scraped_results = [None] * len(team_pool_combinations)
+    scraped_indexes = []
+    combination_stats = []
+    run_started = time.perf_counter()
+    ranking_memo.clear()
+    organisation_memo.clear()
+    division_memo.clear()
+    players_retry.clear()
+    reset_circuit_breakers()
+
+    logger.info(f"Processing {len(team_pool_combinations)} combinations with {max_concurrent} concurrent workers")
+
+    async def worker():
+        while True:
+            try:
+                index, season_id, pool_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            queue_depth = queue.qsize()
+            started = time.perf_counter()
+            resumed = checkpoint.load_combination(season_id, pool_id) if checkpoint else None
+            if resumed is not None:
+                scraped_results[index] = resumed
+            else:
+                try:
+                    scraped_results[index] = await collect_all_league_data(season_id, pool_id)
+                    if checkpoint and scraped_results[index] is not None:
+                        scraped_indexes.append(index)
+                        await checkpoint.save_combination(season_id, pool_id, scraped_results[index])
+                except Exception as e:
+                    logger.error(f"Error processing League {season_id}, Pool {pool_id}: {str(e)}")
+
+            duration = time.perf_counter() - started
+            if resumed is not None:
+                status = 'Resumed'
+            else:
+                status = 'Success' if scraped_results[index] is not None else 'Failed'
+            combination_stats.append({
+                'League_ID': season_id,
+                'Pool_ID': pool_id,
+                'Status': status,
+                'Queue_Depth_At_Start': queue_depth,
+                'Wait_Seconds': round(started - run_started, 2),
+                'Duration_Seconds': round(duration, 2),
+            })
+            logger.info(f"League {season_id}, Pool {pool_id}: {status} in {duration:.1f}s ({queue_depth} combinations still queued)")
+
+    await asyncio.gather(*(worker() for _ in range(max_concurrent)))
+
+    # Teams that ran out of retries get one more go now that the main pass is done
+    await players_retry.run_deferred()
+
+    # Recovered teams were appended to their pool's lists, so refresh those checkpoints
+    if checkpoint and players_retry.recovered:
+        for index in scraped_indexes:
+            season_id, pool_id = team_pool_combinations[index]
+            await checkpoint.save_combination(season_id, pool_id, scraped_results[index])
 
     all_standings = []
     all_rounds = []
     all_players = []  # Keep collecting players data
     all_matches = []
     all_organizations = []
+    division_names = {}
     successful_combinations = []
     failed_combinations = []
 
-    logger.info(f"Processing {len(team_pool_combinations)} combinations")
-
-    for batch_idx, batch_combinations in enumerate(batches, 1):
-        logger.info(f"Starting batch {batch_idx}/{len(batches)} with {len(batch_combinations)} combinations")
-
-        # Create tasks for all combinations in this batch
-        tasks = []
-        for season_id, pool_id in batch_combinations:
-            task = asyncio.create_task(collect_all_league_data(season_id, pool_id))
-            tasks.append((task, season_id, pool_id))
-
-        # Wait for all tasks in the batch to complete
-        for task, season_id, pool_id in tasks:
-            try:
-                scraped_data = await task
-                if scraped_data is None:
-                    logger.error(f"Failed to collect data for League {season_id}, Pool {pool_id}")
-                    failed_combinations.append((season_id, pool_id))
-                    continue
-
-                # Add data to combined results
-                for record in scraped_data.get('standings', []):
-                    record['season_id'] = season_id
-                    record['pool_id'] = pool_id
-                    all_standings.append(record)
-
-                for record in scraped_data.get('rounds', []):
-                    record['season_id'] = season_id
-                    record['pool_id'] = pool_id
-                    all_rounds.append(record)
-
-                for record in scraped_data.get('players', []):
-                    record['season_id'] = season_id  # Add season_id for players too
-                    record['pool_id'] = pool_id
-                    all_players.append(record)
-
-                for record in scraped_data.get('matches', []):
-                    record['season_id'] = season_id
-                    record['pool_id'] = pool_id
-                    all_matches.append(record)
-
-                for record in scraped_data.get('organizations', []):
-                    record['season_id'] = season_id
-                    record['pool_id'] = pool_id
-                    all_organizations.append(record)
-
-                successful_combinations.append((season_id, pool_id))
-                logger.info(f"Successfully processed League {season_id}, Pool {pool_id}")
-
-            except Exception as e:
-                logger.error(f"Error processing League {season_id}, Pool {pool_id}: {str(e)}")
-                failed_combinations.append((season_id, pool_id))
-
-        # Random delay between batches (except for the last batch)
-        if batch_idx < len(batches):
-            random_delay = await random_interval(delay)
-            logger.info(f"Batch {batch_idx} complete. Waiting {int(random_delay)} seconds before next batch...")
-            await asyncio.sleep(random_delay)
-
-    logger.info(f"All batches completed. Success: {len(successful_combinations)}, Failed: {len(failed_combinations)}")
+    for (season_id, pool_id), scraped_data in zip(team_pool_combinations, scraped_results):
+        if scraped_data is None:
+            logger.error(f"Failed to collect data for League {season_id}, Pool {pool_id}")
+            failed_combinations.append((season_id, pool_id))
+            continue
 
-    return {
+        if scraped_data.get('division_name'):
+            division_names[str(season_id)] = scraped_data['division_name']
+
+        # Add data to combined results
+        for record in scraped_data.get('standings', []):
+            record['season_id'] = season_id
+            record['pool_id'] = pool_id
+            all_standings.append(record)
+
+        for record in scraped_data.get('rounds', []):
+            record['season_id'] = season_id
+            record['pool_id'] = pool_id
+            all_rounds.append(record)
+
+        for record in scraped_data.get('players', []):
+            record['season_id'] = season_id  # Add season_id for players too
+            record['pool_id'] = pool_id
+            all_players.append(record)
+
+        for record in scraped_data.get('matches', []):
+            record['season_id'] = season_id
+            record['pool_id'] = pool_id
+            all_matches.append(record)
+
+        for record in scraped_data.get('organizations', []):
+            record['season_id'] = season_id
+            record['pool_id'] = pool_id
+            all_organizations.append(record)
+
+        successful_combinations.append((season_id, pool_id))
+
+    if combination_stats:
+        durations = sorted(stat['Duration_Seconds'] for stat in combination_stats)
+        slowest = max(combination_stats, key=lambda stat: stat['Duration_Seconds'])
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        logger.info(f"Combination timings: median {durations[len(durations) // 2]:.1f}s, p95 {p95:.1f}s, "
+                    f"max {slowest['Duration_Seconds']:.1f}s (League {slowest['League_ID']}, Pool {slowest['Pool_ID']}), "
+                    f"total wall time {time.perf_counter() - run_started:.1f}s")
+
+    ranking_memo.log_stats()
+    organisation_memo.log_stats()
+    division_memo.log_stats()
+    players_retry.log_stats()
+    (await get_adaptive_limiter()).log_stats()
+    logger.info(f"All combinations completed. Success: {len(successful_combinations)}, Failed: {len(failed_combinations)}")
+
+    batch_data = {
         'standings': all_standings,
         'rounds': all_rounds,
         'players': all_players,  # Include players in return data
         'matches': all_matches,
         'organizations': all_organizations,
+        'division_names': division_names,  # League ID (as string) -> division name, reused by the exports
         'successful_combinations': successful_combinations,
         'failed_combinations': failed_combinations,
+        'combination_stats': combination_stats,
+        'degraded_endpoints': degraded_endpoints(),  # Endpoint families that were failing fast, for the Executive Summary
         'total_processed': len(team_pool_combinations)
     }
 
+    # Keep an indexed local copy of the run for lookups and diffs between runs
+    if DATABASE_ENABLED:
+        await asyncio.to_thread(store_batch_data, batch_data)
+
+    return batch_data
+
 
 async def collect_multiple_league_data_archive(team_pool_combinations):
     all_standings = []
@@ -1453,392 +1455,160 @@ async def collect_multiple_league_data_archive(team_pool_combinations):
 async def save_batch_to_excel(batch_data: Dict):
     season_id = batch_data.get('standings')[0].get('season_id')
     timestamp = datetime.now(ZoneInfo("Europe/Copenhagen")).strftime("%Y-%m-%d_%H_%M_%S")
-    division_name = await division_name_call(season_id)
+    division_name = batch_data.get('division_names', {}).get(str(season_id)) or 'Unknown_Division'
     output_name = f"{division_name}_{timestamp}.xlsx"
 
-    def expand_matches_to_7_rows(matches_df):
-        """
-        Ensure each Round_ID has exactly 7 rows total.
-        For each Round_ID, ALL 7 rows will have the same Team_Home_ID_Matches and Team_Away_ID_Matches values.
-        If a Round_ID has fewer than 7 rows, add empty rows to reach exactly 7.
-        If a Round_ID has more than 7 rows, keep only the first 7 rows.
-        """
-        if matches_df.empty:
-            return matches_df
-
-        if 'Round_ID' not in matches_df.columns:
-            logger.warning("Round_ID column not found, returning original DataFrame")
-            return matches_df
-
-        logger.info("Starting round processing to exactly 7 rows per Round_ID with consistent Team IDs")
-        logger.info(f"Available columns: {matches_df.columns.tolist()}")
-
-        # Find the correct column names for Team IDs (handle different naming variations)
-        team_home_col = None
-        team_away_col = None
-
-        possible_home_names = ['Team_Home_ID_Matches', 'Team_ID_Home_Matches', 'Team_Home_ID', 'Home_Team_ID']
-        possible_away_names = ['Team_Away_ID_Matches', 'Team_ID_Away_Matches', 'Team_Away_ID', 'Away_Team_ID']
-
-        for col in matches_df.columns:
-            if col in possible_home_names:
-                team_home_col = col
-            if col in possible_away_names:
-                team_away_col = col
-
-        logger.info(f"Found Team Home column: {team_home_col}")
-        logger.info(f"Found Team Away column: {team_away_col}")
-
-        # Group by Round_ID to identify unique rounds
-        round_counts = matches_df['Round_ID'].value_counts()
-        logger.info(f"Found {len(round_counts)} unique Round_IDs")
-
-        expanded_rows = []
-        rounds_expanded = 0
-        rounds_trimmed = 0
-        rows_added = 0
-        rows_removed = 0
-
-        for round_id in matches_df['Round_ID'].unique():
-            round_matches = matches_df[matches_df['Round_ID'] == round_id]
-            current_count = len(round_matches)
-
-            # Get the template row (first row) to extract consistent values
-            template_row = round_matches.iloc[0].copy()
-
-            # Extract the consistent values that should be the same for all rows in this Round_ID
-            consistent_values = {
-                'season_id': template_row.get('season_id', ''),
-                'pool_id': template_row.get('pool_id', ''),
-                'Round_ID': round_id,
-            }
-
-            # Add team ID values if columns exist
-            if team_home_col:
-                consistent_values[team_home_col] = template_row.get(team_home_col, '')
-            if team_away_col:
-                consistent_values[team_away_col] = template_row.get(team_away_col, '')
-
-            logger.debug(f"Round_ID {round_id}: Consistent values = {consistent_values}")
-
-            if current_count < 7:
-                # First, add existing rows but ensure they have consistent Team IDs
-                for _, row in round_matches.iterrows():
-                    updated_row = row.copy()
-                    # Ensure consistent values for all rows in this Round_ID
-                    for key, value in consistent_values.items():
-                        if key in updated_row.index:
-                            updated_row[key] = value
-                    expanded_rows.append(updated_row)
-
-                # Add empty rows to reach exactly 7 total
-                rows_to_add = 7 - current_count
-                for i in range(rows_to_add):
-                    new_row = template_row.copy()
-
-                    # Set consistent values first
-                    for key, value in consistent_values.items():
-                        if key in new_row.index:
-                            new_row[key] = value
-
-                    # Clear all other columns except the consistent ones
-                    preserve_columns = list(consistent_values.keys())
-                    for col in new_row.index:
-                        if col not in preserve_columns:
-                            new_row[col] = ''
-
-                    expanded_rows.append(new_row)
-
-                rounds_expanded += 1
-                rows_added += rows_to_add
-                logger.debug(f"Round_ID {round_id}: Had {current_count} rows, added {rows_to_add} empty rows to reach 7 total")
-
-            elif current_count == 7:
-                # Perfect - add all 7 rows but ensure consistent Team IDs
-                for _, row in round_matches.iterrows():
-                    updated_row = row.copy()
-                    # Ensure consistent values for all rows in this Round_ID
-                    for key, value in consistent_values.items():
-                        if key in updated_row.index:
-                            updated_row[key] = value
-                    expanded_rows.append(updated_row)
-                logger.debug(f"Round_ID {round_id}: Already has exactly 7 rows")
-
-            else:
-                # More than 7 rows - keep only the first 7 but ensure consistent Team IDs
-                for i, (_, row) in enumerate(round_matches.iterrows()):
-                    if i < 7:
-                        updated_row = row.copy()
-                        # Ensure consistent values for all rows in this Round_ID
-                        for key, value in consistent_values.items():
-                            if key in updated_row.index:
-                                updated_row[key] = value
-                        expanded_rows.append(updated_row)
-                    else:
-                        break
-
-                rounds_trimmed += 1
-                rows_removed += (current_count - 7)
-                logger.debug(f"Round_ID {round_id}: Had {current_count} rows, trimmed to 7 rows (removed {current_count - 7} rows)")
-
-        logger.info(f"Processed {len(round_counts)} rounds: expanded {rounds_expanded} rounds (added {rows_added} rows), trimmed {rounds_trimmed} rounds (removed {rows_removed} rows)")
-
-        if expanded_rows:
-            expanded_df = pd.DataFrame(expanded_rows)
-
-            # Final verification - log a sample of the results
-            if not expanded_df.empty:
-                sample_round = expanded_df['Round_ID'].iloc[0]
-                sample_data = expanded_df[expanded_df['Round_ID'] == sample_round]
-                logger.info(f"Sample verification for Round_ID {sample_round}:")
-                for col in [team_home_col, team_away_col]:
-                    if col and col in sample_data.columns:
-                        unique_values = sample_data[col].unique()
-                        logger.info(f"  {col}: {unique_values} (should have only 1 unique value)")
-
-            return expanded_df.reset_index(drop=True)
-        else:
-            return matches_df
-
-    def remove_empty_duplicate_rows(df):
-            """
-            Remove empty/placeholder rows that were created during expansion.
-            Removes rows that only have basic identifier columns filled but no actual match data.
-            Only preserves rows that have meaningful match/player data beyond the basic identifiers.
-            """
-            if df.empty:
-                return df
-
-            initial_count = len(df)
-            logger.info(f"Starting empty row removal with {initial_count} rows")
-
-            # Find the correct column names for Team IDs (handle different naming variations)
-            team_home_col = None
-            team_away_col = None
-
-            possible_home_names = ['Team_Home_ID_Matches', 'Team_ID_Home_Matches', 'Team_Home_ID', 'Home_Team_ID']
-            possible_away_names = ['Team_Away_ID_Matches', 'Team_ID_Away_Matches', 'Team_Away_ID', 'Away_Team_ID']
-
-            for col in df.columns:
-                if col in possible_home_names:
-                    team_home_col = col
-                if col in possible_away_names:
-                    team_away_col = col
-
-            # Define basic identifier columns that don't count as "meaningful data"
-            basic_identifier_columns = ['season_id', 'pool_id', 'Round_ID']
-            if team_home_col:
-                basic_identifier_columns.append(team_home_col)
-            if team_away_col:
-                basic_identifier_columns.append(team_away_col)
-
-            # Define data columns that indicate this is a real match row with actual data
-            meaningful_data_columns = []
-            for col in df.columns:
-                if col not in basic_identifier_columns:
-                    meaningful_data_columns.append(col)
-
-            logger.info(f"Basic identifier columns: {basic_identifier_columns}")
-            logger.info(f"Meaningful data columns to check: {len(meaningful_data_columns)} columns")
-
-            # Identify rows to keep: only rows that have meaningful data beyond basic identifiers
-            rows_to_keep = []
-            empty_rows_removed = 0
-
-            for idx, row in df.iterrows():
-                # Check if this row has any meaningful data beyond basic identifiers
-                has_meaningful_data = False
-
-                # Check meaningful data columns for actual content
-                for col in meaningful_data_columns:
-                    value = row[col]
-                    if pd.notna(value) and str(value).strip() != '':
-                        has_meaningful_data = True
-                        break
-
-                if has_meaningful_data:
-                    rows_to_keep.append(idx)
-                else:
-                    empty_rows_removed += 1
-                    logger.debug(f"Removing row with only basic identifiers - Round_ID: {row.get('Round_ID', 'Unknown')}")
-
-            # Keep only rows with meaningful data beyond basic identifiers
-            df_cleaned = df.loc[rows_to_keep].copy()
+    def write_workbook():
+        """Build and write the workbook; runs in a worker thread so Sheets uploads keep flowing"""
+        sheets = {}
+
+        # Save consolidated standings data
+        if batch_data.get('standings'):
+            standings_df = pd.DataFrame(batch_data['standings'])
+
+            # Reorder columns to put identifiers first
+            cols = standings_df.columns.tolist()
+            if 'season_id' in cols and 'pool_id' in cols:
+                cols.remove('season_id')
+                cols.remove('pool_id')
+                cols = ['season_id', 'pool_id'] + cols
+                standings_df = standings_df[cols]
+
+            sheets['Standings'] = standings_df
+            logger.info(f"Saved {len(standings_df)} final standings records.")
+
+        # Save consolidated rounds data
+        if batch_data.get('rounds'):
+            rounds_df = pd.DataFrame(batch_data['rounds'])
+            cols = rounds_df.columns.tolist()
+            if 'season_id' in cols and 'pool_id' in cols:
+                cols.remove('season_id')
+                cols.remove('pool_id')
+                cols = ['season_id', 'pool_id'] + cols
+                rounds_df = rounds_df[cols]
+
+            sheets['Rounds'] = rounds_df
+            logger.info(f"Saved {len(rounds_df)} final rounds records.")
+
+        # Save consolidated matches data - WITH IMPROVED EXPANSION TO EXACTLY 7 ROWS
+        if batch_data.get('matches'):
+            matches_df = pd.DataFrame(batch_data['matches'])
+            cols = matches_df.columns.tolist()
+            if 'season_id' in cols and 'pool_id' in cols:
+                cols.remove('season_id')
+                cols.remove('pool_id')
+                cols = ['season_id', 'pool_id'] + cols
+                matches_df = matches_df[cols]
+
+            # Check if we need to load existing Excel data for comparison
+            # (This would be needed if you're updating an existing file)
+            try:
+                # If updating existing file, you could load it here
+                # existing_df = pd.read_excel(output_name, sheet_name='Matches')
+                # combined_df = pd.concat([existing_df, matches_df], ignore_index=True)
+                # First remove empty duplicates, then expand
+                # matches_df = remove_empty_rows(combined_df)
+                pass
+            except:
+                # New file, use current data
+                pass
 
-            final_count = len(df_cleaned)
-            logger.info(f"Removed {empty_rows_removed} rows with only basic identifiers, {final_count} rows remaining")
+            # First remove any empty duplicate rows
+            matches_df = remove_empty_rows(matches_df)
+
+            # Then expand matches to exactly 7 rows per Round_ID
+            matches_df = expand_matches_to_7_rows(matches_df)
+
+            # Remove empty set score columns
+            set_columns = [col for col in matches_df.columns if 'Set Score' in col]
+            for col in set_columns:
+                if matches_df[col].isna().all() or (matches_df[col] == '').all():
+                    matches_df = matches_df.drop(columns=[col])
+
+            sheets['Matches'] = matches_df
+            logger.info(f"Saved {len(matches_df)} final matches records (exactly 7 rows per Round_ID).")
+
+        # Save consolidated organizations data
+        if batch_data.get('organizations'):
+            organizations_df = pd.DataFrame(batch_data['organizations'])
+            cols = organizations_df.columns.tolist()
+            if 'season_id' in cols and 'pool_id' in cols:
+                cols.remove('season_id')
+                cols.remove('pool_id')
+                cols = ['season_id', 'pool_id'] + cols
+                organizations_df = organizations_df[cols]
+
+            sheets['Organizations'] = organizations_df
+            logger.info(f"Saved {len(organizations_df)} final organizations records.")
+
+        # Create comprehensive summary sheet
+        summary_data = {
+            'Metric': [
+                'Total League-Pool Combinations Processed',
+                'Successful Combinations',
+                'Failed Combinations',
+                'Success Rate (%)',
+                'Total Final Standings Records',
+                'Total Final Rounds Records',
+                # 'Total Final Players Records',
+                'Total Final Matches Records',
+                'Total Final Organizations Records',
+                'Report Generated'
+            ],
+            'Count/Value': [
+                batch_data.get('total_processed', 0),
+                len(batch_data.get('successful_combinations', [])),
+                len(batch_data.get('failed_combinations', [])),
+                round((len(batch_data.get('successful_combinations', [])) / max(batch_data.get('total_processed', 1), 1)) * 100, 2),
+                len(batch_data.get('standings', [])),
+                len(batch_data.get('rounds', [])),
+                # len(batch_data.get('players', [])),
+                len(batch_data.get('matches', [])),
+                len(batch_data.get('organizations', [])),
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ]
+        }
 
-            return df_cleaned.reset_index(drop=True)
+        for metric, value in degraded_endpoint_summary_rows(batch_data):
+            summary_data['Metric'].append(metric)
+            summary_data['Count/Value'].append(value)
+
+        summary_df = pd.DataFrame(summary_data)
+        sheets['Executive_Summary'] = summary_df
+
+        # Add processing results details
+        if batch_data.get('successful_combinations') or batch_data.get('failed_combinations'):
+            processing_results = []
+
+            # Add successful combinations
+            if batch_data.get('successful_combinations'):
+                for combo in batch_data['successful_combinations']:
+                    processing_results.append({
+                        'League_ID': combo[0] if isinstance(combo, (list, tuple)) else combo.get('league_id', combo),
+                        'Pool_ID': combo[1] if isinstance(combo, (list, tuple)) else combo.get('pool_id', ''),
+                        'Status': 'Success',
+                        'Records_Found': 'Yes'
+                    })
+
+            # Add failed combinations
+            if batch_data.get('failed_combinations'):
+                for combo in batch_data['failed_combinations']:
+                    processing_results.append({
+                        'League_ID': combo[0] if isinstance(combo, (list, tuple)) else combo.get('league_id', combo),
+                        'Pool_ID': combo[1] if isinstance(combo, (list, tuple)) else combo.get('pool_id', ''),
+                        'Status': 'Failed',
+                        'Records_Found': 'No'
+                    })
+
+            # Save processing results if there are any
+            if processing_results:
+                processing_df = pd.DataFrame(processing_results)
+                sheets['Processing_Results'] = processing_df
+
+        write_excel_workbook(output_name, sheets)
 
     try:
-        with pd.ExcelWriter(f"{output_name}", engine='openpyxl') as writer:
-
-            def format_worksheet(worksheet, dataframe):
-                """Helper function to freeze first row and auto-adjust row heights"""
-                # Freeze the first row (header row)
-                worksheet.freeze_panes = 'A2'
-
-                # Auto-adjust row heights
-                for row in worksheet.iter_rows():
-                    worksheet.row_dimensions[row[0].row].height = None  # Auto height
-
-                # Optional: Auto-adjust column widths too
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-
-            # Save consolidated standings data
-            if batch_data.get('standings'):
-                standings_df = pd.DataFrame(batch_data['standings'])
-
-                # Reorder columns to put identifiers first
-                cols = standings_df.columns.tolist()
-                if 'season_id' in cols and 'pool_id' in cols:
-                    cols.remove('season_id')
-                    cols.remove('pool_id')
-                    cols = ['season_id', 'pool_id'] + cols
-                    standings_df = standings_df[cols]
-
-                standings_df.to_excel(writer, sheet_name='Standings', index=False)
-                format_worksheet(writer.sheets['Standings'], standings_df)
-                logger.info(f"Saved {len(standings_df)} final standings records.")
-
-            # Save consolidated rounds data
-            if batch_data.get('rounds'):
-                rounds_df = pd.DataFrame(batch_data['rounds'])
-                cols = rounds_df.columns.tolist()
-                if 'season_id' in cols and 'pool_id' in cols:
-                    cols.remove('season_id')
-                    cols.remove('pool_id')
-                    cols = ['season_id', 'pool_id'] + cols
-                    rounds_df = rounds_df[cols]
-
-                rounds_df.to_excel(writer, sheet_name='Rounds', index=False)
-                format_worksheet(writer.sheets['Rounds'], rounds_df)
-                logger.info(f"Saved {len(rounds_df)} final rounds records.")
-
-            # Save consolidated matches data - WITH IMPROVED EXPANSION TO EXACTLY 7 ROWS
-            if batch_data.get('matches'):
-                matches_df = pd.DataFrame(batch_data['matches'])
-                cols = matches_df.columns.tolist()
-                if 'season_id' in cols and 'pool_id' in cols:
-                    cols.remove('season_id')
-                    cols.remove('pool_id')
-                    cols = ['season_id', 'pool_id'] + cols
-                    matches_df = matches_df[cols]
-
-                # Check if we need to load existing Excel data for comparison
-                # (This would be needed if you're updating an existing file)
-                try:
-                    # If updating existing file, you could load it here
-                    # existing_df = pd.read_excel(output_name, sheet_name='Matches')
-                    # combined_df = pd.concat([existing_df, matches_df], ignore_index=True)
-                    # First remove empty duplicates, then expand
-                    # matches_df = remove_empty_duplicate_rows(combined_df)
-                    pass
-                except:
-                    # New file, use current data
-                    pass
-
-                # First remove any empty duplicate rows
-                matches_df = remove_empty_duplicate_rows(matches_df)
-
-                # Then expand matches to exactly 7 rows per Round_ID
-                matches_df = expand_matches_to_7_rows(matches_df)
-
-                # Remove empty set score columns
-                set_columns = [col for col in matches_df.columns if 'Set Score' in col]
-                for col in set_columns:
-                    if matches_df[col].isna().all() or (matches_df[col] == '').all():
-                        matches_df = matches_df.drop(columns=[col])
-
-                matches_df.to_excel(writer, sheet_name='Matches', index=False)
-                format_worksheet(writer.sheets['Matches'], matches_df)
-                logger.info(f"Saved {len(matches_df)} final matches records (exactly 7 rows per Round_ID).")
-
-            # Save consolidated organizations data
-            if batch_data.get('organizations'):
-                organizations_df = pd.DataFrame(batch_data['organizations'])
-                cols = organizations_df.columns.tolist()
-                if 'season_id' in cols and 'pool_id' in cols:
-                    cols.remove('season_id')
-                    cols.remove('pool_id')
-                    cols = ['season_id', 'pool_id'] + cols
-                    organizations_df = organizations_df[cols]
-
-                organizations_df.to_excel(writer, sheet_name='Organizations', index=False)
-                format_worksheet(writer.sheets['Organizations'], organizations_df)
-                logger.info(f"Saved {len(organizations_df)} final organizations records.")
-
-            # Create comprehensive summary sheet
-            summary_data = {
-                'Metric': [
-                    'Total League-Pool Combinations Processed',
-                    'Successful Combinations',
-                    'Failed Combinations',
-                    'Success Rate (%)',
-                    'Total Final Standings Records',
-                    'Total Final Rounds Records',
-                    # 'Total Final Players Records',
-                    'Total Final Matches Records',
-                    'Total Final Organizations Records',
-                    'Report Generated'
-                ],
-                'Count/Value': [
-                    batch_data.get('total_processed', 0),
-                    len(batch_data.get('successful_combinations', [])),
-                    len(batch_data.get('failed_combinations', [])),
-                    round((len(batch_data.get('successful_combinations', [])) / max(batch_data.get('total_processed', 1), 1)) * 100, 2),
-                    len(batch_data.get('standings', [])),
-                    len(batch_data.get('rounds', [])),
-                    # len(batch_data.get('players', [])),
-                    len(batch_data.get('matches', [])),
-                    len(batch_data.get('organizations', [])),
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                ]
-            }
-
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Executive_Summary', index=False)
-            format_worksheet(writer.sheets['Executive_Summary'], summary_df)
-
-            # Add processing results details
-            if batch_data.get('successful_combinations') or batch_data.get('failed_combinations'):
-                processing_results = []
-
-                # Add successful combinations
-                if batch_data.get('successful_combinations'):
-                    for combo in batch_data['successful_combinations']:
-                        processing_results.append({
-                            'League_ID': combo[0] if isinstance(combo, (list, tuple)) else combo.get('league_id', combo),
-                            'Pool_ID': combo[1] if isinstance(combo, (list, tuple)) else combo.get('pool_id', ''),
-                            'Status': 'Success',
-                            'Records_Found': 'Yes'
-                        })
-
-                # Add failed combinations
-                if batch_data.get('failed_combinations'):
-                    for combo in batch_data['failed_combinations']:
-                        processing_results.append({
-                            'League_ID': combo[0] if isinstance(combo, (list, tuple)) else combo.get('league_id', combo),
-                            'Pool_ID': combo[1] if isinstance(combo, (list, tuple)) else combo.get('pool_id', ''),
-                            'Status': 'Failed',
-                            'Records_Found': 'No'
-                        })
-
-                # Save processing results if there are any
-                if processing_results:
-                    processing_df = pd.DataFrame(processing_results)
-                    processing_df.to_excel(writer, sheet_name='Processing_Results', index=False)
-                    format_worksheet(writer.sheets['Processing_Results'], processing_df)
+        await asyncio.to_thread(write_workbook)
 
         logger.info(f"Final batch report saved to {output_name}")
         logger.info(f"Report contains consolidated data from all processed league-pool combinations")
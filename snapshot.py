@@ -0,0 +1,166 @@
+from tools import CACHE_DIR
+from logger import setup_logger
+from datetime import datetime
+import pandas as pd
+import asyncio
+import time
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+logger = asyncio.run(setup_logger('snapshot'))
+
+
+PARQUET_SNAPSHOTS = os.getenv('PARQUET_SNAPSHOTS', 'true').lower() in ('1', 'true', 'yes')
+PARQUET_SNAPSHOT_DIR = os.getenv('PARQUET_SNAPSHOT_DIR', os.path.join(CACHE_DIR, 'snapshots'))
+PARQUET_COMPRESSION = os.getenv('PARQUET_COMPRESSION', 'zstd')
+
+# batch_data key -> dataset name
+SNAPSHOT_ENTITIES = {
+    'standings': 'standings',
+    'rounds': 'rounds',
+    'matches': 'matches',
+    'players': 'players',
+    'organizations': 'organisations',
+}
+PARTITION_COLUMNS = ['run_date', 'season_id']
+
+
+# Column types per dataset, fixed so every night's files read back as one table whatever the
+# scraped values looked like that night. Ids and text are strings; columns not listed here
+# (pool_id, admin_name_N, logos_url_N, ...) are stored as strings too.
+SNAPSHOT_COLUMN_TYPES = {
+    'standings': {
+        'Participant ID': 'string', 'team_id_standing': 'string', 'Standing': 'int64', 'Name': 'string',
+        'Match Points': 'int64', 'Played': 'int64', 'Win': 'int64', 'Loss': 'int64',
+        'Games Won': 'int64', 'Games Loss': 'int64', 'Games Difference': 'int64',
+        'Team Games Won': 'int64', 'Team Games Lost': 'int64', 'Team Games Difference': 'int64',
+        'Scored Points': 'int64', 'Conceded Points': 'int64', 'Points Difference': 'int64',
+    },
+    'rounds': {
+        'Match ID': 'string', 'Date': 'string', 'Round': 'int64', 'Time': 'string',
+        'Home': 'string', 'Team_ID_Home': 'string', 'Home Score': 'int64', 'Home Winner': 'bool',
+        'Away': 'string', 'Team_ID_Away': 'string', 'Away Score': 'int64', 'Away Winner': 'bool',
+        'Allow Teams To Change Match Date and Location': 'bool', 'Location': 'string', 'Team URL': 'string',
+    },
+    'matches': {
+        'Round_ID': 'string', 'Team_Home_ID_Matches': 'string', 'Team_Away_ID_Matches': 'string', 'Date': 'string',
+        **{f'{side}_player_{number}_{field}': 'string'
+           for side in ('home', 'away') for number in (1, 2) for field in ('name', 'id', 'rankedin', 'url')},
+        'First Participant Score': 'int64', 'Second Participant Score': 'int64', 'Loser Tie Break': 'int64',
+        **{f'{participant} Participant Set Score {set_number}': 'int64'
+           for set_number in range(1, 6) for participant in ('First', 'Second')},
+        'First Participant Winner': 'bool',
+    },
+    'players': {
+        'Team_ID_Players': 'string', 'Pool ID': 'string', 'Team League ID': 'string', 'Team League Name': 'string',
+        'State Message': 'string', 'Player ID': 'string', 'Ranking Position': 'int64', 'Ranking Timestamp': 'string',
+        'Ranking Name': 'string', 'RankedInId': 'string', 'Name': 'string', 'Player Order': 'int64',
+        'Player Rating': 'float64', 'Team Participant Type': 'string', 'Has License': 'bool', 'Player URL': 'string',
+        'Team Organisation Id': 'string', 'Players Home Club Id': 'string',
+    },
+    'organisations': {
+        'team_id_organisation': 'string', 'Organisation_Id': 'string', 'Name': 'string',
+        'Members Clubs Total': 'int64', 'Member Players Total': 'int64', 'Tournaments Total': 'int64',
+        'Parent Fedration Id': 'string', 'Has Parent Federation logo': 'bool', 'Has Parent Federation': 'bool',
+    },
+}
+BOOLEAN_TEXT = {'true': True, 'false': False, '1': True, '0': False}
+
+
+def entity_schema(entity, records):
+    """Declared columns first, then any other scraped column as string, then the partition columns"""
+    declared = SNAPSHOT_COLUMN_TYPES.get(entity, {})
+    extra = [column for column in dict.fromkeys(key for record in records for key in record)
+             if column not in declared and column not in PARTITION_COLUMNS]
+    fields = [pa.field(column, pa.type_for_alias(type_name)) for column, type_name in declared.items()]
+    fields += [pa.field(column, pa.string()) for column in extra + PARTITION_COLUMNS]
+    return pa.schema(fields)
+
+
+def text_value(value):
+    """Scraped value as text: blanks are null and whole floats lose their '.0' (5.0 -> '5')"""
+    if value is None or value == '' or isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def column_values(values, data_type):
+    """
+    One column cast to its declared type. Blanks and values that don't parse become null rather
+    than failing the snapshot; numbers are cast with safe=False, so a stray decimal in an integer
+    column is truncated.
+    """
+    if pa.types.is_string(data_type):
+        return pa.array([text_value(value) for value in values], pa.string())
+    if pa.types.is_boolean(data_type):
+        return pa.array([value if isinstance(value, bool) else BOOLEAN_TEXT.get(str(value).strip().lower())
+                         for value in values], pa.bool_())
+    numbers = pd.to_numeric(pd.Series([text_value(value) for value in values], dtype=object), errors='coerce')
+    return pa.array(numbers, from_pandas=True).cast(data_type, safe=False)
+
+
+def typed_table(entity, records, run_date):
+    """Records as a table with the entity's fixed schema"""
+    schema = entity_schema(entity, records)
+    partitions = {
+        'run_date': [run_date] * len(records),
+        'season_id': [text_value(record.get('season_id')) or 'unknown' for record in records],
+    }
+    columns = [column_values(partitions.get(field.name) or [record.get(field.name) for record in records], field.type)
+               for field in schema]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def write_batch_snapshot(batch_data, root = PARQUET_SNAPSHOT_DIR, run_date = None):
+    """
+    Write each entity as a zstd Parquet dataset under root/<entity>/run_date=.../season_id=.../.
+    Re-running on the same date replaces that date's partitions. Returns rows written per entity.
+    """
+    run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+    counts = {}
+    for batch_key, entity in SNAPSHOT_ENTITIES.items():
+        records = batch_data.get(batch_key, [])
+        if not records:
+            continue
+
+        table = typed_table(entity, records, run_date)
+        pq.write_to_dataset(
+            table,
+            root_path=os.path.join(root, entity),
+            schema=table.schema,
+            partition_cols=PARTITION_COLUMNS,
+            compression=PARQUET_COMPRESSION,
+            existing_data_behavior='delete_matching',
+            basename_template='part-{i}.parquet',
+        )
+        counts[entity] = len(records)
+    return counts
+
+
+async def save_batch_snapshot(batch_data, root = PARQUET_SNAPSHOT_DIR):
+    """Columnar snapshot of the run next to the Excel export; skipped when disabled or pyarrow is missing"""
+    if not PARQUET_SNAPSHOTS:
+        return None
+    if pa is None:
+        logger.info("pyarrow is not installed, skipping the Parquet snapshot")
+        return None
+
+    started = time.perf_counter()
+    try:
+        counts = await asyncio.to_thread(write_batch_snapshot, batch_data, root)
+    except Exception as e:
+        logger.error(f"Could not write Parquet snapshot to {root}: {str(e)}")
+        return None
+
+    summary = ', '.join(f"{count} {entity}" for entity, count in counts.items())
+    logger.info(f"Parquet snapshot of {summary} written to {root} in {time.perf_counter() - started:.2f}s")
+    return root
@@ -0,0 +1,43 @@
+"""
+Tests for the local SQLite store (database.ScrapeStore).
+"""
+from database import ScrapeStore
+import logging
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path):
+    scrape_store = ScrapeStore(str(tmp_path / 'rankedin.sqlite3'))
+    yield scrape_store
+    scrape_store.close()
+
+
+def player(player_id, team_id = 501, ranking_position = ''):
+    return {'Player ID': player_id, 'Team_ID_Players': team_id, 'season_id': 1, 'pool_id': 2,
+            'Team Organisation Id': 9, 'Ranking Position': ranking_position, 'Name': f'Player {player_id}'}
+
+
+def test_records_without_a_primary_key_are_skipped(store, caplog):
+    players = [player(''), player(None), player(7), player(8, team_id = '')]
+
+    with caplog.at_level(logging.WARNING, logger = 'database'):
+        written = store.upsert('players', players)
+
+    assert written == 1
+    assert store.query('SELECT player_id, team_id FROM players') == [('7', '501')]
+    assert 'Skipped 3 players records without player_id / team_id' in caplog.text
+
+
+def test_rankings_without_a_player_id_are_skipped(store):
+    counts = store.upsert_batch({'players': [player('', ranking_position = 3), player(7, ranking_position = 12)]})
+
+    assert counts['rankings'] == 1
+    assert store.query('SELECT player_id, ranking_position FROM rankings') == [('7', '12')]
+
+
+def test_upsert_keeps_one_row_per_key(store):
+    store.upsert('players', [player(7)], run_date = '2026-10-17')
+    store.upsert('players', [player(7), player(8)], run_date = '2026-10-18')
+
+    assert store.query('SELECT player_id, run_date FROM players ORDER BY player_id') == [('7', '2026-10-18'), ('8', '2026-10-18')]
@@ -0,0 +1,58 @@
+"""
+Parity tests for tools.expand_matches_to_7_rows against the per-round loop it replaced
+(benchmark.legacy_expand_matches_to_7_rows).
+"""
+from benchmark import legacy_expand_matches_to_7_rows, make_matches_frame, make_season_matches
+from tools import expand_matches_to_7_rows
+import pandas as pd
+import pytest
+
+
+def assert_parity(df):
+    result = expand_matches_to_7_rows(df)
+    expected = legacy_expand_matches_to_7_rows(df)
+    pd.testing.assert_frame_equal(result, expected)
+    return result
+
+
+@pytest.mark.parametrize('rounds', [20, 300])
+def test_season_parity(rounds):
+    result = assert_parity(make_season_matches(rounds))
+    assert (result.groupby('Round_ID', sort = False).size() == 7).all()
+
+
+def test_complete_rounds_are_unchanged():
+    df = make_matches_frame(70)
+    result = assert_parity(df)
+    pd.testing.assert_frame_equal(result, df)
+
+
+def test_round_over_seven_rows_is_trimmed():
+    df = make_matches_frame(20)
+    df['Round_ID'] = 0
+    assert len(assert_parity(df)) == 7
+
+
+def test_padding_copies_ids_from_the_first_row():
+    df = pd.DataFrame({
+        'season_id': [1, 1, 1],
+        'pool_id': [2, 2, 2],
+        'Round_ID': [10, 10, 11],
+        'Team_Home_ID_Matches': ['100', '', '101'],
+        'Team_Away_ID_Matches': ['200', '201', '201'],
+        'Date': ['2025-01-01', '2025-01-01', None],
+    })
+    result = assert_parity(df)
+
+    assert len(result) == 14
+    assert result.loc[result['Round_ID'] == 10, 'Team_Home_ID_Matches'].eq('100').all()
+    assert result['Date'].iloc[2:7].eq('').all()
+
+
+def test_without_round_id_the_frame_is_returned_as_is():
+    df = pd.DataFrame({'Date': ['2025-01-01']})
+    assert assert_parity(df) is df
+
+
+def test_empty_frame():
+    assert_parity(make_matches_frame(0))
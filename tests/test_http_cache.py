@@ -0,0 +1,57 @@
+"""
+Expiry of cached RankedIn responses across the nightly runs (22:30 Europe/Copenhagen).
+"""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import tools
+import pytest
+
+
+HISTORY_URL = 'https://api.rankedin.com/v1/player/GetHistoricDataAsync?id=12345'
+
+
+def copenhagen(*args):
+    return datetime(*args, tzinfo = ZoneInfo('Europe/Copenhagen')).timestamp()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    response_cache = tools.ResponseCache(str(tmp_path / 'http_cache.sqlite3'))
+    yield response_cache
+    response_cache.connection.close()
+
+
+@pytest.mark.parametrize('cached_at', [
+    copenhagen(2026, 10, 14, 22, 35),
+    copenhagen(2026, 10, 14, 23, 59),
+    # A long run that went past midnight
+    copenhagen(2026, 10, 15, 1, 30),
+])
+def test_ranking_history_cached_by_one_nightly_run_is_reused_by_the_next(cache, monkeypatch, cached_at):
+    monkeypatch.setattr(tools, 'RANKING_PUBLICATION_WEEKDAYS', set())
+    monkeypatch.setattr(tools.time, 'time', lambda: cached_at)
+    cache.put(HISTORY_URL, 200, b'{"ok": true}', tools.cache_expiry(HISTORY_URL, cached_at))
+
+    next_run = copenhagen(2026, 10, 15, 22, 35)
+    monkeypatch.setattr(tools.time, 'time', lambda: next_run)
+    result = cache.get(HISTORY_URL)
+
+    assert result is not None and result.from_cache
+    assert result.data == {'ok': True}
+
+
+def test_ranking_history_is_refetched_after_a_publication_day(cache, monkeypatch):
+    # 2026-10-15 is a Thursday
+    monkeypatch.setattr(tools, 'RANKING_PUBLICATION_WEEKDAYS', {3})
+    cached_at = copenhagen(2026, 10, 14, 22, 35)
+    monkeypatch.setattr(tools.time, 'time', lambda: cached_at)
+    cache.put(HISTORY_URL, 200, b'{"ok": true}', tools.cache_expiry(HISTORY_URL, cached_at))
+
+    monkeypatch.setattr(tools.time, 'time', lambda: copenhagen(2026, 10, 15, 22, 35))
+    assert cache.get(HISTORY_URL) is None
+
+
+def test_ranking_history_without_publication_days_expires_within_two_days(monkeypatch):
+    monkeypatch.setattr(tools, 'RANKING_PUBLICATION_WEEKDAYS', set())
+    cached_at = copenhagen(2026, 10, 14, 22, 35)
+    assert tools.ranking_history_expiry(cached_at) == copenhagen(2026, 10, 16)
@@ -0,0 +1,73 @@
+"""
+Parity tests for tools.remove_empty_rows against the iterrows filter it replaced
+(benchmark.legacy_remove_empty_rows).
+"""
+from benchmark import legacy_remove_empty_rows, make_padded_matches
+from tools import remove_empty_rows
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def matches_frame(**data_columns):
+    """Three placeholder-style rows with identifier columns set, plus the given data columns"""
+    frame = pd.DataFrame({
+        'season_id': [1, 1, 1],
+        'pool_id': [2, 2, 2],
+        'Round_ID': [10, 10, 11],
+        'Team_Home_ID_Matches': ['100', '100', '101'],
+        'Team_Away_ID_Matches': ['200', '200', '201'],
+    })
+    for column, values in data_columns.items():
+        frame[column] = values
+    return frame
+
+
+def assert_parity(df):
+    result = remove_empty_rows(df)
+    expected = legacy_remove_empty_rows(df)
+    pd.testing.assert_frame_equal(result, expected)
+    return result
+
+
+@pytest.mark.parametrize('values', [
+    ['', '', ''],
+    ['  ', '\t', ' \n '],
+    [None, None, None],
+    [np.nan, np.nan, np.nan],
+    [None, np.nan, ''],
+], ids = ['blank', 'whitespace', 'none', 'nan', 'mixed'])
+def test_blank_values_are_dropped(values):
+    result = assert_parity(matches_frame(Date = values, Court = list(values)))
+    assert result.empty
+
+
+def test_only_identifier_columns_set_is_dropped():
+    result = assert_parity(matches_frame())
+    assert result.empty
+
+
+def test_rows_with_any_value_are_kept():
+    df = matches_frame(
+        Date = ['2025-01-01', '', None],
+        Court = ['', ' ', 'Court 1'],
+        Score = [np.nan, np.nan, np.nan],
+    )
+    result = assert_parity(df)
+    assert result['Round_ID'].tolist() == [10, 11]
+
+
+def test_numeric_zero_and_false_count_as_data():
+    df = matches_frame(Score = [0.0, np.nan, np.nan], Is_Played = [None, False, None])
+    result = assert_parity(df)
+    assert len(result) == 2
+
+
+def test_empty_frame():
+    df = pd.DataFrame()
+    assert remove_empty_rows(df).empty
+
+
+@pytest.mark.parametrize('rounds', [20, 200])
+def test_padded_season_matches_legacy(rounds):
+    assert_parity(make_padded_matches(rounds))
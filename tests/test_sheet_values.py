@@ -0,0 +1,44 @@
+"""
+Parity tests for tools.dataframe_to_sheet_values against the iterrows formatter it replaced
+(benchmark.legacy_format_dataframe_for_sheets).
+"""
+from benchmark import legacy_format_dataframe_for_sheets, make_matches_frame
+from tools import dataframe_to_sheet_values
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize('zero_as_text', [False, True])
+def test_matches_frame_parity(zero_as_text):
+    df = make_matches_frame(2_000)
+    assert dataframe_to_sheet_values(df, zero_as_text) == legacy_format_dataframe_for_sheets(df, zero_as_text)
+
+
+@pytest.mark.parametrize('zero_as_text', [False, True])
+def test_negative_zero_is_kept_apart_from_zero(zero_as_text):
+    # The text column keeps iterrows from upcasting the rows, as in the real sheets
+    df = pd.DataFrame({'score': [0.0, -0.0, np.nan, 1.5, -0.0], 'name': ['a', None, 'b', 'c', 'd']})
+    result = dataframe_to_sheet_values(df, zero_as_text)
+
+    assert result == legacy_format_dataframe_for_sheets(df, zero_as_text)
+    if not zero_as_text:
+        assert [row[0] for row in result[1:]] == ['0.0', '-0.0', '', '1.5', '-0.0']
+
+
+def test_mixed_object_column_parity():
+    df = pd.DataFrame({'value': [0, 0.0, -0.0, False, '0', None, 'x', 7]}, dtype = object)
+    for zero_as_text in (False, True):
+        assert dataframe_to_sheet_values(df, zero_as_text) == legacy_format_dataframe_for_sheets(df, zero_as_text)
+
+
+def test_empty_frame():
+    assert dataframe_to_sheet_values(pd.DataFrame()) == legacy_format_dataframe_for_sheets(pd.DataFrame()) == []
+
+
+def test_all_numeric_frame_keeps_integer_columns_as_integers():
+    # Intentional difference: iterrows upcasts each row of an int + float frame to float64
+    df = pd.DataFrame({'Round_ID': [10, 11], 'Score': [0.5, np.nan]})
+
+    assert legacy_format_dataframe_for_sheets(df) == [['Round_ID', 'Score'], ['10.0', '0.5'], ['11.0', '']]
+    assert dataframe_to_sheet_values(df) == [['Round_ID', 'Score'], ['10', '0.5'], ['11', '']]
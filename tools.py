@@ -1,19 +1,751 @@
 from openpyxl.utils import get_column_letter
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from collections import deque
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
 from fake_useragent import UserAgent
 from logger import setup_logger
+from zoneinfo import ZoneInfo
 from primp import AsyncClient
-from datetime import datetime
 import pandas as pd
+import numpy as np
 import itertools
+import hashlib
+import sqlite3
 import asyncio
 import random
+import json
 import pytz
+import time
 import os
+import re
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 logger = asyncio.run(setup_logger('tools'))
 
 
+CLIENT_POOL_SIZE = int(os.getenv('CLIENT_POOL_SIZE', 20))
+CLIENT_MAX_LIFETIME = float(os.getenv('CLIENT_MAX_LIFETIME', 600))
+CLIENT_IMPERSONATE = 'chrome_131'
+CLIENT_IMPERSONATE_OS = 'windows'
+CLIENT_CHROME_MAJOR = CLIENT_IMPERSONATE.split('_')[1]
+
+
+class ClientPool:
+    """
+    Fixed-size pool of keep-alive primp clients shared by every request.
+
+    Clients are created lazily, handed out most-recently-used first so their connections
+    stay warm, and rebuilt once they are older than max_lifetime seconds or after a request
+    on them raised.
+    """
+
+    def __init__(self, size = CLIENT_POOL_SIZE, max_lifetime = CLIENT_MAX_LIFETIME):
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.created = 0
+        self.recycled = 0
+        self.closed = False
+        self._slots = asyncio.LifoQueue()
+        for _ in range(size):
+            self._slots.put_nowait(None)
+
+    def _new_client(self):
+        self.created += 1
+        client = AsyncClient(
+            impersonate=CLIENT_IMPERSONATE,
+            impersonate_os=CLIENT_IMPERSONATE_OS,
+            cookie_store=True,
+        )
+        return client, time.monotonic()
+
+    @asynccontextmanager
+    async def client(self):
+        if self.closed:
+            raise RuntimeError("Client pool is closed")
+
+        slot = await self._slots.get()
+        try:
+            if slot is not None and time.monotonic() - slot[1] > self.max_lifetime:
+                self.recycled += 1
+                slot = None
+            if slot is None:
+                slot = self._new_client()
+            yield slot[0]
+        except Exception:
+            # Drop the client so a broken connection is not handed out again
+            slot = None
+            raise
+        finally:
+            self._slots.put_nowait(None if self.closed else slot)
+
+    async def close(self):
+        self.closed = True
+        while not self._slots.empty():
+            self._slots.get_nowait()
+        logger.info(f"Client pool closed ({self.created} clients created, {self.recycled} recycled)")
+
+
+_client_pool = None
+
+
+async def get_client_pool():
+    global _client_pool
+    if _client_pool is None or _client_pool.closed:
+        _client_pool = ClientPool()
+    return _client_pool
+
+
+async def close_client_pool():
+    global _client_pool
+    if _client_pool is not None:
+        await _client_pool.close()
+        _client_pool = None
+
+
+# Requests per second and burst size allowed per host
+RATE_LIMITS = {
+    'api.rankedin.com': (float(os.getenv('RANKEDIN_API_RATE', 5)), int(os.getenv('RANKEDIN_API_BURST', 10))),
+    'rankedin.com': (float(os.getenv('RANKEDIN_WEB_RATE', 2)), int(os.getenv('RANKEDIN_WEB_BURST', 4))),
+}
+DEFAULT_RATE_LIMIT = (float(os.getenv('DEFAULT_RATE', 5)), int(os.getenv('DEFAULT_BURST', 10)))
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst` tokens"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # The lock keeps waiters in FIFO order while one of them sleeps for the next token
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+                self.waited += wait
+                await asyncio.sleep(wait)
+
+
+_rate_limiters = {}
+
+
+async def acquire_rate_limit(url):
+    """Wait until the host of `url` has a request token available"""
+    host = urlparse(url).hostname or ''
+    limiter = _rate_limiters.get(host)
+    if limiter is None:
+        rate, burst = RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+        limiter = _rate_limiters[host] = TokenBucket(rate, burst)
+    await limiter.acquire()
+
+
+# Adaptive (AIMD) cap on requests in flight across every fetcher; the client pool size is the ceiling
+ADAPTIVE_MIN_CONCURRENCY = int(os.getenv('ADAPTIVE_MIN_CONCURRENCY', 2))
+ADAPTIVE_MAX_CONCURRENCY = min(int(os.getenv('ADAPTIVE_MAX_CONCURRENCY', CLIENT_POOL_SIZE)), CLIENT_POOL_SIZE)
+ADAPTIVE_INITIAL_CONCURRENCY = int(os.getenv('ADAPTIVE_INITIAL_CONCURRENCY', 8))
+ADAPTIVE_TARGET_P95 = float(os.getenv('ADAPTIVE_TARGET_P95', 3.0))
+ADAPTIVE_MAX_ERROR_RATE = float(os.getenv('ADAPTIVE_MAX_ERROR_RATE', 0.05))
+ADAPTIVE_DECREASE_FACTOR = 0.5
+ADAPTIVE_COOLDOWN = 5.0
+ADAPTIVE_WINDOW = 100
+
+
+class AdaptiveLimiter:
+    """
+    Additive-increase / multiplicative-decrease limit on concurrent requests.
+
+    The limit grows by one after each `limit` successful requests while the p95 latency and the
+    error rate over the recent window stay under target, and is halved on 429, 5xx or timeouts
+    (at most once per cooldown, so one burst of failures counts as a single signal).
+    """
+
+    def __init__(self, initial = ADAPTIVE_INITIAL_CONCURRENCY, minimum = ADAPTIVE_MIN_CONCURRENCY,
+                 maximum = ADAPTIVE_MAX_CONCURRENCY):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self.latencies = deque(maxlen = ADAPTIVE_WINDOW)
+        self.errors = deque(maxlen = ADAPTIVE_WINDOW)
+        self.successes_since_increase = 0
+        self.last_decrease = float('-inf')
+        self.increases = 0
+        self.decreases = 0
+        self.peak_limit = self.limit
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def p95_latency(self):
+        if len(self.latencies) < 20:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def error_rate(self):
+        return sum(self.errors) / len(self.errors) if self.errors else 0.0
+
+    def record(self, outcome, latency = None):
+        """outcome is 'ok', 'error' (bad payload, 4xx) or 'overload' (429, 5xx, timeout)"""
+        self.errors.append(outcome != 'ok')
+
+        if outcome == 'overload':
+            now = time.monotonic()
+            if now - self.last_decrease >= ADAPTIVE_COOLDOWN:
+                previous = self.limit
+                self.limit = max(self.minimum, self.limit * ADAPTIVE_DECREASE_FACTOR)
+                self.last_decrease = now
+                self.successes_since_increase = 0
+                self.decreases += 1
+                logger.warning(f"Adaptive limiter: backing off from {int(previous)} to {int(self.limit)} requests in flight")
+            return
+
+        if outcome != 'ok':
+            return
+
+        self.latencies.append(latency)
+        self.successes_since_increase += 1
+        if self.successes_since_increase < self.limit or self.limit >= self.maximum:
+            return
+
+        p95 = self.p95_latency()
+        if (p95 is None or p95 <= ADAPTIVE_TARGET_P95) and self.error_rate() <= ADAPTIVE_MAX_ERROR_RATE:
+            self.limit = min(self.maximum, self.limit + 1)
+            self.peak_limit = max(self.peak_limit, self.limit)
+            self.increases += 1
+        self.successes_since_increase = 0
+
+    def log_stats(self):
+        p95 = self.p95_latency()
+        p95_text = f"{p95:.2f}s" if p95 is not None else 'n/a'
+        logger.info(
+            f"Adaptive limiter: limit {int(self.limit)} (peak {int(self.peak_limit)}), "
+            f"{self.increases} increases, {self.decreases} decreases, p95 {p95_text}, "
+            f"error rate {self.error_rate():.1%}"
+        )
+
+
+def failure_outcome(status_code = None, error = None):
+    """Classify a failed request for AdaptiveLimiter.record: throttling, server errors and timeouts mean overload"""
+    if status_code is not None:
+        return 'overload' if status_code == 429 or status_code >= 500 else 'error'
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)) or 'timed out' in str(error).lower() or 'timeout' in str(error).lower():
+        return 'overload'
+    return 'error'
+
+
+_adaptive_limiter = None
+
+
+async def get_adaptive_limiter():
+    global _adaptive_limiter
+    if _adaptive_limiter is None:
+        _adaptive_limiter = AdaptiveLimiter()
+    return _adaptive_limiter
+
+# Per endpoint family circuit breakers: after enough consecutive failures calls fail fast until a probe succeeds
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 8))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', 60))
+
+
+def endpoint_family(url):
+    """Endpoint name a URL belongs to, e.g. GetHistoricDataAsync; ids in the path are ignored"""
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split('/') if segment and not segment.isdigit()]
+    return segments[-1] if segments else parsed.netloc
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker for one endpoint family.
+
+    `failure_threshold` consecutive failures open the circuit; while open every call is
+    rejected. After `reset_timeout` seconds a single probe is let through (half-open): success
+    closes the circuit, failure opens it again for another timeout.
+    """
+
+    def __init__(self, family, failure_threshold = CIRCUIT_FAILURE_THRESHOLD, reset_timeout = CIRCUIT_RESET_TIMEOUT):
+        self.family = family
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self.trips = 0
+        self.rejected = 0
+        self.last_reason = ''
+        self.first_opened = None
+
+    def allow(self):
+        if self.state == 'closed':
+            return True
+
+        now = time.monotonic()
+        if self.state == 'open' and now - self.opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+            self.probe_started = None
+            logger.info(f"Circuit {self.family}: half-open, sending a probe request")
+
+        # One probe at a time; a probe that never reported back is replaced after a timeout
+        if self.state == 'half_open' and (self.probe_started is None or now - self.probe_started >= self.reset_timeout):
+            self.probe_started = now
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        if self.state != 'closed':
+            logger.info(f"Circuit {self.family}: probe succeeded, closing")
+        self.state = 'closed'
+        self.failures = 0
+        self.probe_started = None
+
+    def record_failure(self, reason):
+        self.last_reason = reason
+        if self.state == 'half_open':
+            self._open(f"probe failed: {reason}")
+            return
+
+        self.failures += 1
+        if self.state == 'closed' and self.failures >= self.failure_threshold:
+            self._open(reason)
+
+    def _open(self, reason):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self.probe_started = None
+        self.trips += 1
+        if self.first_opened is None:
+            self.first_opened = datetime.now()
+        logger.warning(f"Circuit {self.family}: open after {self.failures} consecutive failures ({reason}), "
+                       f"failing fast for {self.reset_timeout:.0f}s")
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's circuit is open, so the request was not sent"""
+
+
+_circuit_breakers = {}
+
+
+def get_circuit_breaker(url):
+    family = endpoint_family(url)
+    breaker = _circuit_breakers.get(family)
+    if breaker is None:
+        breaker = _circuit_breakers[family] = CircuitBreaker(family)
+    return breaker
+
+
+def reset_circuit_breakers():
+    _circuit_breakers.clear()
+
+
+def degraded_endpoints():
+    """Endpoint families whose circuit opened during the run, for the Executive Summary"""
+    return [
+        {
+            'Endpoint': breaker.family,
+            'State': breaker.state,
+            'Trips': breaker.trips,
+            'Calls_Skipped': breaker.rejected,
+            'First_Opened': breaker.first_opened.strftime('%Y-%m-%d %H:%M:%S'),
+            'Reason': breaker.last_reason,
+        }
+        for breaker in _circuit_breakers.values() if breaker.trips
+    ]
+
+
+def degraded_endpoint_summary_rows(batch_data):
+    """Executive Summary rows describing the endpoints that were failing fast during the run"""
+    endpoints = batch_data.get('degraded_endpoints', [])
+    rows = [['Degraded Endpoints', len(endpoints)]]
+    for endpoint in endpoints:
+        rows.append([
+            f"Degraded: {endpoint['Endpoint']}",
+            f"{endpoint['Calls_Skipped']} calls skipped, circuit opened {endpoint['Trips']}x from "
+            f"{endpoint['First_Opened']} ({endpoint['State']} at end of run); last error: {endpoint['Reason']}"
+        ])
+    return rows
+
+CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+HTTP_CACHE_PATH = os.path.join(CACHE_DIR, 'http_cache.sqlite3')
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_MB', 200)) * 1024 * 1024
+# 'use' reads and writes the cache, 'refresh' skips reads but stores fresh responses, 'bypass' ignores it
+HTTP_CACHE_MODE = os.getenv('HTTP_CACHE_MODE', 'use').lower()
+# Weekdays (0 = Monday) on which new ranking lists are published; player history is cached until the next one.
+# Unset, history is kept until the end of the next local day, so one nightly run reuses the previous run's lookups.
+RANKING_PUBLICATION_WEEKDAYS = {int(day) for day in os.getenv('RANKING_PUBLICATION_WEEKDAYS', '').split(',') if day.strip()}
+
+DAY = 24 * 3600
+
+
+def ranking_history_expiry(now):
+    """
+    Player ranking history stays valid until the next ranking publication day starts, or without
+    configured publication days until the local midnight after next. Either way the 22:30 nightly
+    run can reuse what the previous night cached, even when that run went past midnight.
+    """
+    today = datetime.fromtimestamp(now, ZoneInfo('Europe/Copenhagen')).replace(hour=0, minute=0, second=0, microsecond=0)
+    if RANKING_PUBLICATION_WEEKDAYS:
+        for days_ahead in range(1, 8):
+            candidate = today + timedelta(days=days_ahead)
+            if candidate.weekday() in RANKING_PUBLICATION_WEEKDAYS:
+                return candidate.timestamp()
+    return (today + timedelta(days=2)).timestamp()
+
+
+# URL pattern -> time to live in seconds, or a function returning the expiry timestamp
+HTTP_CACHE_TTLS = [
+    (re.compile(r'/metadata/GetFeatureMetadataAsync\?feature=Teamleague'), 7 * DAY),
+    (re.compile(r'/metadata/GetFeatureMetadataAsync\?feature=PlayerProfile'), 7 * DAY),
+    (re.compile(r'/organization/GetOrganizationInfoAsync'), 7 * DAY),
+    (re.compile(r'/api/player/[^/]+/profile'), 7 * DAY),
+    (re.compile(r'/player/GetHistoricDataAsync'), ranking_history_expiry),
+]
+
+
+def cache_expiry(url, now):
+    """Return the expiry timestamp for a cacheable URL, or None if it should not be cached"""
+    for pattern, ttl in HTTP_CACHE_TTLS:
+        if pattern.search(url):
+            return ttl(now) if callable(ttl) else now + ttl
+    return None
+
+
+def loads_json(content):
+    """Decode a JSON body with orjson when it is installed, the standard library otherwise"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class RequestResult:
+    """
+    A JSON response decoded exactly once by make_requests (or the response cache).
+    Callers read .data instead of re-parsing; only the size of the raw body is kept.
+    """
+
+    __slots__ = ('url', 'status_code', 'data', 'elapsed', 'size', 'from_cache')
+
+    def __init__(self, url, status_code, data, elapsed = 0.0, size = 0, from_cache = False):
+        self.url = url
+        self.status_code = status_code
+        self.data = data
+        self.elapsed = elapsed
+        self.size = size
+        self.from_cache = from_cache
+
+    def __repr__(self):
+        source = 'cache' if self.from_cache else f'{self.elapsed:.3f}s'
+        return f"<RequestResult {self.status_code} {self.url} {self.size} bytes ({source})>"
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache keyed on URL.
+
+    Entries carry their own expiry from HTTP_CACHE_TTLS, and the least recently used ones
+    are evicted once the stored bodies exceed max_bytes.
+    """
+
+    def __init__(self, path = HTTP_CACHE_PATH, max_bytes = HTTP_CACHE_MAX_BYTES):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+        self.connection.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),))
+        self.connection.commit()
+        self.total_bytes = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        now = time.time()
+        key = self._key(url)
+        row = self.connection.execute(
+            'SELECT status, body FROM responses WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        try:
+            data = loads_json(row[1])
+        except ValueError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        self.connection.commit()
+        return RequestResult(url, row[0], data, size = len(row[1]), from_cache = True)
+
+    def put(self, url, status, body, expires_at):
+        now = time.time()
+        key = self._key(url)
+        previous = self.connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        self.connection.execute(
+            'INSERT OR REPLACE INTO responses (key, url, status, body, size, fetched_at, expires_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, url, status, body, len(body), now, expires_at, now),
+        )
+        self.total_bytes += len(body) - (previous[0] if previous else 0)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+        self.connection.commit()
+
+    def _evict(self):
+        # Drop least recently used entries until the cache is back under 90% of its budget
+        target = self.max_bytes * 0.9
+        stale_keys = []
+        for key, size in self.connection.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if self.total_bytes <= target:
+                break
+            stale_keys.append((key,))
+            self.total_bytes -= size
+        self.connection.executemany('DELETE FROM responses WHERE key = ?', stale_keys)
+        logger.info(f"Evicted {len(stale_keys)} entries from the HTTP cache")
+
+    def close(self):
+        self.connection.close()
+        logger.info(f"HTTP cache closed ({self.hits} hits, {self.misses} misses, {self.total_bytes / 1024 / 1024:.1f} MB stored)")
+
+
+_response_cache = None
+_response_cache_failed = False
+
+
+async def get_response_cache():
+    global _response_cache, _response_cache_failed
+    if _response_cache is None and HTTP_CACHE_MODE != 'bypass' and not _response_cache_failed:
+        try:
+            _response_cache = ResponseCache()
+        except (sqlite3.Error, OSError) as e:
+            _response_cache_failed = True
+            logger.warning(f"HTTP cache unavailable, continuing without it: {str(e)}")
+    return _response_cache
+
+
+async def close_response_cache():
+    global _response_cache
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
+
+
+class RunMemo:
+    """
+    Run-scoped memo keyed on an id.
+
+    Concurrent lookups for the same key share a single in-flight call (single-flight),
+    and the hit/miss counters show how many requests the memo saved.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.clear()
+
+    def clear(self):
+        self._results = {}
+        self._inflight = {}
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+
+    async def get(self, key, fetch, cache_if = None):
+        """Return the memoized result for key, calling fetch() once if it is not known yet.
+        Results rejected by cache_if are handed to the current waiters but not remembered."""
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.joined += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+
+        if cache_if is None or cache_if(result):
+            self._results[key] = result
+        return result
+
+    def log_stats(self):
+        logger.info(f"{self.name} memo: {self.misses} fetched, {self.hits} hits, {self.joined} joined an in-flight request")
+
+
+# Run-wide retry budget for whole-item retries (on top of the per-request attempts in make_requests)
+RETRY_BUDGET = int(os.getenv('RETRY_BUDGET', 100))
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', 4))
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', 2))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', 30))
+RETRY_DEADLINE = float(os.getenv('RETRY_DEADLINE', 120))
+
+
+class RetryableError(Exception):
+    """Transient failure worth another attempt: no response, throttling, an empty payload"""
+
+
+class StructuralError(Exception):
+    """Response that will not get better on retry, e.g. a team homepage without 'Team'"""
+
+
+class RetryDeferred(Exception):
+    """Raised by RetryPolicy.call when an item is parked for the end-of-run retry pass"""
+
+
+class RetryPolicy:
+    """
+    Capped exponential backoff with jitter, bounded per item by a deadline and per run by a retry budget.
+
+    StructuralError fails immediately and CircuitOpenError skips straight to deferral. Items that run out of attempts, deadline or budget are parked
+    in a deferred queue and retried once by run_deferred() after the main pass, when the API has had
+    time to recover and nothing else is competing for the connection slots.
+    """
+
+    def __init__(self, name, budget = RETRY_BUDGET, max_attempts = RETRY_MAX_ATTEMPTS,
+                 base_delay = RETRY_BASE_DELAY, max_delay = RETRY_MAX_DELAY, deadline = RETRY_DEADLINE):
+        self.name = name
+        self.budget = budget
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.clear()
+
+    def clear(self):
+        self.deferred = []
+        self.spent = 0
+        self.structural = 0
+        self.recovered = 0
+        self.abandoned = 0
+
+    def backoff(self, attempt):
+        """Equal jitter: half the capped exponential delay is fixed, the other half random"""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def call(self, key, fetch, on_recovered = None):
+        """
+        Return await fetch(), retrying RetryableError and timeouts within the item's limits.
+        On giving up, (key, fetch, on_recovered) is queued for run_deferred and RetryDeferred is raised.
+        """
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.max_attempts):
+            try:
+                return await asyncio.wait_for(fetch(), timeout = max(0.0, deadline - time.monotonic()))
+            except StructuralError as e:
+                self.structural += 1
+                logger.warning(f"{self.name} {key}: not retrying structural error: {e}")
+                raise
+            except CircuitOpenError as e:
+                # Retrying against an open circuit only burns budget; wait for the deferred pass
+                logger.warning(f"{self.name} {key}: {e}, deferring")
+                break
+            except (RetryableError, asyncio.TimeoutError) as e:
+                reason = str(e) or 'deadline reached'
+
+            delay = self.backoff(attempt)
+            if attempt + 1 >= self.max_attempts:
+                logger.warning(f"{self.name} {key}: attempt {attempt + 1} failed ({reason}), out of attempts")
+                break
+            if time.monotonic() + delay >= deadline:
+                logger.warning(f"{self.name} {key}: attempt {attempt + 1} failed ({reason}), {self.deadline:.0f}s deadline reached")
+                break
+            if self.spent >= self.budget:
+                logger.warning(f"{self.name} {key}: attempt {attempt + 1} failed ({reason}), run retry budget of {self.budget} used up")
+                break
+
+            self.spent += 1
+            logger.info(f"{self.name} {key}: attempt {attempt + 1} failed ({reason}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        self.deferred.append((key, fetch, on_recovered))
+        raise RetryDeferred(key)
+
+    async def run_deferred(self):
+        """Give every deferred item one more attempt within its deadline; successes go to on_recovered"""
+        deferred, self.deferred = self.deferred, []
+        if not deferred:
+            return
+
+        logger.info(f"{self.name}: retrying {len(deferred)} deferred items")
+
+        async def retry(key, fetch, on_recovered):
+            try:
+                result = await asyncio.wait_for(fetch(), timeout = self.deadline)
+                if on_recovered is not None:
+                    await on_recovered(result)
+                self.recovered += 1
+            except Exception as e:
+                self.abandoned += 1
+                logger.error(f"{self.name} {key}: deferred retry failed: {str(e) or type(e).__name__}")
+
+        await asyncio.gather(*(retry(*item) for item in deferred))
+
+    def log_stats(self):
+        logger.info(f"{self.name} retries: {self.spent}/{self.budget} budget used, {self.structural} structural errors, "
+                    f"{self.recovered} recovered and {self.abandoned} abandoned in the deferred pass")
+
 async def convert_unix_timestamp(timestamp):
     """
     Convert Unix timestamp to human-readable date
@@ -44,52 +776,177 @@ async def flat(d_lists):
     return list(itertools.chain(*d_lists))
 
 
-async def random_useragent():
-    agent = UserAgent()
-    return agent.random
+# How User-Agents rotate: 'random' per request, 'host' sticky per host, 'session' one for the whole run
+USER_AGENT_ROTATION = os.getenv('USER_AGENT_ROTATION', 'random').lower()
+USER_AGENT_POOL_SIZE = int(os.getenv('USER_AGENT_POOL_SIZE', 50))
+# Chrome's reduced UA string is identical for every Windows install of a version, so an exact match
+# gives a single agent; a window of N also admits agents up to N major versions either side
+USER_AGENT_MAJOR_WINDOW = int(os.getenv('USER_AGENT_MAJOR_WINDOW', 0))
+FALLBACK_USER_AGENT = (
+    f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    f'Chrome/{CLIENT_CHROME_MAJOR}.0.0.0 Safari/537.36'
+)
+
+
+class UserAgentPool:
+    """
+    User-Agents sampled once from fake_useragent and kept in memory. Only desktop Chrome on Windows
+    with the impersonated Chrome major version is kept, so the header never contradicts the TLS
+    fingerprint of the pooled clients.
+    """
+
+    def __init__(self, size = USER_AGENT_POOL_SIZE, rotation = USER_AGENT_ROTATION):
+        self.rotation = rotation
+        self.agents = self._load(size)
+        self.session_agent = random.choice(self.agents)
+        self.host_agents = {}
+        logger.info(f"User-Agent pool loaded with {len(self.agents)} agents ({self.rotation} rotation)")
+
+    @staticmethod
+    def _load(size):
+        target_major = int(CLIENT_CHROME_MAJOR)
+        agents = set()
+        try:
+            provider = UserAgent(browsers = ['Chrome'], os = ['Windows'], platforms = ['desktop'])
+            for _ in range(size * 5):
+                agent = provider.random
+                match = re.search(r'Chrome/(\d+)\.', agent)
+                if match and 'Edg/' not in agent and abs(int(match.group(1)) - target_major) <= USER_AGENT_MAJOR_WINDOW:
+                    agents.add(agent)
+                if len(agents) >= size:
+                    break
+        except Exception as e:
+            logger.warning(f"Could not load User-Agent data, using the built-in Chrome {CLIENT_CHROME_MAJOR} agent: {str(e)}")
+
+        if not agents:
+            agents.add(FALLBACK_USER_AGENT)
+        return sorted(agents)
+
+    def get(self, host = None):
+        if self.rotation == 'session':
+            return self.session_agent
+        if self.rotation == 'host' and host:
+            if host not in self.host_agents:
+                self.host_agents[host] = random.choice(self.agents)
+            return self.host_agents[host]
+        return random.choice(self.agents)
+
+
+_user_agent_pool = None
+
+
+async def random_useragent(host = None):
+    """User-Agent for a request to host, following USER_AGENT_ROTATION; the pool is built on first use"""
+    global _user_agent_pool
+    if _user_agent_pool is None:
+        _user_agent_pool = UserAgentPool()
+    return _user_agent_pool.get(host)
+
+
+# Per-endpoint base headers, registered once by the scrapers. Cookies are not part of a profile:
+# the pooled clients keep a cookie store, so server-issued cookies (ARRAffinity) are replayed as-is.
+REQUEST_PROFILES = {}
+_profile_headers = {}
+
+
+def register_request_profile(name, host, headers):
+    """Register immutable base headers for requests to host; only the User-Agent varies per request"""
+    REQUEST_PROFILES[name] = (host, MappingProxyType(dict(headers)))
+
+
+async def request_headers(profile):
+    """Headers for one request, built once per (profile, User-Agent) pair and shared afterwards"""
+    host, base_headers = REQUEST_PROFILES[profile]
+    user_agent = await random_useragent(host)
+    key = (profile, user_agent)
+    if key not in _profile_headers:
+        _profile_headers[key] = {'User-Agent': user_agent, **base_headers}
+    return _profile_headers[key]
 
 
 async def random_interval(interval):
     return random.uniform(3, interval + 1)
 
 
-async def make_requests(url, headers):
+async def make_requests(url, headers, use_cache = True, refresh = False, attempts = 5):
+    """
+    GET a JSON endpoint with retries, going through the shared client pool and rate limiter.
+
+    Responses for slow-changing endpoints (see HTTP_CACHE_TTLS) are served from and stored in
+    the on-disk cache unless use_cache is False; refresh=True skips the lookup but stores the
+    fresh response.
+
+    Returns a RequestResult whose .data is the decoded payload, or None after `attempts` failed attempts.
+    """
+    cache = await get_response_cache() if use_cache else None
+    expires_at = cache_expiry(url, time.time()) if cache is not None else None
+    if expires_at is not None and not refresh and HTTP_CACHE_MODE != 'refresh':
+        cached = cache.get(url)
+        if cached is not None:
+            return cached
+
     random_delay = await random_interval(5)
-    for attempt in range(5):
+    pool = await get_client_pool()
+    limiter = await get_adaptive_limiter()
+    breaker = get_circuit_breaker(url)
+    for attempt in range(attempts):
+        # Checked before every attempt, so calls already backing off stop once the circuit opens
+        if not breaker.allow():
+            logger.info(f"Circuit {breaker.family} is open, not requesting {url}")
+            return None
+
         try:
-            async with AsyncClient(
-                impersonate='chrome_131',
-                impersonate_os='windows',
-            ) as client:
-                response = await client.get(url, headers=headers)
-                if response.status_code == 200 and response.content:
+            await acquire_rate_limit(url)
+            async with limiter.slot():
+                async with pool.client() as client:
+                    started = time.perf_counter()
                     try:
-                        json_data = response.json()
-                        if json_data is not None:
-                            return response
-                        else:
-                            logger.info(f"Attempt {attempt + 1}: Response JSON is None")
-                    except Exception as json_error:
-                        logger.info(f"Attempt {attempt + 1}: JSON parsing failed: {str(json_error)}")
-                else:
-                    logger.info(f"Attempt {attempt + 1}: Status code {response.status_code}")
-
-                # If we get here, we need to retry
-                if attempt < 4:  # Don't sleep after the last attempt
-                    # Exponential backoff: 2^attempt + random jitter
-                    delay = (2 ** attempt) + random_delay
-                    logger.info(f"Retrying in {delay:.1f} seconds...")
-                    await asyncio.sleep(delay)
+                        response = await client.get(url, headers=headers)
+                    except Exception as request_error:
+                        limiter.record(failure_outcome(error = request_error))
+                        breaker.record_failure(str(request_error) or type(request_error).__name__)
+                        raise
+                    elapsed = time.perf_counter() - started
+
+            content = response.content
+            if response.status_code == 200 and content:
+                try:
+                    json_data = loads_json(content)
+                    if json_data is not None:
+                        limiter.record('ok', elapsed)
+                        breaker.record_success()
+                        if expires_at is not None:
+                            cache.put(url, response.status_code, content, expires_at)
+                        return RequestResult(url, response.status_code, json_data, elapsed, len(content))
+                    else:
+                        limiter.record('error')
+                        breaker.record_failure('Response JSON is None')
+                        logger.info(f"Attempt {attempt + 1}: Response JSON is None")
+                except Exception as json_error:
+                    limiter.record('error')
+                    breaker.record_failure(f"JSON parsing failed: {str(json_error)}")
+                    logger.info(f"Attempt {attempt + 1}: JSON parsing failed: {str(json_error)}")
+            else:
+                limiter.record(failure_outcome(status_code = response.status_code))
+                breaker.record_failure(f"HTTP {response.status_code}")
+                logger.info(f"Attempt {attempt + 1}: Status code {response.status_code}")
+
+            # If we get here, we need to retry
+            if attempt < attempts - 1:  # Don't sleep after the last attempt
+                # Exponential backoff: 2^attempt + random jitter
+                delay = (2 ** attempt) + random_delay
+                logger.info(f"Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
 
         except Exception as e:
             logger.info(f"Attempt {attempt + 1} failed: {str(e)}")
-            if attempt < 4:
+            if attempt < attempts - 1:
                 # Exponential backoff: 2^attempt + random jitter
                 delay = (2 ** attempt) + random_delay
                 logger.info(f"Retrying in {delay:.1f} seconds...")
                 await asyncio.sleep(delay)
 
-    logger.error(f"Failed to get valid response from {url} after 5 attempts")
+    logger.error(f"Failed to get valid response from {url} after {attempts} attempts")
     return None  # Return None instead of string for easier checking
 
 
@@ -142,3 +999,280 @@ async def save_to_excel(standings_dataframe, rounds_dataframe, players_dataframe
     # IMPORTANT: Return the file path
     return file_path
 
+
+def dataframe_to_sheet_values(df, zero_as_text = False):
+    """
+    Serialize a DataFrame into the [headers] + rows lists of strings sent to Google Sheets.
+    Works column by column instead of per cell: missing values become '', everything else
+    goes through str(). With zero_as_text, numeric zeros (0, 0.0, False) are written as '0'.
+    Unlike the old iterrows formatter, integer columns of an all-numeric frame stay integers
+    ('1', not '1.0'), since rows are never upcast to float.
+    """
+    if df.empty:
+        return []
+
+    values = np.empty(df.shape, dtype = object)
+    for position, (_, column) in enumerate(df.items()):
+        if column.dtype == object:
+            text = column.astype(str).mask(column.isna(), '')
+            if zero_as_text:
+                try:
+                    zeros = column.isin([0])
+                except TypeError:
+                    # Unhashable cells (lists, dicts) can't go through isin
+                    zeros = column.map(lambda value: isinstance(value, (int, float)) and value == 0)
+                text = text.mask(zeros, '0')
+            values[:, position] = text.to_numpy()
+        else:
+            # Numeric, bool and datetime columns repeat few distinct values, so only stringify those
+            array = column.to_numpy()
+            if array.dtype.kind == 'f':
+                # factorize hashes -0.0 and 0.0 together; key floats on their bits so '-0.0' is kept
+                array = np.ascontiguousarray(array)
+                codes, bits = pd.factorize(array.view(f'i{array.itemsize}'))
+                uniques = pd.Index(bits.view(array.dtype))
+                codes[np.isnan(array)] = -1
+            else:
+                codes, uniques = pd.factorize(column)
+            labels = np.array([str(value) for value in uniques] + [''], dtype = object)
+            if zero_as_text:
+                labels[:-1][uniques.isin([0])] = '0'
+            values[:, position] = labels[codes]
+
+    return [df.columns.tolist()] + values.tolist()
+
+
+TEAM_HOME_COLUMNS = ['Team_Home_ID_Matches', 'Team_ID_Home_Matches', 'Team_Home_ID', 'Home_Team_ID']
+TEAM_AWAY_COLUMNS = ['Team_Away_ID_Matches', 'Team_ID_Away_Matches', 'Team_Away_ID', 'Away_Team_ID']
+
+
+def find_team_id_columns(df):
+    """Home/away team id columns under whichever naming variation the frame uses (last match wins)"""
+    team_home_col = None
+    team_away_col = None
+    for col in df.columns:
+        if col in TEAM_HOME_COLUMNS:
+            team_home_col = col
+        if col in TEAM_AWAY_COLUMNS:
+            team_away_col = col
+    return team_home_col, team_away_col
+
+
+def expand_matches_to_7_rows(matches_df, rows_per_round = 7):
+    """
+    Ensure each Round_ID has exactly 7 rows total.
+    For each Round_ID, ALL 7 rows will have the same Team_Home_ID_Matches and Team_Away_ID_Matches values.
+    If a Round_ID has fewer than 7 rows, add empty rows to reach exactly 7.
+    If a Round_ID has more than 7 rows, keep only the first 7 rows.
+    Rounds keep their first-appearance order; the whole frame is handled with one groupby.
+    """
+    if matches_df.empty:
+        return matches_df
+
+    if 'Round_ID' not in matches_df.columns:
+        logger.warning("Round_ID column not found, returning original DataFrame")
+        return matches_df
+
+    logger.info("Starting round processing to exactly 7 rows per Round_ID with consistent Team IDs")
+    logger.info(f"Available columns: {matches_df.columns.tolist()}")
+
+    team_home_col, team_away_col = find_team_id_columns(matches_df)
+    logger.info(f"Found Team Home column: {team_home_col}")
+    logger.info(f"Found Team Away column: {team_away_col}")
+
+    # Round codes follow first appearance, which is the order rounds are written in
+    round_codes, round_ids = pd.factorize(matches_df['Round_ID'], use_na_sentinel = False)
+    round_count = len(round_ids)
+    logger.info(f"Found {round_count} unique Round_IDs")
+
+    position = matches_df.groupby(round_codes, sort = False).cumcount().to_numpy()
+    rows_per_code = np.bincount(round_codes, minlength = round_count)
+    first_rows = matches_df.iloc[np.unique(round_codes, return_index = True)[1]]
+
+    # Values every row of a round shares with the round's first row
+    consistent_columns = [
+        col for col in dict.fromkeys(['season_id', 'pool_id', 'Round_ID', team_home_col, team_away_col])
+        if col and col in matches_df.columns
+    ]
+
+    keep = position < rows_per_round
+    kept = matches_df[keep].copy()
+    kept_codes = round_codes[keep]
+    for col in consistent_columns:
+        kept[col] = first_rows[col].to_numpy()[kept_codes]
+
+    missing = np.clip(rows_per_round - rows_per_code, 0, None)
+    frames = [kept]
+    order_codes = [kept_codes]
+    order_positions = [position[keep]]
+
+    if missing.any():
+        pad_codes = np.repeat(np.arange(round_count), missing)
+        pad_positions = rows_per_code[pad_codes] + (np.arange(len(pad_codes)) - np.repeat(np.cumsum(missing) - missing, missing))
+        padding = pd.DataFrame('', index = np.arange(len(pad_codes)), columns = matches_df.columns, dtype = object)
+        for col in consistent_columns:
+            padding[col] = first_rows[col].to_numpy()[pad_codes]
+        frames.append(padding)
+        order_codes.append(pad_codes)
+        order_positions.append(pad_positions)
+
+    rounds_expanded = int((rows_per_code < rows_per_round).sum())
+    rounds_trimmed = int((rows_per_code > rows_per_round).sum())
+    rows_added = int(missing.sum())
+    rows_removed = int(np.clip(rows_per_code - rows_per_round, 0, None).sum())
+    logger.info(f"Processed {round_count} rounds: expanded {rounds_expanded} rounds (added {rows_added} rows), trimmed {rounds_trimmed} rounds (removed {rows_removed} rows)")
+
+    expanded_df = pd.concat(frames, ignore_index = True) if len(frames) > 1 else kept.reset_index(drop = True)
+    order = np.lexsort((np.concatenate(order_positions), np.concatenate(order_codes)))
+    expanded_df = expanded_df.iloc[order].reset_index(drop = True)
+
+    # Final verification - log a sample of the results
+    sample_round = expanded_df['Round_ID'].iloc[0]
+    sample_data = expanded_df[expanded_df['Round_ID'] == sample_round]
+    logger.info(f"Sample verification for Round_ID {sample_round}:")
+    for col in [team_home_col, team_away_col]:
+        if col and col in sample_data.columns:
+            unique_values = sample_data[col].unique()
+            logger.info(f"  {col}: {unique_values} (should have only 1 unique value)")
+
+    return expanded_df
+
+
+def blank_cells(column):
+    """True where a cell is missing or only whitespace once stringified"""
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_any_dtype(column):
+        # str() of a number, bool or timestamp is never blank, so only missing values count
+        return column.isna().to_numpy()
+    try:
+        codes, uniques = pd.factorize(column)
+    except TypeError:
+        # Unhashable cells (lists, dicts) can't be factorized
+        return (column.isna() | column.astype(str).str.strip().eq('')).to_numpy()
+    blank_uniques = np.append(pd.Index(uniques).astype(str).str.strip() == '', True)
+    return blank_uniques[codes]
+
+
+def remove_empty_rows(df):
+    """
+    Remove empty/placeholder rows that were created during expansion.
+    Removes rows that only have basic identifier columns filled but no actual match data.
+    Only preserves rows that have meaningful match/player data beyond the basic identifiers.
+    """
+    if df.empty:
+        return df
+
+    initial_count = len(df)
+    logger.info(f"Starting empty row removal with {initial_count} rows")
+
+    team_home_col, team_away_col = find_team_id_columns(df)
+
+    # Define basic identifier columns that don't count as "meaningful data"
+    basic_identifier_columns = ['season_id', 'pool_id', 'Round_ID']
+    if team_home_col:
+        basic_identifier_columns.append(team_home_col)
+    if team_away_col:
+        basic_identifier_columns.append(team_away_col)
+
+    meaningful_positions = [position for position, col in enumerate(df.columns) if col not in basic_identifier_columns]
+
+    logger.info(f"Basic identifier columns: {basic_identifier_columns}")
+    logger.info(f"Meaningful data columns to check: {len(meaningful_positions)} columns")
+
+    # A row is kept when any meaningful column holds something other than blank/missing
+    has_meaningful_data = np.zeros(initial_count, dtype = bool)
+    for position in meaningful_positions:
+        has_meaningful_data |= ~blank_cells(df.iloc[:, position])
+
+    df_cleaned = df[has_meaningful_data].copy()
+
+    final_count = len(df_cleaned)
+    empty_rows_removed = initial_count - final_count
+    if empty_rows_removed and 'Round_ID' in df.columns:
+        logger.debug(f"Removed rows with only basic identifiers from Round_IDs: {df.loc[~has_meaningful_data, 'Round_ID'].unique().tolist()}")
+    logger.info(f"Removed {empty_rows_removed} rows with only basic identifiers, {final_count} rows remaining")
+
+    return df_cleaned.reset_index(drop = True)
+
+
+# 'xlsxwriter' streams rows to disk in constant memory; 'openpyxl' keeps the whole workbook in memory
+EXCEL_BACKEND = os.getenv('EXCEL_BACKEND', 'xlsxwriter').lower()
+EXCEL_MAX_COLUMN_WIDTH = 50
+EXCEL_CHUNK_ROWS = 5000
+
+
+def column_widths(df, max_width = EXCEL_MAX_COLUMN_WIDTH):
+    """Excel column widths from the header and the longest stringified value, capped at max_width"""
+    widths = []
+    for name, column in df.items():
+        longest = len(str(name))
+        values = column.dropna()
+        if not values.empty:
+            if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+                # Few distinct values in number/date columns, so measure those only
+                values = pd.Series(values.unique())
+            longest = max(longest, int(values.astype(str).str.len().max()))
+        widths.append(min(longest + 2, max_width))
+    return widths
+
+
+def iter_excel_rows(df, chunk_rows = EXCEL_CHUNK_ROWS):
+    """Yield rows as Python values in chunks, with missing values as None (blank cells)"""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        yield from chunk.where(chunk.notna(), None).values.tolist()
+
+
+def write_excel_workbook_xlsxwriter(path, sheets):
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'remove_timezone': True,
+    })
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+
+    try:
+        for sheet_name, df in sheets.items():
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.freeze_panes(1, 0)
+            for position, width in enumerate(column_widths(df)):
+                worksheet.set_column(position, position, width)
+
+            worksheet.write_row(0, 0, [str(name) for name in df.columns], header_format)
+            for row_number, row in enumerate(iter_excel_rows(df), start = 1):
+                worksheet.write_row(row_number, 0, row)
+    finally:
+        workbook.close()
+
+
+def write_excel_workbook_openpyxl(path, sheets):
+    with pd.ExcelWriter(path, engine = 'openpyxl') as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name = sheet_name, index = False)
+            worksheet = writer.sheets[sheet_name]
+            worksheet.freeze_panes = 'A2'
+            for position, width in enumerate(column_widths(df), start = 1):
+                worksheet.column_dimensions[get_column_letter(position)].width = width
+
+
+def write_excel_workbook(path, sheets, backend = None):
+    """
+    Write {sheet_name: DataFrame} to an .xlsx file with a bold header row, frozen header and
+    column widths computed from the frames. backend is 'xlsxwriter' or 'openpyxl' (EXCEL_BACKEND
+    by default); xlsxwriter falls back to openpyxl when it isn't installed.
+    """
+    backend = (backend or EXCEL_BACKEND).lower()
+    if backend == 'xlsxwriter' and xlsxwriter is None:
+        logger.warning("XlsxWriter is not installed, writing the workbook with openpyxl")
+        backend = 'openpyxl'
+
+    if backend == 'xlsxwriter':
+        write_excel_workbook_xlsxwriter(path, sheets)
+    elif backend == 'openpyxl':
+        write_excel_workbook_openpyxl(path, sheets)
+    else:
+        raise ValueError(f"Unknown Excel backend: {backend}")
+
+    logger.info(f"Wrote {len(sheets)} sheets to {path} with {backend}")
+    return path